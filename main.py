@@ -13,27 +13,42 @@ from aiogram.fsm.storage.memory import MemoryStorage
 
 from src.config.settings import settings, LOGS_DIR
 from src.database import Database
-
-# Імпорт handlers
-from src.handlers import start, city, inventory, battle, shop, tavern, guild
-
-# Переконуємось що папка logs існує
-import os
-os.makedirs(LOGS_DIR, exist_ok=True)
-
-# Налаштування логування
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
-    format=settings.LOG_FORMAT,
-    handlers=[
-        logging.FileHandler(settings.LOG_FILE, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
+from src.services.regeneration import regeneration_worker
+from src.services.expeditions import expedition_worker
+from src.services.leaderboard import warm_leaderboards
+from src.services.stats import stats_worker
+from src.services.daily_rewards import daily_notify_worker
+from src.services.broadcast import resume_broadcasts, running_broadcasts
+from src.services.metrics import metrics_log_worker, start_metrics_server
+from src.middlewares import (
+    MetricsMiddleware, ApiMetricsMiddleware, ThrottlingMiddleware, InFlightCallbackMiddleware,
 )
 
 logger = logging.getLogger(__name__)
 
 
+def bootstrap():
+    """
+    ✨ Побічні ефекти запуску: папка logs і логування
+    
+    Викликається лише при запуску бота - import main (і будь-якого src.*)
+    нічого не створює і не налаштовує. Заміряти імпорт:
+    python scripts/bench_startup.py
+    """
+    # Переконуємось що папка logs існує
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    
+    # Налаштування логування
+    logging.basicConfig(
+        level=getattr(logging, settings.LOG_LEVEL),
+        format=settings.LOG_FORMAT,
+        handlers=[
+            logging.FileHandler(settings.LOG_FILE, encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+
+
 async def main():
     """Головна функція запуску бота"""
     
@@ -48,29 +63,100 @@ async def main():
         logger.error(f"❌ {e}")
         return
     
+    # ✨ Імпорт handlers (і таблиць конфігу, які вони тягнуть) - лише коли
+    # токен є: без нього бот зупиняється, не завантажуючи їх
+    from src.handlers import start, city, inventory, battle, shop, tavern, guild, expedition, top, admin, daily
+    
     # Ініціалізація бази даних
     try:
         logger.info("Ініціалізація бази даних...")
         db = Database()
         await db.init_db()
         logger.info("✅ База даних успішно ініціалізована")
+        
+        # ✨ Топ-N у пам'яті; далі оновлюється при кожному збереженні гравця
+        await warm_leaderboards(db)
     except Exception as e:
         logger.error(f"❌ Помилка ініціалізації БД: {e}")
         return
     
+    background_tasks = []
+    metrics_runner = None
+    
+    # ✨ Фонова пакетна регенерація (гравців у бою не чіпаємо)
+    if settings.REGEN_JOB_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(
+            regeneration_worker(
+                db,
+                settings.REGEN_JOB_INTERVAL,
+                get_excluded=lambda: list(battle.active_battles.keys())
+            )
+        ))
+    
+    # ✨ Експедиції: бої розраховуються пачками, коли загін повертається
+    if settings.EXPEDITION_JOB_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(
+            expedition_worker(
+                db,
+                settings.EXPEDITION_JOB_INTERVAL,
+                settings.EXPEDITION_BATCH_SIZE,
+                get_excluded=lambda: list(battle.active_battles.keys())
+            )
+        ))
+    
+    # ✨ Агрегати економіки для /stats (лише змінені гравці)
+    if settings.STATS_JOB_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(
+            stats_worker(db, settings.STATS_JOB_INTERVAL, settings.STATS_BATCH_SIZE)
+        ))
+    
     # Створення бота та диспетчера
     try:
         bot = Bot(token=settings.BOT_TOKEN)
         storage = MemoryStorage()
         dp = Dispatcher(storage=storage)
         
+        # ✨ Метрики: час хендлерів, виклики БД та Telegram API
+        bot.session.middleware(ApiMetricsMiddleware())
+        dp.message.middleware(MetricsMiddleware())
+        dp.callback_query.middleware(MetricsMiddleware())
+        
+        # ✨ Повтор дії, що ще виконується, - одразу відповідь без хендлера
+        # (раніше за ліміт, щоб такі натискання його не витрачали)
+        dp.callback_query.outer_middleware(InFlightCallbackMiddleware())
+        
+        # ✨ Ліміт дій гравця: один екземпляр - спільний кошик для повідомлень і кнопок
+        throttling = ThrottlingMiddleware()
+        dp.message.outer_middleware(throttling)
+        dp.callback_query.outer_middleware(throttling)
+        
+        if settings.METRICS_LOG_INTERVAL > 0:
+            background_tasks.append(
+                asyncio.create_task(metrics_log_worker(settings.METRICS_LOG_INTERVAL))
+            )
+        if settings.METRICS_PORT > 0:
+            metrics_runner = await start_metrics_server(settings.METRICS_HOST, settings.METRICS_PORT)
+        
+        # ✨ Нагадування про щоденну нагороду (пачками, у межах лімітів Telegram)
+        if settings.DAILY_NOTIFY_INTERVAL > 0:
+            background_tasks.append(asyncio.create_task(
+                daily_notify_worker(bot, db, settings.DAILY_NOTIFY_INTERVAL, settings.DAILY_NOTIFY_BATCH_SIZE)
+            ))
+        
+        # ✨ Розсилки, перервані попереднім зупиненням, продовжуються з курсора
+        await resume_broadcasts(bot, db)
+        
         # Реєстрація роутерів (ПОРЯДОК ВАЖЛИВИЙ!)
         dp.include_router(start.router)
+        dp.include_router(admin.router)
         dp.include_router(city.router)       # City ПЕРШИЙ - обробляє кнопки
         dp.include_router(tavern.router)
         dp.include_router(inventory.router)
         dp.include_router(shop.router)
         dp.include_router(guild.router)
+        dp.include_router(expedition.router)
+        dp.include_router(top.router)
+        dp.include_router(daily.router)
         dp.include_router(battle.router)     # Battle ОСТАННІЙ
         
         logger.info("✅ Бот успішно налаштований")
@@ -78,14 +164,22 @@ async def main():
         
         # Запуск бота
         await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
-        
+    
     except Exception as e:
         logger.error(f"❌ Критична помилка: {e}", exc_info=True)
     finally:
+        for task in background_tasks:
+            task.cancel()
+        # Статус лишається 'running' - розсилка продовжиться після старту
+        for task in list(running_broadcasts.values()):
+            task.cancel()
+        if metrics_runner:
+            await metrics_runner.cleanup()
         logger.info("Бот зупинено")
 
 
 if __name__ == "__main__":
+    bootstrap()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -0,0 +1,138 @@
+﻿# migrations/convert_timestamps_to_epoch.py
+# Переводить час регенерації, щоденної нагороди та бафів з ISO-рядків
+# у цілі секунди від епохи. Запустіть цей скрипт один раз.
+
+import sqlite3
+import glob
+import json
+from datetime import datetime
+
+def find_database():
+    """Знаходить файл бази даних"""
+    db_files = glob.glob('*.db') + glob.glob('**/*.db', recursive=True)
+    
+    if not db_files:
+        print("❌ Файл бази даних не знайдено!")
+        return None
+    
+    for db_file in db_files:
+        try:
+            conn = sqlite3.connect(db_file)
+            cursor = conn.cursor()
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='players'")
+            if cursor.fetchone():
+                conn.close()
+                print(f"✅ Використовуємо БД: {db_file}")
+                return db_file
+            conn.close()
+        except:
+            continue
+    
+    return None
+
+
+def iso_to_epoch(value):
+    """ISO-рядок (локальний час) -> секунди від епохи, або None"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        return int(datetime.fromisoformat(str(value).split('.')[0]).timestamp())
+    except ValueError:
+        return None
+
+
+def convert_effects(raw):
+    """Переводить expires_at бафів у секунди. Повертає None, якщо змін немає"""
+    try:
+        effects = json.loads(raw or "[]")
+    except (TypeError, ValueError):
+        return None
+    
+    changed = False
+    for effect in effects:
+        expires_at = effect.get("expires_at")
+        if isinstance(expires_at, str):
+            effect["expires_at"] = iso_to_epoch(expires_at) or 0
+            changed = True
+    
+    return json.dumps(effects, ensure_ascii=False) if changed else None
+
+
+def migrate_timestamps():
+    """Додає цілочисельні колонки часу та конвертує старі значення"""
+    db_path = find_database()
+    
+    if not db_path:
+        print("❌ База даних не знайдена!")
+        return
+    
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    cursor.execute("PRAGMA table_info(players)")
+    columns = [column[1] for column in cursor.fetchall()]
+    
+    # Нові колонки
+    if 'last_regeneration_ts' not in columns:
+        print("Додаємо колонку 'last_regeneration_ts'...")
+        cursor.execute("ALTER TABLE players ADD COLUMN last_regeneration_ts INTEGER")
+    else:
+        print("Колонка 'last_regeneration_ts' вже існує")
+    
+    if 'last_daily_reward_ts' not in columns:
+        print("Додаємо колонку 'last_daily_reward_ts'...")
+        cursor.execute("ALTER TABLE players ADD COLUMN last_daily_reward_ts INTEGER")
+    else:
+        print("Колонка 'last_daily_reward_ts' вже існує")
+    
+    # Джерело часу регенерації: last_login (пише бот) або last_regeneration (старий скрипт)
+    regen_source = None
+    for name in ('last_login', 'last_regeneration'):
+        if name in columns:
+            regen_source = name
+            break
+    
+    daily_source = 'last_daily_reward' if 'last_daily_reward' in columns else None
+    
+    select_regen = regen_source or "NULL"
+    select_daily = daily_source or "NULL"
+    cursor.execute(f'''
+        SELECT user_id, {select_regen}, {select_daily}, active_effects,
+               last_regeneration_ts, last_daily_reward_ts
+        FROM players
+    ''')
+    rows = cursor.fetchall()
+    
+    now_ts = int(datetime.now().timestamp())
+    updated = 0
+    
+    for user_id, regen_iso, daily_iso, effects_raw, regen_ts, daily_ts in rows:
+        new_regen = regen_ts if regen_ts is not None else (iso_to_epoch(regen_iso) or now_ts)
+        new_daily = daily_ts if daily_ts is not None else iso_to_epoch(daily_iso)
+        new_effects = convert_effects(effects_raw)
+        
+        cursor.execute('''
+            UPDATE players SET
+                last_regeneration_ts = ?,
+                last_daily_reward_ts = ?,
+                active_effects = COALESCE(?, active_effects)
+            WHERE user_id = ?
+        ''', (new_regen, new_daily, new_effects, user_id))
+        updated += 1
+    
+    # Індекси для пакетних задач за часом
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_players_regen_ts ON players(last_regeneration_ts)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_players_daily_reward_ts ON players(last_daily_reward_ts)")
+    
+    conn.commit()
+    conn.close()
+    
+    print(f"\n✅ Конвертовано гравців: {updated}")
+    print("✅ Міграція завершена успішно!")
+
+
+if __name__ == "__main__":
+    print("🔍 Пошук бази даних...\n")
+    migrate_timestamps()
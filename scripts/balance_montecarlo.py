@@ -0,0 +1,354 @@
+﻿# scripts/balance_montecarlo.py - Векторизований Monte Carlo балансу (NumPy)
+#
+# Ті самі правила, що й у src/utils/combat.py (attack_roll / damage_roll,
+# пасивки класів, навички з політикою choose_ability), але кожен раунд
+# кидається одразу для цілого масиву боїв. Таблиця: клас × локація × рівень -
+# відсоток перемог, TTK (раундів до перемоги) та швидкість.
+#
+# Монстр і його рівень для кожного бою обираються як у combat.spawn_monster:
+# ваги і level_bonus - з таблиці зустрічей локації (encounter_tables.json).
+# Результат відтворюваний: генератор кожної клітинки залежить лише від --seed.
+#
+# Запуск:
+#   python scripts/balance_montecarlo.py --fights 200000
+#   python scripts/balance_montecarlo.py --weapon rusty_sword --levels 1 2 3 4 5
+#   python scripts/balance_montecarlo.py --compare   # порівняння з покроковим рушієм
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DEBUG_MODE", "true")
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Потрібен NumPy: pip install numpy")
+    sys.exit(1)
+
+from src.config.abilities import ABILITIES
+from src.config.constants import CharacterClass, LOCATIONS, MONSTER_BASE_STATS
+from src.config.equipment import WEAPONS
+from src.models.monster import Monster
+from src.utils.combat import UNDEAD_TYPES
+from src.utils.dice import compile_dice
+from src.utils.encounter_tables import get_encounter_table
+
+# Спільні з покроковим симулятором налаштування гравця
+from simulate_combat import build_player, run_fights
+
+
+def parse_dice(dice: str):
+    """'2d6' -> (2, 6); векторизована модель підтримує лише прості NdM"""
+    plan = compile_dice(dice)
+    if len(plan.terms) != 1 or plan.constant:
+        raise ValueError(f"Монте-Карло підтримує лише вирази NdM, отримано {dice!r}")
+    sign, count, sides, keep, _ = plan.terms[0]
+    if sign < 0 or keep:
+        raise ValueError(f"Монте-Карло підтримує лише вирази NdM, отримано {dice!r}")
+    return count, sides
+
+
+# Параметри навичок з реєстру (ті самі, що бачить бойовий рушій)
+FIREBALL = ABILITIES["fireball"]
+MIGHTY_STRIKE = ABILITIES["mighty_strike"]
+POISON = ABILITIES["poison_strike"]["status"]
+SMITE = ABILITIES["smite_undead"]
+
+
+def roll_sum(rng, n: int, count: int, sides: int, critical=None):
+    """
+    Сума count кубиків d{sides} для n боїв
+    
+    Якщо передано critical - у цих боях кубиків удвічі більше.
+    """
+    if critical is None:
+        return rng.integers(1, sides + 1, size=(n, count)).sum(axis=1)
+    rolls = rng.integers(1, sides + 1, size=(n, count * 2))
+    return np.where(critical, rolls.sum(axis=1), rolls[:, :count].sum(axis=1))
+
+
+def attack_roll(rng, n: int, bonus):
+    """Векторний CombatCalculator.attack_roll -> (d20, total, is_critical)"""
+    d20 = rng.integers(1, 21, size=n)
+    total = np.where(d20 == 1, 1, d20 + bonus)
+    return d20, total, d20 == 20
+
+
+class PlayerProfile:
+    """Бойові числа гравця, пораховані один раз методами Player"""
+    
+    def __init__(self, player):
+        self.character_class = player.character_class
+        self.max_health = player.max_health
+        self.max_mana = player.max_mana
+        self.attack_bonus = player.get_attack_bonus()
+        self.armor_class = player.get_armor_class()
+        self.defense = player.get_defense()
+        self.double_chance = player.get_double_attack_chance()
+        self.crit_chance = player.get_critical_chance()
+        self.abilities = player.class_abilities
+        
+        self.weapon = player.equipment.get("weapon")
+        strength = player.strength + player.get_total_stat_bonus("strength")
+        agility = player.agility + player.get_total_stat_bonus("agility")
+        intelligence = player.intelligence + player.get_total_stat_bonus("intelligence")
+        
+        if self.weapon:
+            self.dice = parse_dice(self.weapon.get("damage_dice", "1d6"))
+            weapon_type = self.weapon.get("weapon_type", "melee")
+            if weapon_type == "melee":
+                self.stat_bonus = (strength - 10) // 2
+            elif weapon_type == "ranged":
+                self.stat_bonus = (agility - 10) // 2
+            else:
+                self.stat_bonus = (intelligence - 10) // 2
+        self.fist_damage = 1 + (player.strength - 10) // 2
+        self.poison_fist_damage = 1 + (player.agility - 10) // 2
+        self.strength_bonus = (strength - 10) // 2
+        self.agility_bonus = (agility - 10) // 2
+        self.intelligence_bonus = (intelligence - 10) // 2
+    
+    def mana_cost(self, ability: str) -> int:
+        return self.abilities.get(ability, {}).get("mana_cost", 10 ** 9)
+    
+    def weapon_damage(self, rng, n, critical, stat_bonus=None):
+        """CombatCalculator.damage_roll для масиву боїв"""
+        count, sides = self.dice
+        bonus = self.stat_bonus if stat_bonus is None else stat_bonus
+        return np.maximum(1, roll_sum(rng, n, count, sides, critical) + bonus)
+
+
+def encounter_entries(location_id: str) -> list:
+    """Записи таблиці зустрічей локації (як у spawn_monster; без таблиці - вовк)"""
+    encounters = get_encounter_table(location_id).encounters
+    if encounters is None:
+        return [{"monster": "wolf", "weight": 1, "level_bonus": 0}]
+    return list(encounters.items)
+
+
+def simulate(profile: PlayerProfile, location_id: str, fights: int, rng, max_rounds: int = 50):
+    """
+    Проводить fights боїв в одній локації одночасно
+    
+    Returns:
+        (масив перемог bool, масив раундів)
+    """
+    n = fights
+    cls = profile.character_class
+    
+    # --- Монстри як у combat.spawn_monster (ваги і level_bonus таблиці) ---
+    entries = encounter_entries(location_id)
+    monster_types = [entry["monster"] for entry in entries]
+    weights = np.array([entry["weight"] for entry in entries], dtype=float)
+    location_level = LOCATIONS[location_id].get("level_required", 1)
+    type_index = rng.choice(len(entries), size=n, p=weights / weights.sum())
+    bonus = np.array([entry.get("level_bonus", 0) for entry in entries])[type_index]
+    level = np.clip(location_level + bonus + rng.integers(-1, 2, size=n), 1, location_level + 2 + bonus)
+    
+    base = [MONSTER_BASE_STATS[t] for t in monster_types]
+    m_hp = np.array([b["health"] for b in base])[type_index] + (level - 1) * 10
+    m_attack = np.array([b["attack"] for b in base])[type_index] + (level - 1) * 2
+    m_defense = np.array([b["defense"] for b in base])[type_index] + (level - 1)
+    m_undead = np.array([t in UNDEAD_TYPES for t in monster_types])[type_index]
+    monster_ac = m_defense + 10
+    m_attack_bonus = (m_attack - 10) // 2
+    m_damage = np.maximum(1, m_attack - profile.defense // 2)
+    
+    # --- Стан боїв ---
+    p_hp = np.full(n, profile.max_health)
+    mana = np.full(n, profile.max_mana)
+    fireballs = np.zeros(n, dtype=np.int64)
+    smites = np.zeros(n, dtype=np.int64)
+    mighty_used = np.zeros(n, dtype=bool)
+    shield = np.zeros(n, dtype=bool)
+    poison_stacks = np.zeros(n, dtype=np.int64)
+    poison_damage = np.zeros(n, dtype=np.int64)
+    
+    won = np.zeros(n, dtype=bool)
+    done = np.zeros(n, dtype=bool)
+    rounds = np.full(n, max_rounds + 1)
+    
+    for round_no in range(1, max_rounds + 1):
+        active = ~done
+        if not active.any():
+            break
+        
+        # ---------- Вибір дії (choose_ability) ----------
+        use_fireball = use_mighty = use_poison = use_smite = use_shield = np.zeros(n, dtype=bool)
+        if cls == CharacterClass.MAGE:
+            use_fireball = active & (fireballs < FIREBALL["uses_per_battle"]) & (mana >= profile.mana_cost("fireball"))
+        elif cls == CharacterClass.WARRIOR:
+            use_mighty = active & ~mighty_used & (mana >= profile.mana_cost("mighty_strike"))
+        elif cls == CharacterClass.ROGUE:
+            use_poison = active & (poison_stacks == 0) & (mana >= profile.mana_cost("poison_strike"))
+        elif cls == CharacterClass.PALADIN:
+            use_smite = active & m_undead & (smites < SMITE["uses_per_battle"]) & (mana >= profile.mana_cost("smite_undead"))
+            use_shield = active & ~use_smite & ~shield & (mana >= profile.mana_cost("divine_shield"))
+        use_attack = active & ~(use_fireball | use_mighty | use_poison | use_smite | use_shield)
+        
+        damage = np.zeros(n, dtype=np.int64)
+        
+        # ---------- Звичайна атака ----------
+        d20, total, critical = attack_roll(rng, n, profile.attack_bonus)
+        hit = (d20 != 1) & ((total >= monster_ac) | critical)
+        if profile.weapon:
+            hit_damage = profile.weapon_damage(rng, n, critical)
+            if cls == CharacterClass.ROGUE:
+                passive = ~critical & (rng.integers(1, 101, size=n) <= profile.crit_chance)
+                hit_damage = np.where(passive, hit_damage * 2, hit_damage)
+        else:
+            hit_damage = np.full(n, profile.fist_damage)
+        damage += np.where(use_attack & hit, hit_damage, 0)
+        
+        # Подвійний удар воїна
+        if cls == CharacterClass.WARRIOR:
+            second = use_attack & hit & (rng.integers(1, 101, size=n) <= profile.double_chance)
+            d20_2, total_2, critical_2 = attack_roll(rng, n, profile.attack_bonus)
+            hit_2 = (total_2 >= monster_ac) | critical_2
+            if profile.weapon:
+                second_damage = profile.weapon_damage(rng, n, critical_2)
+            else:
+                second_damage = np.full(n, profile.fist_damage)
+            damage += np.where(second & hit_2, second_damage, 0)
+        
+        # ---------- Навички ----------
+        if use_fireball.any():
+            fireball = np.maximum(1, roll_sum(rng, n, *parse_dice(FIREBALL["dice"])) + profile.intelligence_bonus)
+            damage += np.where(use_fireball, fireball, 0)
+            fireballs += use_fireball
+            mana -= use_fireball * profile.mana_cost("fireball")
+        
+        if use_mighty.any():
+            if profile.weapon:
+                mighty = (profile.weapon_damage(rng, n, None, profile.strength_bonus) * MIGHTY_STRIKE["multiplier"]).astype(np.int64)
+            else:
+                mighty = np.full(n, int(profile.fist_damage * MIGHTY_STRIKE["multiplier"]))
+            damage += np.where(use_mighty, mighty, 0)
+            mighty_used |= use_mighty
+            mana -= use_mighty * profile.mana_cost("mighty_strike")
+        
+        if use_poison.any():
+            p_d20, p_total, p_critical = attack_roll(rng, n, profile.attack_bonus)
+            p_hit = use_poison & ((p_total >= monster_ac) | p_critical)
+            if profile.weapon:
+                strike = profile.weapon_damage(rng, n, p_critical, profile.agility_bonus)
+            else:
+                strike = np.full(n, profile.poison_fist_damage)
+            damage += np.where(p_hit, strike, 0)
+            poison_stacks = np.where(p_hit, POISON["duration"], poison_stacks)
+            poison_damage = np.where(p_hit, roll_sum(rng, n, *parse_dice(POISON["dice"])), poison_damage)
+            mana -= use_poison * profile.mana_cost("poison_strike")
+        
+        if use_smite.any():
+            damage += np.where(use_smite, roll_sum(rng, n, *parse_dice(SMITE["dice"])), 0)
+            smites += use_smite
+            mana -= use_smite * profile.mana_cost("smite_undead")
+        
+        if use_shield.any():
+            shield |= use_shield
+            mana -= use_shield * profile.mana_cost("divine_shield")
+        
+        m_hp = m_hp - damage
+        killed = active & (m_hp <= 0)
+        won |= killed
+        rounds = np.where(killed, round_no, rounds)
+        done |= killed
+        active &= ~killed
+        
+        # ---------- Хід монстра ----------
+        blocked = active & shield
+        shield &= ~blocked
+        attacking = active & ~blocked
+        
+        md20, mtotal, mcritical = attack_roll(rng, n, m_attack_bonus)
+        m_hit = attacking & (md20 != 1) & ((mtotal >= profile.armor_class) | mcritical)
+        p_hp = p_hp - np.where(m_hit, np.where(mcritical, m_damage * 2, m_damage), 0)
+        
+        died = active & (p_hp <= 0)
+        rounds = np.where(died, round_no, rounds)
+        done |= died
+        active &= ~died
+        
+        # ---------- Кінець раунду: отрута ----------
+        poisoned = active & (poison_stacks > 0)
+        m_hp = m_hp - np.where(poisoned, poison_damage, 0)
+        poison_stacks = poison_stacks - poisoned
+        killed = poisoned & (m_hp <= 0)
+        won |= killed
+        rounds = np.where(killed, round_no, rounds)
+        done |= killed
+    
+    return won, rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NumPy Monte Carlo балансу Venterra")
+    parser.add_argument("--fights", type=int, default=100000, help="Боїв на клітинку таблиці")
+    parser.add_argument("--classes", nargs="+", default=CharacterClass.ALL)
+    parser.add_argument("--locations", nargs="+",
+                        default=[k for k in LOCATIONS if get_encounter_table(k).encounters])
+    parser.add_argument("--levels", nargs="+", type=int, default=[1, 3, 5])
+    parser.add_argument("--weapon", choices=sorted(WEAPONS), help="Зброя гравця (за замовчуванням - без зброї)")
+    parser.add_argument("--max-rounds", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=12345)
+    parser.add_argument("--compare", action="store_true",
+                        help="Заміряти покроковий рушій на тій самій клітинці")
+    args = parser.parse_args()
+    
+    print(f"{'клас':<9} {'локація':<10} {'рів':>3} {'перемог':>8} {'TTK':>6} {'раундів':>8} {'боїв/с':>11}")
+    print("-" * 62)
+    
+    total_fights = 0
+    started = time.perf_counter()
+    
+    for class_index, character_class in enumerate(args.classes):
+        for level in args.levels:
+            profile = PlayerProfile(build_player(character_class, level, args.weapon))
+            for location_index, location_id in enumerate(args.locations):
+                # Окремий незалежний потік на клітинку - порядок запуску не впливає
+                rng = np.random.default_rng([args.seed, class_index, location_index, level])
+                
+                t0 = time.perf_counter()
+                won, rounds = simulate(profile, location_id, args.fights, rng, args.max_rounds)
+                elapsed = time.perf_counter() - t0
+                total_fights += args.fights
+                
+                ttk = rounds[won].mean() if won.any() else float("nan")
+                print(
+                    f"{character_class:<9} {location_id:<10} {level:>3} "
+                    f"{won.mean():>7.1%} {ttk:>6.1f} {rounds.mean():>8.1f} "
+                    f"{args.fights / elapsed:>11.0f}"
+                )
+    
+    elapsed = time.perf_counter() - started
+    print("-" * 62)
+    print(f"Всього: {total_fights} боїв за {elapsed:.2f} с ({total_fights / elapsed:,.0f} боїв/с)")
+    
+    if args.compare:
+        character_class, level = args.classes[0], args.levels[0]
+        location_id = args.locations[0]
+        location = LOCATIONS[location_id]
+        sample = min(args.fights, 5000)
+        
+        player = build_player(character_class, level, args.weapon)
+        monster = Monster(encounter_entries(location_id)[0]["monster"], location["level_required"])
+        t0 = time.perf_counter()
+        run_fights(player, monster, sample, args.max_rounds)
+        loop_rate = sample / (time.perf_counter() - t0)
+        
+        profile = PlayerProfile(build_player(character_class, level, args.weapon))
+        rng = np.random.default_rng(args.seed)
+        t0 = time.perf_counter()
+        simulate(profile, location_id, args.fights, rng, args.max_rounds)
+        numpy_rate = args.fights / (time.perf_counter() - t0)
+        
+        print(f"\nПокроковий рушій: {loop_rate:,.0f} боїв/с")
+        print(f"NumPy:            {numpy_rate:,.0f} боїв/с  (×{numpy_rate / loop_rate:.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+﻿# scripts/bench_dice.py - Бенчмарк парсера виразів кубиків
+#
+# Порівнює три варіанти кидка за рядком:
+#   split  - старий damage_roll: split("d") на кожен удар (лише NdM);
+#   parse  - новий парсер без кешу на кожен кидок;
+#   cached - compile_dice (LRU) + DicePlan.roll.
+#
+# Запуск: python scripts/bench_dice.py [--number 100000]
+
+import argparse
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DEBUG_MODE", "true")
+
+from src.config.equipment import WEAPONS
+from src.utils.dice import DiceRoller, _parse_dice, compile_dice
+from src.utils.rng import GameRNG
+
+EXPRESSIONS = sorted({w["damage_dice"] for w in WEAPONS.values()}) + [
+    "2d6+3",
+    "1d20kh1",
+    "4d6kh3",
+    "1d8+1d4-1",
+]
+
+
+def split_roll(expression: str, rng: GameRNG):
+    """Як damage_roll робив раніше"""
+    count, sides = expression.split("d")
+    return DiceRoller.roll(int(sides), int(count), rng)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк виразів кубиків")
+    parser.add_argument("--number", type=int, default=100000, help="Кидків на вираз")
+    args = parser.parse_args()
+    
+    rng = GameRNG(1)
+    print(f"{'вираз':<12} {'split':>10} {'parse':>10} {'cached':>10} {'parse/cached':>13}")
+    
+    for expression in EXPRESSIONS:
+        simple = "d" in expression and expression.replace("d", "").isdigit()
+        
+        split_us = None
+        if simple:
+            split_us = timeit.timeit(lambda: split_roll(expression, rng), number=args.number) / args.number * 1e6
+        parse_us = timeit.timeit(lambda: _parse_dice(expression).roll(rng), number=args.number) / args.number * 1e6
+        cached_us = timeit.timeit(lambda: compile_dice(expression).roll(rng), number=args.number) / args.number * 1e6
+        
+        split_text = f"{split_us:>7.2f} µs" if split_us is not None else f"{'-':>10}"
+        print(
+            f"{expression:<12} {split_text} {parse_us:>7.2f} µs {cached_us:>7.2f} µs "
+            f"{parse_us / cached_us:>12.1f}x"
+        )
+    
+    print(f"\nКеш планів: {compile_dice.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
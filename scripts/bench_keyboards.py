@@ -0,0 +1,70 @@
+﻿# scripts/bench_keyboards.py - Бенчмарк кешу клавіатур
+#
+# Порівнює побудову розмітки на кожен виклик (як було раніше)
+# з поверненням закешованих заморожених екземплярів.
+#
+# Запуск: python scripts/bench_keyboards.py [--number 20000]
+
+import argparse
+import inspect
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DEBUG_MODE", "true")
+
+from src.ui import keyboards
+from src.handlers.battle import (
+    BattleState, get_battle_keyboard, _battle_ability_flags, _build_battle_keyboard
+)
+from src.models.player import Player
+from src.models.monster import Monster
+
+
+STATIC_KEYBOARDS = [
+    "get_city_keyboard",
+    "get_adventure_main_keyboard",
+    "get_class_selection_keyboard",
+    "get_character_keyboard",
+]
+
+
+def bench(label: str, uncached, cached, number: int):
+    """Друкує час на виклик для обох варіантів"""
+    base = timeit.timeit(uncached, number=number) / number * 1e6
+    fast = timeit.timeit(cached, number=number) / number * 1e6
+    print(f"{label:<32} {base:>10.2f} µs {fast:>10.3f} µs {base / fast:>9.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк кешу клавіатур")
+    parser.add_argument("--number", type=int, default=20000, help="Кількість викликів")
+    args = parser.parse_args()
+    
+    print(f"{'Клавіатура':<32} {'щоразу':>13} {'кеш':>13} {'прискорення':>10}")
+    
+    for name in STATIC_KEYBOARDS:
+        func = getattr(keyboards, name)
+        bench(name, inspect.unwrap(func), func, args.number)
+    
+    for character_class in ("warrior", "mage", "paladin", "rogue"):
+        player = Player(user_id=0, character_class=character_class)
+        state = BattleState(player, Monster("skeleton", 3))
+        
+        def uncached():
+            # Те саме, що робив get_battle_keyboard до кешу
+            return inspect.unwrap(_build_battle_keyboard)(
+                _battle_ability_flags(player, state),
+                bool(player.inventory)
+            )
+        
+        bench(f"get_battle_keyboard[{character_class}]", uncached,
+              lambda: get_battle_keyboard(player, state), args.number)
+    
+    print(f"\nКеш клавіатур бою: {_build_battle_keyboard.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
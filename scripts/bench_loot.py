@@ -0,0 +1,96 @@
+﻿# scripts/bench_loot.py - Бенчмарк і баланс рушія луту
+#
+# Для кожного монстра порівнює швидкість генерації луту за вбивство:
+#   legacy - старий get_loot: 70% на кожен рядок loot з MONSTER_BASE_STATS;
+#   linear - ті самі таблиці, але вибір лінійним пошуком за сумами ваг;
+#   alias  - roll_loot (AliasSampler, O(1) на кидок).
+# І показує баланс: предметів і золота (ціна продажу) за вбивство,
+# частку спорядження.
+#
+# Запуск: python scripts/bench_loot.py [--kills 100000] [--level 3] [--seed 1]
+
+import argparse
+import bisect
+import itertools
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DEBUG_MODE", "true")
+
+from src.config.constants import MONSTER_BASE_STATS
+from src.config.loot import LOOT_TABLES, LootKind, EQUIPMENT_LEVEL_MARGIN, get_sell_price
+from src.utils.loot import make_material, roll_equipment, roll_loot
+from src.utils.rng import GameRNG
+
+
+def legacy_loot(monster_type: str, rng: GameRNG) -> list:
+    """Як Monster.get_loot працював раніше"""
+    return [item for item in MONSTER_BASE_STATS[monster_type]["loot"] if rng.random() < 0.7]
+
+
+def make_linear(monster_type: str):
+    """Та сама таблиця з вибором через накопичені ваги (O(log n) / O(n))"""
+    table = LOOT_TABLES[monster_type]
+    drops = table["drops"]
+    cumulative = list(itertools.accumulate(drop["weight"] for drop in drops))
+    total = cumulative[-1]
+    
+    def roll(level: int, rng: GameRNG) -> list:
+        loot = []
+        for _ in range(table.get("rolls", 1)):
+            drop = drops[bisect.bisect_right(cumulative, rng.random() * total)]
+            if drop["kind"] == LootKind.MATERIAL:
+                loot.append(make_material(drop["id"]))
+            elif drop["kind"] == LootKind.EQUIPMENT:
+                item = roll_equipment(level + EQUIPMENT_LEVEL_MARGIN, rng)
+                if item:
+                    loot.append(item)
+        return loot
+    
+    return roll
+
+
+def kills_per_second(roll, kills: int) -> float:
+    start = time.perf_counter()
+    for _ in range(kills):
+        roll()
+    return kills / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк рушія луту")
+    parser.add_argument("--kills", type=int, default=100000, help="Вбивств на монстра")
+    parser.add_argument("--level", type=int, default=3, help="Рівень монстрів")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    
+    rng = GameRNG(args.seed)
+    level = args.level
+    
+    print(f"{'монстр':<10} {'legacy':>12} {'linear':>12} {'alias':>12}   {'предм.':>6} {'💰/вбивство':>11} {'спорядж.':>9}")
+    
+    for monster_type in LOOT_TABLES:
+        linear = make_linear(monster_type)
+        
+        legacy_kps = kills_per_second(lambda: legacy_loot(monster_type, rng), args.kills)
+        linear_kps = kills_per_second(lambda: linear(level, rng), args.kills)
+        alias_kps = kills_per_second(lambda: roll_loot(monster_type, level, rng), args.kills)
+        
+        items = value = equipment = 0
+        for _ in range(args.kills):
+            for item in roll_loot(monster_type, level, rng):
+                items += 1
+                value += get_sell_price(item)
+                equipment += item.get("type") != LootKind.MATERIAL
+        
+        print(
+            f"{monster_type:<10} {legacy_kps:>10,.0f}/с {linear_kps:>10,.0f}/с {alias_kps:>10,.0f}/с   "
+            f"{items / args.kills:>6.2f} {value / args.kills:>11.1f} {equipment / max(items, 1):>8.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+﻿# scripts/bench_startup.py - Бенчмарк часу імпорту (python -X importtime)
+#
+# Кожен прогін - окремий процес "python -X importtime -c 'import <модуль>'".
+# Беремо мінімум за прогонами (найменше шуму від диска і планувальника)
+# і показуємо:
+#   - загальний час імпорту модуля і час процесу;
+#   - власний час модулів src.* (решта - aiogram, aiohttp, pydantic);
+#   - найдорожчі модулі за накопиченим часом.
+#
+# Запуск: python scripts/bench_startup.py [main src.handlers ...] [--repeat 5] [--top 15]
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_importtime(module: str) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    """
+    Один процес з -X importtime
+    
+    Returns:
+        (секунд на процес, {модуль: (власний мкс, накопичений мкс)})
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=os.environ.copy(), capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} завершився з помилкою:\n{result.stderr[-2000:]}")
+    
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(own), int(cumulative))
+    return elapsed, timings
+
+
+def bench_module(module: str, repeat: int, top: int) -> List[str]:
+    runs = [run_importtime(module) for _ in range(repeat)]
+    
+    # Мінімум по кожному модулю окремо
+    best: Dict[str, Tuple[int, int]] = {}
+    for _, timings in runs:
+        for name, (own, cumulative) in timings.items():
+            if name not in best or cumulative < best[name][1]:
+                best[name] = (own, cumulative)
+    
+    process = min(elapsed for elapsed, _ in runs)
+    total = best.get(module, (0, 0))[1]
+    ours = sum(own for name, (own, _) in best.items() if name == "main" or name.startswith("src"))
+    
+    lines = [
+        f"import {module}: {total / 1000:.1f} мс (процес {process * 1000:.0f} мс, прогонів: {repeat})",
+        f"  власний час src.*: {ours / 1000:.1f} мс, решта - залежності",
+        "  найдорожчі за накопиченим часом:",
+    ]
+    ranked = sorted(best.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (own, cumulative) in ranked[1:top + 1]:
+        lines.append(f"    {cumulative / 1000:8.1f} мс  (власний {own / 1000:6.1f})  {name}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк часу імпорту")
+    parser.add_argument("modules", nargs="*", default=["main"], help="Модулі для імпорту")
+    parser.add_argument("--repeat", type=int, default=5, help="Прогонів на модуль")
+    parser.add_argument("--top", type=int, default=15, help="Скільки модулів показати")
+    args = parser.parse_args()
+    
+    baseline = min(run_importtime("sys")[0] for _ in range(args.repeat))
+    print(f"Порожній інтерпретатор: {baseline * 1000:.0f} мс\n")
+    
+    for module in args.modules:
+        print("\n".join(bench_module(module, args.repeat, args.top)))
+        print()
+
+
+if __name__ == "__main__":
+    main()
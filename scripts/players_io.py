@@ -0,0 +1,403 @@
+﻿# scripts/players_io.py - Вивантаження, завантаження і знімки таблиці гравців
+#
+# export   - players -> NDJSON (рядок JSON на гравця) або компактний
+#            бінарний формат VPL1. Читання сторінками по первинному ключу
+#            (WHERE user_id > ? LIMIT n): пам'ять не росте з кількістю
+#            гравців, і кожна сторінка - окрема коротка транзакція, тож
+#            бот, що працює, не чекає на весь експорт.
+# import   - файл -> players (upsert за user_id) потоково, пачками
+#            executemany в одній транзакції: або весь файл, або нічого.
+#            Транзакція тримає блокування запису до кінця файлу, тож
+#            запускати лише при зупиненому боті: інакше його save_player
+#            отримають "database is locked". З --chunked кожна пачка -
+#            окрема транзакція, і бот пише між ними; при помилці вже
+#            записані пачки лишаються (upsert - повторний запуск безпечний).
+#            Схема спершу доводиться до актуальної міграціями. Бот, що
+#            працює, побачить імпортованих у таблицях лідерів після рестарту.
+# snapshot - копія всієї бази через онлайн-бекап SQLite
+#            (sqlite3.Connection.backup) кроками по --pages сторінок:
+#            між кроками блокування знімається, і бот продовжує писати.
+#
+# Формат за розширенням: .ndjson/.jsonl - NDJSON, .vpl - VPL1;
+# .gz у кінці - стиснення gzip; "-" - stdout/stdin (потрібен --format).
+#
+# Експорт сторінками не є знімком на одну мить (гравці між сторінками
+# можуть змінитися). Для узгодженої вибірки: спершу snapshot, потім
+# export --db <знімок>.
+#
+# Запуск:
+#   python scripts/players_io.py export players.ndjson.gz
+#   python scripts/players_io.py export players.vpl --batch 5000
+#   python scripts/players_io.py import players.vpl --db restored.db
+#   python scripts/players_io.py import players.ndjson --skip-existing
+#   python scripts/players_io.py import players.ndjson.gz --chunked   # поруч із ботом
+#   python scripts/players_io.py snapshot backups/game-2026-10-19.db --pages 512
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sqlite3
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, List, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DEBUG_MODE", "true")
+
+from src.config.settings import settings
+from src.database import Database
+
+FORMATS = ("ndjson", "vpl")
+FORMAT_SUFFIXES = {".ndjson": "ndjson", ".jsonl": "ndjson", ".vpl": "vpl"}
+
+# ==================== VPL1 ====================
+#
+# Заголовок: b"VPL1", u16 кількість колонок, для кожної - u8 довжина + ім'я (UTF-8).
+# Рядок: b"\x01", далі значення по колонках у тому ж порядку.
+# Кінець: b"\x00" (без нього файл вважається обрізаним).
+# Значення: тег u8 + дані, little-endian:
+#   0 NULL, 1 ціле (i64), 2 дійсне (f64), 3 текст (u32 довжина + UTF-8), 4 blob (u32 + байти)
+
+VPL_MAGIC = b"VPL1"
+ROW_MARK = b"\x01"
+END_MARK = b"\x00"
+
+TAG_NULL, TAG_INT, TAG_REAL, TAG_TEXT, TAG_BLOB = range(5)
+
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+
+
+def _encode_value(value: Any, out: bytearray):
+    if value is None:
+        out += _U8.pack(TAG_NULL)
+    elif isinstance(value, int):
+        out += _U8.pack(TAG_INT) + _I64.pack(value)
+    elif isinstance(value, float):
+        out += _U8.pack(TAG_REAL) + _F64.pack(value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out += _U8.pack(TAG_TEXT) + _U32.pack(len(data)) + data
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        out += _U8.pack(TAG_BLOB) + _U32.pack(len(data)) + data
+    else:
+        raise TypeError(f"Непідтримуваний тип {type(value).__name__}")
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError("Файл VPL1 обрізано")
+    return data
+
+
+def _decode_value(stream: BinaryIO) -> Any:
+    tag = _read_exact(stream, 1)[0]
+    if tag == TAG_NULL:
+        return None
+    if tag == TAG_INT:
+        return _I64.unpack(_read_exact(stream, 8))[0]
+    if tag == TAG_REAL:
+        return _F64.unpack(_read_exact(stream, 8))[0]
+    if tag in (TAG_TEXT, TAG_BLOB):
+        data = _read_exact(stream, _U32.unpack(_read_exact(stream, 4))[0])
+        return data.decode("utf-8") if tag == TAG_TEXT else data
+    raise ValueError(f"Невідомий тег значення {tag}")
+
+
+class VplWriter:
+    def __init__(self, stream: BinaryIO, columns: Sequence[str]):
+        self.stream = stream
+        header = bytearray(VPL_MAGIC + _U16.pack(len(columns)))
+        for column in columns:
+            name = column.encode("utf-8")
+            header += _U8.pack(len(name)) + name
+        stream.write(header)
+    
+    def write_rows(self, rows: Sequence[Sequence[Any]]):
+        out = bytearray()
+        for row in rows:
+            out += ROW_MARK
+            for value in row:
+                _encode_value(value, out)
+        self.stream.write(out)
+    
+    def close(self):
+        self.stream.write(END_MARK)
+
+
+def read_vpl(stream: BinaryIO) -> Tuple[List[str], Iterator[tuple]]:
+    """Колонки і ітератор рядків (читає потоково)"""
+    if _read_exact(stream, 4) != VPL_MAGIC:
+        raise ValueError("Це не файл VPL1")
+    count = _U16.unpack(_read_exact(stream, 2))[0]
+    columns = [
+        _read_exact(stream, _read_exact(stream, 1)[0]).decode("utf-8")
+        for _ in range(count)
+    ]
+    
+    def rows() -> Iterator[tuple]:
+        while True:
+            mark = _read_exact(stream, 1)
+            if mark == END_MARK:
+                return
+            if mark != ROW_MARK:
+                raise ValueError("Пошкоджений файл VPL1")
+            yield tuple(_decode_value(stream) for _ in range(count))
+    
+    return columns, rows()
+
+
+# ==================== NDJSON ====================
+
+class NdjsonWriter:
+    def __init__(self, stream: BinaryIO, columns: Sequence[str]):
+        self.stream = stream
+        self.columns = list(columns)
+    
+    def write_rows(self, rows: Sequence[Sequence[Any]]):
+        lines = [
+            json.dumps(dict(zip(self.columns, row)), ensure_ascii=False, separators=(",", ":"))
+            for row in rows
+        ]
+        self.stream.write(("\n".join(lines) + "\n").encode("utf-8"))
+    
+    def close(self):
+        pass
+
+
+def read_ndjson(stream: BinaryIO, columns: Sequence[str]) -> Iterator[tuple]:
+    """Рядки у порядку columns (відсутні ключі - NULL)"""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Рядок {line_number}: {e}") from None
+        yield tuple(record.get(column) for column in columns)
+
+
+def peek_ndjson_columns(path: str) -> List[str]:
+    """Колонки з першого запису (формат без заголовка)"""
+    with open_stream(path, "rb") as stream:
+        for line in stream:
+            if line.strip():
+                return list(json.loads(line))
+    return []
+
+
+# ==================== ФАЙЛИ ====================
+
+def detect_format(path: str, explicit: str = None) -> str:
+    if explicit:
+        return explicit
+    name = path[:-3] if path.endswith(".gz") else path
+    fmt = FORMAT_SUFFIXES.get(Path(name).suffix)
+    if fmt is None:
+        raise SystemExit(f"Не вдалося визначити формат {path} - вкажіть --format")
+    return fmt
+
+
+def open_stream(path: str, mode: str) -> BinaryIO:
+    if path == "-":
+        stream = sys.stdout.buffer if "w" in mode else sys.stdin.buffer
+        return os.fdopen(os.dup(stream.fileno()), mode)
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, compresslevel=6)
+    return open(path, mode, buffering=1 << 16)
+
+
+def table_columns(conn: sqlite3.Connection) -> List[str]:
+    return [row[1] for row in conn.execute("PRAGMA table_info(players)")]
+
+
+# ==================== КОМАНДИ ====================
+
+def export_players(db_path: str, out_path: str, fmt: str, batch: int) -> int:
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=30)
+    try:
+        columns = table_columns(conn)
+        if not columns:
+            raise SystemExit(f"У {db_path} немає таблиці players")
+        key_index = columns.index("user_id")
+        select_sql = f"SELECT * FROM players WHERE user_id > ? ORDER BY user_id LIMIT {int(batch)}"
+        
+        total = 0
+        with open_stream(out_path, "wb") as stream:
+            writer = (VplWriter if fmt == "vpl" else NdjsonWriter)(stream, columns)
+            last_key = -(1 << 63)
+            while True:
+                rows = conn.execute(select_sql, (last_key,)).fetchall()
+                if not rows:
+                    break
+                writer.write_rows(rows)
+                total += len(rows)
+                last_key = rows[-1][key_index]
+            writer.close()
+        return total
+    finally:
+        conn.close()
+
+
+def _batched(rows: Iterator[tuple], size: int) -> Iterator[List[tuple]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_players(db_path: str, in_path: str, fmt: str, batch: int, skip_existing: bool,
+                   chunked: bool = False, sleep: float = 0.0) -> int:
+    # Порожня чи стара база - спершу схема
+    db = Database()
+    db.db_path = db_path
+    asyncio.run(db.init_db())
+    
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    try:
+        known = set(table_columns(conn))
+        
+        with open_stream(in_path, "rb") as stream:
+            if fmt == "vpl":
+                file_columns, rows = read_vpl(stream)
+            else:
+                # stdin не перечитаєш - тоді беремо всі колонки таблиці
+                file_columns = peek_ndjson_columns(in_path) if in_path != "-" else table_columns(conn)
+                rows = read_ndjson(stream, file_columns)
+            
+            if "user_id" not in file_columns:
+                raise SystemExit("У файлі немає колонки user_id")
+            
+            # Колонки, яких немає в схемі, пропускаємо
+            keep = [i for i, column in enumerate(file_columns) if column in known]
+            columns = [file_columns[i] for i in keep]
+            if len(keep) != len(file_columns):
+                skipped = sorted(set(file_columns) - known)
+                print(f"Пропущено невідомі колонки: {', '.join(skipped)}", file=sys.stderr)
+            
+            updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "user_id")
+            if skip_existing or not updates:
+                conflict_sql = "ON CONFLICT(user_id) DO NOTHING"
+            else:
+                conflict_sql = f"ON CONFLICT(user_id) DO UPDATE SET {updates}"
+            insert_sql = (
+                f"INSERT INTO players ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))}) {conflict_sql}"
+            )
+            
+            total = 0
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for chunk in _batched(rows, batch):
+                    if len(keep) != len(file_columns):
+                        chunk = [tuple(row[i] for i in keep) for row in chunk]
+                    conn.executemany(insert_sql, chunk)
+                    total += len(chunk)
+                    if chunked:
+                        # Пачка записана - блокування знімається, бот може писати
+                        conn.execute("COMMIT")
+                        time.sleep(sleep)
+                        conn.execute("BEGIN IMMEDIATE")
+                conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        return total
+    finally:
+        conn.close()
+
+
+def snapshot_database(db_path: str, out_path: str, pages: int, sleep: float) -> int:
+    """Онлайн-бекап у тимчасовий файл, потім атомарне перейменування"""
+    tmp_path = f"{out_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    
+    src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=30)
+    dst = sqlite3.connect(tmp_path)
+    progress = {"pages": 0}
+    
+    def on_progress(status: int, remaining: int, total: int):
+        progress["pages"] = total
+    
+    try:
+        src.backup(dst, pages=pages, progress=on_progress, sleep=sleep)
+    except BaseException:
+        dst.close()
+        os.remove(tmp_path)
+        raise
+    finally:
+        src.close()
+    dst.close()
+    
+    os.replace(tmp_path, out_path)
+    return progress["pages"]
+
+
+def main():
+    db_help = "Файл бази (за замовчуванням - DATABASE_PATH)"
+    parser = argparse.ArgumentParser(description="Експорт/імпорт гравців і знімки бази")
+    parser.add_argument("--db", default=settings.DATABASE_PATH, help=db_help)
+    # --db і після команди; SUPPRESS - щоб підкоманда не затирала значення до неї
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default=argparse.SUPPRESS, help=db_help)
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    export_cmd = commands.add_parser("export", parents=[common], help="players -> файл")
+    export_cmd.add_argument("path")
+    export_cmd.add_argument("--format", choices=FORMATS)
+    export_cmd.add_argument("--batch", type=int, default=1000, help="Гравців на сторінку")
+    
+    import_cmd = commands.add_parser("import", parents=[common], help="файл -> players (upsert)")
+    import_cmd.add_argument("path")
+    import_cmd.add_argument("--format", choices=FORMATS)
+    import_cmd.add_argument("--batch", type=int, default=1000, help="Гравців на executemany")
+    import_cmd.add_argument("--skip-existing", action="store_true", help="Не перезаписувати наявних гравців")
+    import_cmd.add_argument("--chunked", action="store_true",
+                            help="Транзакція на пачку (бот може працювати); без нього - весь файл або нічого")
+    # Очікування блокування в SQLite опитує до кожних 100 мс: коротша пауза бота майже не пропускає
+    import_cmd.add_argument("--sleep", type=float, default=0.05, help="Пауза між пачками з --chunked, с")
+    
+    snapshot_cmd = commands.add_parser("snapshot", parents=[common], help="Онлайн-копія всієї бази")
+    snapshot_cmd.add_argument("path")
+    snapshot_cmd.add_argument("--pages", type=int, default=256, help="Сторінок за крок бекапу")
+    snapshot_cmd.add_argument("--sleep", type=float, default=0.005, help="Пауза між кроками, с")
+    
+    args = parser.parse_args()
+    start = time.perf_counter()
+    
+    try:
+        if args.command == "export":
+            count = export_players(args.db, args.path, detect_format(args.path, args.format), args.batch)
+            unit = "гравців"
+        elif args.command == "import":
+            count = import_players(args.db, args.path, detect_format(args.path, args.format),
+                                   args.batch, args.skip_existing, args.chunked, args.sleep)
+            unit = "гравців"
+        else:
+            count = snapshot_database(args.db, args.path, args.pages, args.sleep)
+            unit = "сторінок"
+    except (ValueError, sqlite3.Error) as e:
+        raise SystemExit(f"❌ {args.command}: {e}")
+    
+    elapsed = time.perf_counter() - start
+    print(f"{args.command}: {count} {unit} за {elapsed:.2f} с ({count / max(elapsed, 1e-9):,.0f}/с)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
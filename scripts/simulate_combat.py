@@ -0,0 +1,122 @@
+﻿# scripts/simulate_combat.py - Офлайн-симулятор боїв
+#
+# Ганяє бойовий рушій (src/utils/combat.py) без Telegram і пауз:
+# для кожної комбінації клас × монстр × рівень рахує відсоток перемог,
+# середню кількість раундів та швидкість (боїв/с).
+#
+# Запуск:
+#   python scripts/simulate_combat.py --fights 10000
+#   python scripts/simulate_combat.py --classes mage rogue --monsters skeleton --levels 1 3 5
+#   python scripts/simulate_combat.py --weapon rusty_sword --seed 42
+#   python scripts/simulate_combat.py --rng buffered   # блокова передвибірка кидків
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DEBUG_MODE", "true")
+
+from src.config.constants import CharacterClass, MONSTER_BASE_STATS
+from src.config.equipment import WEAPONS
+from src.models.player import Player
+from src.models.monster import Monster
+from src.utils.combat import BattleState, auto_battle
+from src.utils.rng import BufferedRNG, GameRNG, set_rng
+
+# Куди симульований гравець вкладає вільні очки
+PRIMARY_STAT = {
+    CharacterClass.WARRIOR: "strength",
+    CharacterClass.MAGE: "intelligence",
+    CharacterClass.PALADIN: "stamina",
+    CharacterClass.ROGUE: "agility",
+}
+
+
+def build_player(character_class: str, level: int, weapon_id: str = None) -> Player:
+    """Персонаж заданого рівня з очками в головній характеристиці"""
+    player = Player(0, "sim", "Sim", character_class)
+    for _ in range(level - 1):
+        player.level_up()
+    while player.free_points > 0:
+        player.add_stat(PRIMARY_STAT[character_class])
+    if weapon_id:
+        player.equipment["weapon"] = dict(WEAPONS[weapon_id])
+    return player
+
+
+def run_fights(player: Player, monster: Monster, fights: int, max_rounds: int):
+    """
+    Проводить серію боїв (гравець і монстр відновлюються перед кожним)
+    
+    Returns:
+        (перемоги, сума раундів)
+    """
+    wins = 0
+    total_rounds = 0
+    
+    for _ in range(fights):
+        player.health = player.max_health
+        player.mana = player.max_mana
+        monster.health = monster.max_health
+        state = BattleState(player, monster)
+        
+        # Та сама політика, що й у кнопки "Автобій" (зілль у симуляції немає)
+        result = auto_battle(state, potion_threshold=0, max_rounds=max_rounds)
+        if result["outcome"] == "victory":
+            wins += 1
+        
+        total_rounds += result["rounds"]
+    
+    return wins, total_rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Симулятор боїв Venterra")
+    parser.add_argument("--fights", type=int, default=2000, help="Боїв на комбінацію")
+    parser.add_argument("--classes", nargs="+", default=CharacterClass.ALL)
+    parser.add_argument("--monsters", nargs="+", default=list(MONSTER_BASE_STATS))
+    parser.add_argument("--levels", nargs="+", type=int, default=[1, 3, 5])
+    parser.add_argument("--weapon", choices=sorted(WEAPONS), help="Зброя гравця (за замовчуванням - без зброї)")
+    parser.add_argument("--max-rounds", type=int, default=50, help="Після цього бій вважається поразкою")
+    parser.add_argument("--seed", type=int, help="Seed для відтворюваності")
+    parser.add_argument("--rng", choices=["default", "buffered"], default="default",
+                        help="buffered - кидки з передвибраного блоку getrandbits")
+    args = parser.parse_args()
+    
+    # Кожен бій отримує дочірній потік глобального генератора (BattleState.rng)
+    rng_class = BufferedRNG if args.rng == "buffered" else GameRNG
+    set_rng(rng_class(args.seed))
+    
+    print(f"{'клас':<9} {'монстр':<9} {'рів':>3} {'перемог':>8} {'раундів':>8} {'боїв/с':>9}")
+    print("-" * 52)
+    
+    total_fights = 0
+    started = time.perf_counter()
+    
+    for character_class in args.classes:
+        for level in args.levels:
+            player = build_player(character_class, level, args.weapon)
+            for monster_type in args.monsters:
+                monster = Monster(monster_type, level)
+                
+                t0 = time.perf_counter()
+                wins, rounds = run_fights(player, monster, args.fights, args.max_rounds)
+                elapsed = time.perf_counter() - t0
+                
+                total_fights += args.fights
+                print(
+                    f"{character_class:<9} {monster_type:<9} {level:>3} "
+                    f"{wins / args.fights:>7.1%} {rounds / args.fights:>8.1f} "
+                    f"{args.fights / elapsed:>9.0f}"
+                )
+    
+    elapsed = time.perf_counter() - started
+    print("-" * 52)
+    print(f"Всього: {total_fights} боїв за {elapsed:.1f} с ({total_fights / elapsed:.0f} боїв/с)")
+
+
+if __name__ == "__main__":
+    main()
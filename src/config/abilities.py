@@ -0,0 +1,146 @@
+﻿# src/config/abilities.py - Реєстр навичок класів
+#
+# Кожна навичка описана даними: вартість, ліміт за бій, кубики, ефект.
+# Рушій (src/utils/combat.py) знаходить обробник за полем "effect",
+# тож нова навичка - це новий запис тут, а не нова гілка if/elif.
+
+from typing import Dict, Any, List
+
+from src.config.constants import CharacterClass
+
+# Монстри, проти яких працює "Знищення нежиті"
+UNDEAD_TYPES = ("skeleton", "zombie", "ghost", "vampire")
+
+
+class AbilityEffect:
+    """Типи ефектів (ключі обробників у combat.py)"""
+    SPELL_DAMAGE = "spell_damage"            # Кубики + бонус характеристики, без кидка атаки
+    WEAPON_MULTIPLIER = "weapon_multiplier"  # Удар зброєю × multiplier
+    POISON_ATTACK = "poison_attack"          # Кидок атаки, при влучанні - отрута
+    APPLY_STATUS = "apply_status"            # Лише накладає статус (щит, баф)
+    DICE_DAMAGE = "dice_damage"              # Чисті кубики урону
+
+
+class StatusKind:
+    """Види статус-ефектів бою (src/utils/status_effects.py)"""
+    DOT = "dot"                      # Урон щокінця раунду (value - урон за тік)
+    BLOCK = "block"                  # Блокує атаки цілі (remaining - заряди, а не раунди)
+    AC_BONUS = "ac_bonus"            # + до AC цілі
+    DEFENSE_BONUS = "defense_bonus"  # + до захисту цілі
+    STUN = "stun"                    # Ціль пропускає свою атаку
+
+
+class StatusTarget:
+    """На кого діє статус"""
+    PLAYER = "player"
+    MONSTER = "monster"
+
+
+# Порядок записів = порядок кнопок у бою
+ABILITIES: Dict[str, Dict[str, Any]] = {
+    # ========== ВОЇН ==========
+    "mighty_strike": {
+        "class": CharacterClass.WARRIOR,
+        "name": "💪 Могутній удар",
+        "title": "Могутній удар",
+        "description": "Наносить подвійний урон",
+        "mana_cost": 6,
+        "cost_type": "mana",
+        "effect": AbilityEffect.WEAPON_MULTIPLIER,
+        "stat": "strength",
+        "multiplier": 2.5,
+        "uses_per_battle": 1,
+        "use_text": "⚔️ Ви використовуєте Могутній удар!",
+        "show_when_no_mana": True,  # Кнопка "мало мани" замість зникнення
+        "priority": 1,
+    },
+    
+    # ========== МАГ ==========
+    "fireball": {
+        "class": CharacterClass.MAGE,
+        "name": "🔥 Вогняний шар",
+        "title": "Вогняний шар",
+        "description": "Магічна атака (2d6 + Інтелект урону)",
+        "mana_cost": 5,
+        "cost_type": "mana",
+        "effect": AbilityEffect.SPELL_DAMAGE,
+        "stat": "intelligence",
+        "dice": "2d6",
+        "uses_per_battle": 3,
+        "use_text": "🔥 Ви використовуєте Вогняний шар!",
+        "priority": 1,
+    },
+    
+    # ========== ПАЛАДИН ==========
+    "divine_shield": {
+        "class": CharacterClass.PALADIN,
+        "name": "✨ Божественний щит",
+        "title": "Божественний щит",
+        "description": "Блокує наступну атаку ворога",
+        "mana_cost": 5,
+        "cost_type": "mana",
+        "effect": AbilityEffect.APPLY_STATUS,
+        "status": {
+            "id": "divine_shield", "kind": StatusKind.BLOCK, "target": StatusTarget.PLAYER,
+            "duration": 1, "name": "Божественний щит", "icon": "✨",
+        },
+        "active_message": "❌ Щит вже активний!",
+        "use_text": "✨ Ви активуєте Божественний щит!",
+        "status_text": "🛡️ Наступна атака монстра буде заблокована",
+        "priority": 2,
+    },
+    "smite_undead": {
+        "class": CharacterClass.PALADIN,
+        "name": "⚡ Знищення нежиті",
+        "title": "Знищення нежиті",
+        "description": "1d20 урону по нежиті",
+        "mana_cost": 5,
+        "cost_type": "mana",
+        "effect": AbilityEffect.DICE_DAMAGE,
+        "dice": "1d20",
+        "damage_label": "святого урону",
+        "uses_per_battle": 3,
+        "target_types": UNDEAD_TYPES,
+        "target_message": "❌ Ця здібність працює лише проти нежиті!",
+        "use_text": "⚡ Ви використовуєте Знищення нежиті!",
+        "priority": 1,
+    },
+    
+    # ========== РОЗБІЙНИК ==========
+    "poison_strike": {
+        "class": CharacterClass.ROGUE,
+        "name": "🗡️☠️ Ядовитий удар",
+        "title": "Ядовитий удар",
+        "description": "Атака з отрутою (1d4 урону 3 ходи)",
+        "mana_cost": 4,
+        "cost_type": "mana",
+        "effect": AbilityEffect.POISON_ATTACK,
+        "stat": "agility",
+        # Повторне використання оновлює отруту (refresh)
+        "status": {
+            "id": "poison", "kind": StatusKind.DOT, "target": StatusTarget.MONSTER,
+            "dice": "1d4", "duration": 3, "refresh": True, "name": "Отрута", "icon": "☠️",
+        },
+        "use_text": "🗡️ Ви використовуєте Ядовитий удар!",
+        "priority": 1,
+    },
+}
+
+
+def _build_class_abilities() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Групує навички за класом (один раз при імпорті)"""
+    by_class: Dict[str, Dict[str, Dict[str, Any]]] = {cls: {} for cls in CharacterClass.ALL}
+    for ability_id, ability in ABILITIES.items():
+        ability["id"] = ability_id
+        by_class[ability["class"]][ability_id] = ability
+    return by_class
+
+
+# Клас -> {id: навичка}. Спільні об'єкти: не змінюйте їх у гравців!
+CLASS_ABILITIES: Dict[str, Dict[str, Dict[str, Any]]] = _build_class_abilities()
+
+# Клас -> id навичок у порядку пріоритету для автобою/симулятора
+ABILITY_PRIORITY: Dict[str, List[str]] = {
+    cls: sorted(abilities, key=lambda ability_id: abilities[ability_id].get("priority", 99))
+    for cls, abilities in CLASS_ABILITIES.items()
+}
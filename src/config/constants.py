@@ -92,6 +92,8 @@ class Location:
 
 
 # Дані локацій
+# ✨ "monsters" - усі, хто може трапитись у локації; ваги і level_bonus -
+# у src/config/encounter_tables.json (таблиця не може додати монстра поза списком)
 LOCATIONS: Dict[str, Dict[str, Any]] = {
     Location.CITY: {
         "name": "🏰 Місто StaryFall",
@@ -105,35 +107,35 @@ LOCATIONS: Dict[str, Dict[str, Any]] = {
         "description": "Густий ліс, повний диких тварин та прихованих скарбів",
         "level_required": 1,
         "emoji": "🌳",
-        "monsters": ["wolf", "spider"],
+        "monsters": ["wolf", "spider", "bandit"],
     },
     Location.MOUNTAINS: {
         "name": "🏔️ Кам'яні гори",
         "description": "Високі гори, де мешкають небезпечні істоти",
         "level_required": 2,
         "emoji": "🏔️",
-        "monsters": ["bandit", "orc"],
+        "monsters": ["bandit", "orc", "goblin"],
     },
     Location.RUINS: {
         "name": "🏚️ Стародавні руїни",
         "description": "Залишки забутої цивілізації, повні магії та небезпек",
         "level_required": 3,
         "emoji": "🏚️",
-        "monsters": ["skeleton", "wizard"],
+        "monsters": ["skeleton", "wizard", "orc"],
     },
     Location.CAVES: {
         "name": "🕳️ Глибокі печери",
         "description": "Темні печери з підземними озерами та дивними істотами",
         "level_required": 4,
         "emoji": "🕳️",
-        "monsters": ["goblin", "spider", "orc"],
+        "monsters": ["goblin", "spider", "orc", "wizard"],
     },
     Location.SWAMP: {
         "name": "🐊 Мертві болота",
         "description": "Заболочена місцевість, де блукає нежить",
         "level_required": 5,
         "emoji": "🐊",
-        "monsters": ["skeleton", "wizard", "spider"],
+        "monsters": ["skeleton", "wizard", "spider", "dragon"],
     },
 }
 
@@ -291,6 +293,25 @@ FLEE_PER_AGILITY = 5  # +5% за кожну одиницю спритності
 FLEE_MAX_CHANCE = 80  # Максимальний шанс втечі 80%
 
 
+# ==================== РЕГЕНЕРАЦІЯ ====================
+
+REGEN_TICK_SECONDS = 60  # Тривалість одного тіку регенерації
+# За тік: HP += stamina + 1, мана += intelligence + 1
+
+
+# ==================== ЕКСПЕДИЦІЇ ====================
+
+EXPEDITION_SIZES = (5, 10, 20)  # Варіанти кількості боїв
+EXPEDITION_SECONDS_PER_ENCOUNTER = 60  # Тривалість експедиції = бої × секунди
+
+
+# ==================== ЩОДЕННА НАГОРОДА ====================
+
+DAILY_REWARD_COOLDOWN = 24 * 3600  # Секунд між нагородами
+DAILY_REWARD_BASE_GOLD = 50
+DAILY_REWARD_GOLD_PER_LEVEL = 10  # Нагорода = база + рівень × це
+
+
 # ==================== ЕКОНОМІКА ====================
 
 # Ціни предметів у магазині
@@ -0,0 +1,182 @@
+﻿# src/config/loot.py - Таблиці луту монстрів
+#
+# Рушій - src/utils/loot.py: таблиці компілюються в AliasSampler,
+# тож кожен кидок луту - O(1) незалежно від кількості записів.
+
+from typing import Any, Dict
+
+from src.config.constants import MonsterType
+from src.config.equipment import ItemRarity, RARITY_PRICE_MULTIPLIER
+
+
+class LootKind:
+    """Що дає запис таблиці"""
+    NOTHING = "nothing"        # Порожній кидок
+    MATERIAL = "material"      # Матеріал з MATERIALS
+    EQUIPMENT = "equipment"    # Спорядження з каталогу магазину (ALL_SHOP_ITEMS)
+
+
+# ==================== МАТЕРІАЛИ ====================
+
+# Назви збігаються з MONSTER_BASE_STATS["loot"] - старі рядки в
+# інвентарях гравців розпізнаються за назвою (LEGACY_LOOT_NAMES)
+MATERIALS: Dict[str, Dict[str, Any]] = {
+    "wolf_fang": {"name": "🐺 Вовчий ікло", "rarity": ItemRarity.COMMON, "base_price": 10},
+    "wolf_pelt": {"name": "🐺 Вовча шкура", "rarity": ItemRarity.COMMON, "base_price": 14},
+    "spider_silk": {"name": "🕸️ Павутиння", "rarity": ItemRarity.COMMON, "base_price": 8},
+    "spider_venom": {"name": "☠️ Отрута павука", "rarity": ItemRarity.COMMON, "base_price": 16},
+    "goblin_ear": {"name": "👹 Вухо гобліна", "rarity": ItemRarity.COMMON, "base_price": 10},
+    "gold_pouch": {"name": "🪙 Мішок золота", "rarity": ItemRarity.UNCOMMON, "base_price": 20},
+    "bone": {"name": "🦴 Кістка", "rarity": ItemRarity.COMMON, "base_price": 6},
+    "old_weapon": {"name": "⚔️ Стара зброя", "rarity": ItemRarity.COMMON, "base_price": 20},
+    "arrows": {"name": "🏹 Стріли", "rarity": ItemRarity.COMMON, "base_price": 8},
+    "leather_purse": {"name": "💼 Шкіряний гаманець", "rarity": ItemRarity.UNCOMMON, "base_price": 15},
+    "heavy_sword": {"name": "⚔️ Важкий меч", "rarity": ItemRarity.COMMON, "base_price": 30},
+    "orc_shield": {"name": "🛡️ Щит орка", "rarity": ItemRarity.COMMON, "base_price": 30},
+    "scroll": {"name": "📜 Сувій", "rarity": ItemRarity.UNCOMMON, "base_price": 18},
+    "magic_crystal": {"name": "🔮 Магічний кристал", "rarity": ItemRarity.UNCOMMON, "base_price": 30},
+    "dragon_scale": {"name": "💎 Драконяча луска", "rarity": ItemRarity.RARE, "base_price": 40},
+    "dragon_heart": {"name": "🔥 Драконяче серце", "rarity": ItemRarity.EPIC, "base_price": 40},
+}
+
+# Назва -> id матеріалу (для луту-рядків, збережених до появи каталогу)
+LEGACY_LOOT_NAMES: Dict[str, str] = {
+    material["name"]: material_id for material_id, material in MATERIALS.items()
+}
+
+# Ціна продажу луту-рядка, якого немає в каталозі (як було раніше)
+LEGACY_LOOT_PRICE = 5
+
+# Частка ціни, яку платить магазин при продажу
+SELL_PRICE_RATIO = 0.5
+
+
+# ==================== СПОРЯДЖЕННЯ ====================
+
+# Вага предмета каталогу за його рідкістю (звичайні падають частіше)
+RARITY_DROP_WEIGHTS: Dict[str, float] = {
+    ItemRarity.COMMON: 60,
+    ItemRarity.UNCOMMON: 25,
+    ItemRarity.RARE: 10,
+    ItemRarity.EPIC: 4,
+    ItemRarity.LEGENDARY: 1,
+}
+
+# Порядок рідкостей для покращення (+1 крок = наступна рідкість)
+RARITY_ORDER = (
+    ItemRarity.COMMON,
+    ItemRarity.UNCOMMON,
+    ItemRarity.RARE,
+    ItemRarity.EPIC,
+    ItemRarity.LEGENDARY,
+)
+
+# Кроків покращення знайденого спорядження -> вага.
+# Кожен крок: рідкість +1 (не вище легендарної) і +1 до кожного бонусу
+UPGRADE_WEIGHTS: Dict[int, float] = {
+    0: 75,
+    1: 18,
+    2: 5,
+    3: 1.5,
+    4: 0.5,
+}
+
+# Спорядження з луту - не вище рівня монстра + цей запас
+EQUIPMENT_LEVEL_MARGIN = 1
+
+
+# ==================== ТАБЛИЦІ МОНСТРІВ ====================
+
+# rolls - скільки кидків за вбивство; кожен кидок - один запис за вагою
+LOOT_TABLES: Dict[str, Dict[str, Any]] = {
+    MonsterType.WOLF: {
+        "rolls": 2,
+        "drops": [
+            {"kind": LootKind.NOTHING, "weight": 35},
+            {"kind": LootKind.MATERIAL, "id": "wolf_fang", "weight": 35},
+            {"kind": LootKind.MATERIAL, "id": "wolf_pelt", "weight": 27},
+            {"kind": LootKind.EQUIPMENT, "weight": 3},
+        ],
+    },
+    MonsterType.SPIDER: {
+        "rolls": 2,
+        "drops": [
+            {"kind": LootKind.NOTHING, "weight": 40},
+            {"kind": LootKind.MATERIAL, "id": "spider_silk", "weight": 37},
+            {"kind": LootKind.MATERIAL, "id": "spider_venom", "weight": 20},
+            {"kind": LootKind.EQUIPMENT, "weight": 3},
+        ],
+    },
+    MonsterType.GOBLIN: {
+        "rolls": 2,
+        "drops": [
+            {"kind": LootKind.NOTHING, "weight": 25},
+            {"kind": LootKind.MATERIAL, "id": "goblin_ear", "weight": 45},
+            {"kind": LootKind.MATERIAL, "id": "gold_pouch", "weight": 24},
+            {"kind": LootKind.EQUIPMENT, "weight": 6},
+        ],
+    },
+    MonsterType.SKELETON: {
+        "rolls": 2,
+        "drops": [
+            {"kind": LootKind.NOTHING, "weight": 50},
+            {"kind": LootKind.MATERIAL, "id": "bone", "weight": 30},
+            {"kind": LootKind.MATERIAL, "id": "old_weapon", "weight": 14},
+            {"kind": LootKind.EQUIPMENT, "weight": 6},
+        ],
+    },
+    MonsterType.BANDIT: {
+        "rolls": 2,
+        "drops": [
+            {"kind": LootKind.NOTHING, "weight": 15},
+            {"kind": LootKind.MATERIAL, "id": "arrows", "weight": 45},
+            {"kind": LootKind.MATERIAL, "id": "leather_purse", "weight": 32},
+            {"kind": LootKind.EQUIPMENT, "weight": 8},
+        ],
+    },
+    MonsterType.ORC: {
+        "rolls": 2,
+        "drops": [
+            {"kind": LootKind.NOTHING, "weight": 40},
+            {"kind": LootKind.MATERIAL, "id": "heavy_sword", "weight": 25},
+            {"kind": LootKind.MATERIAL, "id": "orc_shield", "weight": 25},
+            {"kind": LootKind.EQUIPMENT, "weight": 10},
+        ],
+    },
+    MonsterType.WIZARD: {
+        "rolls": 2,
+        "drops": [
+            {"kind": LootKind.NOTHING, "weight": 20},
+            {"kind": LootKind.MATERIAL, "id": "scroll", "weight": 40},
+            {"kind": LootKind.MATERIAL, "id": "magic_crystal", "weight": 30},
+            {"kind": LootKind.EQUIPMENT, "weight": 10},
+        ],
+    },
+    MonsterType.DRAGON: {
+        "rolls": 3,
+        "drops": [
+            {"kind": LootKind.NOTHING, "weight": 10},
+            {"kind": LootKind.MATERIAL, "id": "dragon_scale", "weight": 45},
+            {"kind": LootKind.MATERIAL, "id": "dragon_heart", "weight": 25},
+            {"kind": LootKind.EQUIPMENT, "weight": 20},
+        ],
+    },
+}
+
+
+def get_sell_price(item: Any) -> int:
+    """
+    Ціна, яку магазин платить за предмет інвентаря
+    
+    Спорядження і матеріали - base_price × множник рідкості × SELL_PRICE_RATIO;
+    старі рядки луту - за каталогом матеріалів, невідомі - LEGACY_LOOT_PRICE.
+    """
+    if isinstance(item, str):
+        material_id = LEGACY_LOOT_NAMES.get(item)
+        if material_id is None:
+            return LEGACY_LOOT_PRICE
+        item = MATERIALS[material_id]
+    
+    base_price = item.get("base_price", 10)
+    multiplier = RARITY_PRICE_MULTIPLIER.get(item.get("rarity", ItemRarity.COMMON), 1.0)
+    return int(base_price * multiplier * SELL_PRICE_RATIO)
@@ -1,4 +1,9 @@
 ﻿# src/config/settings.py - Налаштування проекту
+#
+# ✨ Імпорт лише читає змінні оточення (і .env - значення потрібні вже
+# тут, у атрибутах класу). Папка logs і перевірка BOT_TOKEN - у
+# bootstrap() та main() з main.py: скрипти й інструменти імпортують
+# src.* без токена і нічого не створюють на диску.
 
 import os
 from pathlib import Path
@@ -12,22 +17,24 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 LOGS_DIR = BASE_DIR / "logs"
 MIGRATIONS_DIR = BASE_DIR / "migrations"
 
-# Створюємо директорії якщо їх немає
-try:
-    LOGS_DIR.mkdir(exist_ok=True, parents=True)
-except FileExistsError:
-    pass  # Папка вже існує - все ок
-except Exception as e:
-    print(f"Попередження: не вдалося створити папку logs: {e}")
-
 class Settings:
     """Клас налаштувань проекту"""
     
     # Telegram Bot
     BOT_TOKEN: str = os.getenv("BOT_TOKEN", "")
     
+    # Адміністратори (Telegram user_id через кому) - /stats та інші адмін-команди
+    ADMIN_IDS: frozenset = frozenset(
+        int(user_id) for user_id in os.getenv("ADMIN_IDS", "").split(",") if user_id.strip()
+    )
+    
     # База даних
     DATABASE_PATH: str = os.getenv("DATABASE_PATH", str(BASE_DIR / "game.db"))
+    
+    # Ваги подій і зустрічей локацій (src/utils/encounter_tables.py)
+    ENCOUNTER_TABLES_PATH: str = os.getenv(
+        "ENCOUNTER_TABLES_PATH", str(BASE_DIR / "src" / "config" / "encounter_tables.json")
+    )
     DB_ECHO: bool = os.getenv("DB_ECHO", "False").lower() == "true"
     
     # Логування
@@ -54,8 +61,48 @@ class Settings:
     # Інвентар
     MAX_INVENTORY_SIZE: int = int(os.getenv("MAX_INVENTORY_SIZE", "100"))
     
-    # Rate limiting (запитів на хвилину)
-    RATE_LIMIT: int = 30
+    # Фонова регенерація (секунд між запусками, 0 - вимкнено)
+    REGEN_JOB_INTERVAL: int = int(os.getenv("REGEN_JOB_INTERVAL", "60"))
+    
+    # Фоновий розрахунок експедицій (секунд між запусками, 0 - вимкнено)
+    EXPEDITION_JOB_INTERVAL: int = int(os.getenv("EXPEDITION_JOB_INTERVAL", "30"))
+    EXPEDITION_BATCH_SIZE: int = int(os.getenv("EXPEDITION_BATCH_SIZE", "50"))
+    
+    # Події skill check, що чекають на гравця: "memory" або "sqlite"
+    EVENT_STORE_BACKEND: str = os.getenv("EVENT_STORE_BACKEND", "memory")
+    EVENT_TTL_SECONDS: int = int(os.getenv("EVENT_TTL_SECONDS", "900"))
+    EVENT_STORE_MAX_SIZE: int = int(os.getenv("EVENT_STORE_MAX_SIZE", "10000"))
+    
+    # Нагадування про щоденну нагороду (секунд між перевірками, 0 - вимкнено)
+    DAILY_NOTIFY_INTERVAL: int = int(os.getenv("DAILY_NOTIFY_INTERVAL", "300"))
+    DAILY_NOTIFY_BATCH_SIZE: int = int(os.getenv("DAILY_NOTIFY_BATCH_SIZE", "200"))
+    
+    # Масові повідомлення: спільний ліміт (повідомлень/с, у Telegram ~30) і паралельність
+    BULK_SEND_RATE: float = float(os.getenv("BULK_SEND_RATE", "25"))
+    BULK_SEND_CONCURRENCY: int = int(os.getenv("BULK_SEND_CONCURRENCY", "10"))
+    
+    # Розсилки адміністраторів: гравців на сторінку (і на збереження прогресу)
+    BROADCAST_PAGE_SIZE: int = int(os.getenv("BROADCAST_PAGE_SIZE", "100"))
+    
+    # Агрегована статистика: секунд між проходами (0 - вимкнено) і гравців за транзакцію
+    STATS_JOB_INTERVAL: int = int(os.getenv("STATS_JOB_INTERVAL", "300"))
+    STATS_BATCH_SIZE: int = int(os.getenv("STATS_BATCH_SIZE", "500"))
+    
+    # Таблиці лідерів: скільки гравців тримати в пам'яті і скільки на сторінці /top
+    LEADERBOARD_SIZE: int = int(os.getenv("LEADERBOARD_SIZE", "100"))
+    LEADERBOARD_PAGE_SIZE: int = int(os.getenv("LEADERBOARD_PAGE_SIZE", "10"))
+    
+    # Метрики: зведення в лог (секунд, 0 - вимкнено) та /metrics (порт, 0 - вимкнено)
+    METRICS_LOG_INTERVAL: int = int(os.getenv("METRICS_LOG_INTERVAL", "300"))
+    METRICS_HOST: str = os.getenv("METRICS_HOST", "127.0.0.1")
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "0"))
+    
+    # Rate limiting (дій гравця на хвилину, src/middlewares/throttling.py)
+    RATE_LIMIT: int = int(os.getenv("RATE_LIMIT", "30"))
+    RATE_LIMIT_MAX_USERS: int = int(os.getenv("RATE_LIMIT_MAX_USERS", "10000"))  # Станів у пам'яті
+    # Повтор того самого callback: вікно в секундах і режим "drop" / "debounce" / "off"
+    CALLBACK_REPEAT_WINDOW: float = float(os.getenv("CALLBACK_REPEAT_WINDOW", "1.0"))
+    CALLBACK_REPEAT_MODE: str = os.getenv("CALLBACK_REPEAT_MODE", "drop")
     
     @classmethod
     def validate(cls) -> bool:
@@ -70,7 +117,3 @@ class Settings:
 
 # Створюємо екземпляр налаштувань
 settings = Settings()
-
-# Перевіряємо валідність при імпорті
-if not settings.DEBUG:
-    settings.validate()
\ No newline at end of file
@@ -3,12 +3,90 @@
 import aiosqlite
 import json
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Callable, Tuple, List, Sequence
 
 from src.config.settings import settings
+from src.config.constants import REGEN_TICK_SECONDS
+from src.migrations import apply_migrations
+from src.utils.metrics import track_db
+from src.utils.leaderboard import leaderboards, LEADERBOARD_COLUMNS
 
 logger = logging.getLogger(__name__)
 
+# Оновлення існуючого гравця (save_player і пакетні записи)
+_PLAYER_UPDATE_SQL = '''
+    UPDATE players SET
+        username = ?,
+        character_name = ?,
+        class = ?,
+        level = ?,
+        experience = ?,
+        gold = ?,
+        strength = ?,
+        agility = ?,
+        intelligence = ?,
+        stamina = ?,
+        charisma = ?,
+        free_points = ?,
+        health = ?,
+        max_health = ?,
+        mana = ?,
+        max_mana = ?,
+        equipment = ?,
+        inventory = ?,
+        current_location = ?,
+        quests = ?,
+        achievements = ?,
+        last_daily_reward_ts = ?,
+        monsters_killed = ?,
+        quests_completed = ?,
+        total_gold_earned = ?,
+        total_damage_dealt = ?,
+        total_damage_taken = ?,
+        active_effects = ?,
+        ability_cooldowns = ?,
+        last_regeneration_ts = ?,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE user_id = ?
+'''
+
+
+def _player_update_params(player_data: Dict[str, Any]) -> tuple:
+    """Параметри для _PLAYER_UPDATE_SQL"""
+    return (
+        player_data.get('username', ''),
+        player_data.get('character_name', 'Безіменний'),
+        player_data.get('class', 'warrior'),
+        player_data.get('level', 1),
+        player_data.get('experience', 0),
+        player_data.get('gold', 100),
+        player_data.get('strength', 0),
+        player_data.get('agility', 0),
+        player_data.get('intelligence', 0),
+        player_data.get('stamina', 0),
+        player_data.get('charisma', 0),
+        player_data.get('free_points', 5),
+        player_data.get('health', 0),
+        player_data.get('max_health', 0),
+        player_data.get('mana', 0),
+        player_data.get('max_mana', 0),
+        player_data.get('equipment', '{}'),
+        player_data.get('inventory', '[]'),
+        player_data.get('current_location', 'city'),
+        player_data.get('quests', '{}'),
+        player_data.get('achievements', '[]'),
+        player_data.get('last_daily_reward_ts'),
+        player_data.get('monsters_killed', 0),
+        player_data.get('quests_completed', 0),
+        player_data.get('total_gold_earned', 100),
+        player_data.get('total_damage_dealt', 0),
+        player_data.get('total_damage_taken', 0),
+        player_data.get('active_effects', '[]'),
+        player_data.get('ability_cooldowns', '{}'),
+        player_data.get('last_regeneration_ts'),
+        player_data['user_id']
+    )
+
 
 class Database:
     """Клас для роботи з базою даних"""
@@ -23,56 +101,19 @@ class Database:
                 # Включаємо підтримку зовнішніх ключів
                 await db.execute("PRAGMA foreign_keys = ON")
                 
-                # Таблиця гравців
-                await db.execute('''
-                    CREATE TABLE IF NOT EXISTS players (
-                        user_id INTEGER PRIMARY KEY,
-                        username TEXT,
-                        character_name TEXT DEFAULT 'Безіменний',
-                        class TEXT DEFAULT 'warrior',
-                        level INTEGER DEFAULT 1,
-                        experience INTEGER DEFAULT 0,
-                        gold INTEGER DEFAULT 100,
-                        
-                        strength INTEGER DEFAULT 0,
-                        agility INTEGER DEFAULT 0,
-                        intelligence INTEGER DEFAULT 0,
-                        stamina INTEGER DEFAULT 0,
-                        charisma INTEGER DEFAULT 0,
-                        free_points INTEGER DEFAULT 5,
-                        
-                        health INTEGER DEFAULT 0,
-                        max_health INTEGER DEFAULT 0,
-                        
-                        equipment TEXT DEFAULT '{}',
-                        inventory TEXT DEFAULT '[]',
-                        
-                        current_location TEXT DEFAULT 'city',
-                        
-                        quests TEXT DEFAULT '{}',
-                        achievements TEXT DEFAULT '[]',
-                        last_daily_reward TEXT,
-                        
-                        monsters_killed INTEGER DEFAULT 0,
-                        quests_completed INTEGER DEFAULT 0,
-                        total_gold_earned INTEGER DEFAULT 100,
-                        total_damage_dealt INTEGER DEFAULT 0,
-                        total_damage_taken INTEGER DEFAULT 0,
-                        
-                        active_effects TEXT DEFAULT '[]',
-                        
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
+                # ✨ Схема створюється та оновлюється версійованими міграціями
+                applied = await apply_migrations(db)
+                if applied:
+                    logger.info(f"Застосовано міграцій: {applied}")
                 
                 await db.commit()
                 logger.info("База даних успішно ініціалізована")
-                
+        
         except Exception as e:
             logger.error(f"Помилка ініціалізації бази даних: {e}")
             raise
     
+    @track_db
     async def get_player(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Отримує дані гравця з бази"""
         try:
@@ -88,11 +129,12 @@ class Database:
                 if row:
                     return dict(row)
                 return None
-                
+        
         except Exception as e:
             logger.error(f"Помилка отримання гравця {user_id}: {e}")
             return None
     
+    @track_db
     async def save_player(self, player_data: Dict[str, Any]) -> bool:
         """Зберігає або оновлює дані гравця"""
         try:
@@ -106,73 +148,7 @@ class Database:
                 
                 if exists:
                     # Оновлюємо існуючого гравця
-                    await db.execute('''
-                        UPDATE players SET
-                            username = ?,
-                            character_name = ?,
-                            class = ?,
-                            level = ?,
-                            experience = ?,
-                            gold = ?,
-                            strength = ?,
-                            agility = ?,
-                            intelligence = ?,
-                            stamina = ?,
-                            charisma = ?,
-                            free_points = ?,
-                            health = ?,
-                            max_health = ?,
-                            mana = ?,
-                            max_mana = ?,
-                            equipment = ?,
-                            inventory = ?,
-                            current_location = ?,
-                            quests = ?,
-                            achievements = ?,
-                            last_daily_reward = ?,
-                            monsters_killed = ?,
-                            quests_completed = ?,
-                            total_gold_earned = ?,
-                            total_damage_dealt = ?,
-                            total_damage_taken = ?,
-                            active_effects = ?,
-                            ability_cooldowns = ?,
-                            last_login = ?,
-                            updated_at = CURRENT_TIMESTAMP
-                        WHERE user_id = ?
-                    ''', (
-                        player_data.get('username', ''),
-                        player_data.get('character_name', 'Безіменний'),
-                        player_data.get('class', 'warrior'),
-                        player_data.get('level', 1),
-                        player_data.get('experience', 0),
-                        player_data.get('gold', 100),
-                        player_data.get('strength', 0),
-                        player_data.get('agility', 0),
-                        player_data.get('intelligence', 0),
-                        player_data.get('stamina', 0),
-                        player_data.get('charisma', 0),
-                        player_data.get('free_points', 5),
-                        player_data.get('health', 0),
-                        player_data.get('max_health', 0),
-                        player_data.get('mana', 0),
-                        player_data.get('max_mana', 0),
-                        player_data.get('equipment', '{}'),
-                        player_data.get('inventory', '[]'),
-                        player_data.get('current_location', 'city'),
-                        player_data.get('quests', '{}'),
-                        player_data.get('achievements', '[]'),
-                        player_data.get('last_daily_reward'),
-                        player_data.get('monsters_killed', 0),
-                        player_data.get('quests_completed', 0),
-                        player_data.get('total_gold_earned', 100),
-                        player_data.get('total_damage_dealt', 0),
-                        player_data.get('total_damage_taken', 0),
-                        player_data.get('active_effects', '[]'),
-                        player_data.get('ability_cooldowns', '{}'),
-                        player_data.get('last_login'),
-                        player_data['user_id']
-                    ))
+                    await db.execute(_PLAYER_UPDATE_SQL, _player_update_params(player_data))
                 else:
                     # Створюємо нового гравця
                     await db.execute('''
@@ -182,10 +158,10 @@ class Database:
                             strength, agility, intelligence, stamina, charisma, free_points,
                             health, max_health, mana, max_mana,
                             equipment, inventory, current_location,
-                            quests, achievements, last_daily_reward,
+                            quests, achievements, last_daily_reward_ts,
                             monsters_killed, quests_completed, total_gold_earned,
                             total_damage_dealt, total_damage_taken,
-                            active_effects, ability_cooldowns, last_login
+                            active_effects, ability_cooldowns, last_regeneration_ts
                         ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     ''', (
                         player_data.get('user_id'),
@@ -210,7 +186,7 @@ class Database:
                         player_data.get('current_location', 'city'),
                         player_data.get('quests', '{}'),
                         player_data.get('achievements', '[]'),
-                        player_data.get('last_daily_reward'),
+                        player_data.get('last_daily_reward_ts'),
                         player_data.get('monsters_killed', 0),
                         player_data.get('quests_completed', 0),
                         player_data.get('total_gold_earned', 100),
@@ -218,12 +194,614 @@ class Database:
                         player_data.get('total_damage_taken', 0),
                         player_data.get('active_effects', '[]'),
                         player_data.get('ability_cooldowns', '{}'),
-                        player_data.get('last_login')
+                        player_data.get('last_regeneration_ts')
                     ))
                 
                 await db.commit()
+            
+            # ✨ Інкрементальне оновлення топів (без запитів до БД)
+            leaderboards.offer(player_data)
+            return True
+        
+        except Exception as e:
+            logger.error(f"Помилка збереження гравця: {e}")
+            return False
+    
+    @track_db
+    async def regenerate_players(self, now_ts: int, exclude_user_ids: Iterable[int] = ()) -> int:
+        """
+        Пакетна регенерація HP/мани всіх гравців одним UPDATE
+        
+        Тіки рахуються цілочисельно з last_regeneration_ts, час просувається
+        лише на цілі тіки - залишок не втрачається. Умова WHERE йде по
+        індексу idx_players_regen_ts. Об'єкти Player не створюються.
+        
+        Args:
+            now_ts: Поточний час у секундах від епохи
+            exclude_user_ids: Гравці, яких не чіпаємо (наприклад, у бою)
+        
+        Returns:
+            Кількість оновлених гравців
+        """
+        exclude = list(exclude_user_ids)
+        exclude_sql = ""
+        if exclude:
+            exclude_sql = f"AND user_id NOT IN ({','.join('?' * len(exclude))})"
+        
+        tick = REGEN_TICK_SECONDS
+        
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                # Усі вирази SET бачать старі значення рядка
+                cursor = await db.execute(f'''
+                    UPDATE players SET
+                        health = MIN(max_health, health + (stamina + 1) * ((? - last_regeneration_ts) / ?)),
+                        mana = MIN(max_mana, mana + (intelligence + 1) * ((? - last_regeneration_ts) / ?)),
+                        last_regeneration_ts = last_regeneration_ts + ((? - last_regeneration_ts) / ?) * ?
+                    WHERE last_regeneration_ts <= ? {exclude_sql}
+                ''', (now_ts, tick, now_ts, tick, now_ts, tick, tick, now_ts - tick, *exclude))
+                
+                await db.commit()
+                return cursor.rowcount
+        
+        except Exception as e:
+            logger.error(f"Помилка пакетної регенерації: {e}")
+            return 0
+    
+    # =====================================================
+    # ЕКСПЕДИЦІЇ
+    # =====================================================
+    
+    @track_db
+    async def create_expedition(self, user_id: int, location_id: str, encounters: int,
+                                started_ts: int, ready_ts: int) -> Optional[int]:
+        """
+        Створює експедицію
+        
+        Returns:
+            id експедиції або None (у гравця вже є незабрана - унікальний індекс)
+        """
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute('''
+                    INSERT INTO expeditions (user_id, location_id, encounters, started_ts, ready_ts)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (user_id, location_id, encounters, started_ts, ready_ts))
+                await db.commit()
+                return cursor.lastrowid
+        
+        except aiosqlite.IntegrityError:
+            return None
+        except Exception as e:
+            logger.error(f"Помилка створення експедиції для {user_id}: {e}")
+            return None
+    
+    @track_db
+    async def get_open_expedition(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Активна або розрахована, але ще не забрана експедиція гравця"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                db.row_factory = aiosqlite.Row
+                cursor = await db.execute(
+                    "SELECT * FROM expeditions WHERE user_id = ? AND status != 'claimed'",
+                    (user_id,)
+                )
+                row = await cursor.fetchone()
+                return dict(row) if row else None
+        
+        except Exception as e:
+            logger.error(f"Помилка отримання експедиції {user_id}: {e}")
+            return None
+    
+    @track_db
+    async def claim_expedition(self, expedition_id: int) -> bool:
+        """Позначає розраховану експедицію забраною. False - вже забрана або ще триває"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute(
+                    "UPDATE expeditions SET status = 'claimed' WHERE id = ? AND status = 'resolved'",
+                    (expedition_id,)
+                )
+                await db.commit()
+                return cursor.rowcount > 0
+        
+        except Exception as e:
+            logger.error(f"Помилка завершення експедиції {expedition_id}: {e}")
+            return False
+    
+    @track_db
+    async def resolve_due_expeditions(
+        self,
+        now_ts: int,
+        limit: int,
+        resolve: Callable[[Dict[str, Any]], Tuple[Optional[Dict[str, Any]], Dict[str, Any]]],
+        exclude_user_ids: Iterable[int] = ()
+    ) -> int:
+        """
+        Розраховує готові експедиції однією транзакцією
+        
+        Вибірка, розрахунок і запис гравців та експедицій - під одним
+        BEGIN IMMEDIATE, тож між читанням гравця і записом результату
+        ніхто інший його не змінить, а збій відкочує пачку цілком.
+        
+        Args:
+            now_ts: Поточний час у секундах від епохи
+            limit: Максимум експедицій за пачку
+            resolve: Рядок гравця + поля expedition_* -> (нові дані гравця або None, результат)
+            exclude_user_ids: Гравці, яких поки пропускаємо (наприклад, у бою)
+        
+        Returns:
+            Кількість розрахованих експедицій
+        """
+        exclude = list(exclude_user_ids)
+        exclude_sql = ""
+        if exclude:
+            exclude_sql = f"AND e.user_id NOT IN ({','.join('?' * len(exclude))})"
+        
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                db.row_factory = aiosqlite.Row
+                await db.execute("BEGIN IMMEDIATE")
+                try:
+                    cursor = await db.execute(f'''
+                        SELECT p.*,
+                               e.id AS expedition_id,
+                               e.location_id AS expedition_location,
+                               e.encounters AS expedition_encounters
+                        FROM expeditions e
+                        JOIN players p ON p.user_id = e.user_id
+                        WHERE e.status = 'active' AND e.ready_ts <= ? {exclude_sql}
+                        ORDER BY e.ready_ts
+                        LIMIT ?
+                    ''', (now_ts, *exclude, limit))
+                    rows = await cursor.fetchall()
+                    
+                    saved_players = []
+                    player_updates = []
+                    expedition_updates = []
+                    for row in rows:
+                        player_data, result = resolve(dict(row))
+                        if player_data is not None:
+                            saved_players.append(player_data)
+                            player_updates.append(_player_update_params(player_data))
+                        expedition_updates.append((
+                            now_ts,
+                            json.dumps(result, ensure_ascii=False),
+                            row["expedition_id"]
+                        ))
+                    
+                    await db.executemany(_PLAYER_UPDATE_SQL, player_updates)
+                    await db.executemany('''
+                        UPDATE expeditions SET status = 'resolved', resolved_ts = ?, result = ?
+                        WHERE id = ?
+                    ''', expedition_updates)
+                    await db.commit()
+                
+                except Exception:
+                    await db.rollback()
+                    raise
+                
+                for player_data in saved_players:
+                    leaderboards.offer(player_data)
+                return len(expedition_updates)
+        
+        except Exception as e:
+            logger.error(f"Помилка розрахунку експедицій: {e}")
+            return 0
+    
+    # =====================================================
+    # ПОДІЇ SKILL CHECK (SQLite-бекенд event_store)
+    # =====================================================
+    
+    @track_db
+    async def put_pending_event(self, event_id: str, user_id: int, location_id: str,
+                                event_json: str, expires_ts: int, now_ts: int) -> bool:
+        """Зберігає подію гравця (попередня подія гравця замінюється) і чистить прострочені"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                await db.execute("DELETE FROM pending_events WHERE expires_ts <= ?", (now_ts,))
+                await db.execute('''
+                    INSERT OR REPLACE INTO pending_events (event_id, user_id, location_id, event, expires_ts)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (event_id, user_id, location_id, event_json, expires_ts))
+                await db.commit()
                 return True
+        
+        except Exception as e:
+            logger.error(f"Помилка збереження події {user_id}: {e}")
+            return False
+    
+    @track_db
+    async def pop_pending_event(self, event_id: str, user_id: int, now_ts: int) -> Optional[Dict[str, Any]]:
+        """Забирає непрострочену подію гравця (SELECT + DELETE в одній транзакції)"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                db.row_factory = aiosqlite.Row
+                await db.execute("BEGIN IMMEDIATE")
+                try:
+                    cursor = await db.execute(
+                        "SELECT * FROM pending_events WHERE event_id = ? AND user_id = ?",
+                        (event_id, user_id)
+                    )
+                    row = await cursor.fetchone()
+                    if row:
+                        await db.execute("DELETE FROM pending_events WHERE event_id = ?", (event_id,))
+                    await db.commit()
+                except Exception:
+                    await db.rollback()
+                    raise
                 
+                if row and row["expires_ts"] > now_ts:
+                    return dict(row)
+                return None
+        
         except Exception as e:
-            logger.error(f"Помилка збереження гравця: {e}")
-            return False
\ No newline at end of file
+            logger.error(f"Помилка отримання події {event_id}: {e}")
+            return None
+    
+    # =====================================================
+    # ТАБЛИЦІ ЛІДЕРІВ
+    # =====================================================
+    
+    @track_db
+    async def get_top_players(self, columns: Sequence[str], limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Найкращі гравці за columns (спадання, при рівності - менший user_id)
+        
+        Колонки - лише з LEADERBOARD_COLUMNS: для кожної таблиці є індекс
+        з міграції v7, тож SQLite читає перші limit записів індексу.
+        """
+        for column in columns:
+            if column not in LEADERBOARD_COLUMNS:
+                raise ValueError(f"Сортування за {column} не підтримується")
+        
+        order_sql = ", ".join(f"{column} DESC" for column in columns)
+        
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                db.row_factory = aiosqlite.Row
+                cursor = await db.execute(f'''
+                    SELECT user_id, character_name, class, level, experience,
+                           monsters_killed, total_gold_earned, total_damage_dealt
+                    FROM players
+                    ORDER BY {order_sql}, user_id
+                    LIMIT ?
+                ''', (limit,))
+                return [dict(row) for row in await cursor.fetchall()]
+        
+        except Exception as e:
+            logger.error(f"Помилка отримання таблиці лідерів {columns}: {e}")
+            return None
+    
+    # =====================================================
+    # АГРЕГОВАНА СТАТИСТИКА
+    # =====================================================
+    
+    @track_db
+    async def apply_stats_batch(
+        self,
+        limit: int,
+        summarize: Callable[[Dict[str, Any]], Tuple[int, int, int, Dict[str, int]]]
+    ) -> int:
+        """
+        Переносить зміни позначених гравців в агрегати однією транзакцією
+        
+        Для кожного гравця зі stats_dirty: віднімає збережений внесок
+        (stats_player, stats_player_items), додає новий і запам'ятовує
+        його. Агрегати оновлюються дельтами - JSON інших гравців не читаємо.
+        
+        Args:
+            limit: Максимум гравців за транзакцію
+            summarize: Рядок players -> (рівень, золото, зароблено, {предмет: кількість})
+        
+        Returns:
+            Кількість оброблених гравців
+        """
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                db.row_factory = aiosqlite.Row
+                await db.execute("BEGIN IMMEDIATE")
+                try:
+                    cursor = await db.execute("SELECT user_id FROM stats_dirty LIMIT ?", (limit,))
+                    user_ids = [row["user_id"] for row in await cursor.fetchall()]
+                    if not user_ids:
+                        await db.commit()
+                        return 0
+                    
+                    in_sql = f"({','.join('?' * len(user_ids))})"
+                    
+                    cursor = await db.execute(f'''
+                        SELECT user_id, level, gold, total_gold_earned, inventory, equipment
+                        FROM players WHERE user_id IN {in_sql}
+                    ''', user_ids)
+                    current = {row["user_id"]: summarize(dict(row)) for row in await cursor.fetchall()}
+                    
+                    cursor = await db.execute(
+                        f"SELECT * FROM stats_player WHERE user_id IN {in_sql}", user_ids
+                    )
+                    previous = {row["user_id"]: dict(row) for row in await cursor.fetchall()}
+                    
+                    previous_items: Dict[int, Dict[str, int]] = {}
+                    cursor = await db.execute(
+                        f"SELECT * FROM stats_player_items WHERE user_id IN {in_sql}", user_ids
+                    )
+                    for row in await cursor.fetchall():
+                        previous_items.setdefault(row["user_id"], {})[row["item_name"]] = row["count"]
+                    
+                    levels: Dict[int, int] = {}
+                    copies: Dict[str, int] = {}
+                    holders: Dict[str, int] = {}
+                    totals = {"players": 0, "gold": 0, "gold_earned": 0}
+                    
+                    def add(level: int, gold: int, gold_earned: int, items: Dict[str, int], sign: int):
+                        levels[level] = levels.get(level, 0) + sign
+                        totals["players"] += sign
+                        totals["gold"] += sign * gold
+                        totals["gold_earned"] += sign * gold_earned
+                        for name, count in items.items():
+                            copies[name] = copies.get(name, 0) + sign * count
+                            holders[name] = holders.get(name, 0) + sign
+                    
+                    for user_id, old in previous.items():
+                        add(old["level"], old["gold"], old["gold_earned"], previous_items.get(user_id, {}), -1)
+                    for level, gold, gold_earned, items in current.values():
+                        add(level, gold, gold_earned, items, 1)
+                    
+                    await db.executemany('''
+                        INSERT INTO stats_levels (level, players) VALUES (?, ?)
+                        ON CONFLICT(level) DO UPDATE SET players = players + excluded.players
+                    ''', [(level, delta) for level, delta in levels.items() if delta])
+                    await db.executemany('''
+                        INSERT INTO stats_items (item_name, copies, holders) VALUES (?, ?, ?)
+                        ON CONFLICT(item_name) DO UPDATE SET
+                            copies = copies + excluded.copies,
+                            holders = holders + excluded.holders
+                    ''', [(name, copies[name], holders[name]) for name in copies
+                          if copies[name] or holders[name]])
+                    await db.executemany('''
+                        INSERT INTO stats_totals (key, value) VALUES (?, ?)
+                        ON CONFLICT(key) DO UPDATE SET value = value + excluded.value
+                    ''', list(totals.items()))
+                    await db.execute("DELETE FROM stats_levels WHERE players <= 0")
+                    await db.execute("DELETE FROM stats_items WHERE holders <= 0")
+                    
+                    # Новий внесок гравців
+                    await db.execute(f"DELETE FROM stats_player WHERE user_id IN {in_sql}", user_ids)
+                    await db.execute(f"DELETE FROM stats_player_items WHERE user_id IN {in_sql}", user_ids)
+                    await db.executemany(
+                        "INSERT INTO stats_player (user_id, level, gold, gold_earned) VALUES (?, ?, ?, ?)",
+                        [(user_id, *summary[:3]) for user_id, summary in current.items()]
+                    )
+                    await db.executemany(
+                        "INSERT INTO stats_player_items (user_id, item_name, count) VALUES (?, ?, ?)",
+                        [
+                            (user_id, name, count)
+                            for user_id, summary in current.items()
+                            for name, count in summary[3].items()
+                        ]
+                    )
+                    await db.execute(f"DELETE FROM stats_dirty WHERE user_id IN {in_sql}", user_ids)
+                    await db.commit()
+                
+                except Exception:
+                    await db.rollback()
+                    raise
+                
+                return len(user_ids)
+        
+        except Exception as e:
+            logger.error(f"Помилка оновлення статистики: {e}")
+            return 0
+    
+    @track_db
+    async def get_stats_overview(self, top_items: int = 10) -> Optional[Dict[str, Any]]:
+        """Агрегати для адмін-звіту (лише маленькі таблиці stats_*)"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute("SELECT key, value FROM stats_totals")
+                totals = dict(await cursor.fetchall())
+                
+                cursor = await db.execute("SELECT level, players FROM stats_levels ORDER BY level")
+                levels = await cursor.fetchall()
+                
+                cursor = await db.execute('''
+                    SELECT item_name, copies, holders FROM stats_items
+                    ORDER BY holders DESC, copies DESC LIMIT ?
+                ''', (top_items,))
+                items = await cursor.fetchall()
+                
+                cursor = await db.execute("SELECT COUNT(*) FROM stats_dirty")
+                pending = (await cursor.fetchone())[0]
+                
+                return {
+                    "players": totals.get("players", 0),
+                    "gold": totals.get("gold", 0),
+                    "gold_earned": totals.get("gold_earned", 0),
+                    "levels": [tuple(row) for row in levels],
+                    "items": [tuple(row) for row in items],
+                    "pending": pending,
+                }
+        
+        except Exception as e:
+            logger.error(f"Помилка отримання статистики: {e}")
+            return None
+    
+    # =====================================================
+    # ЩОДЕННА НАГОРОДА
+    # =====================================================
+    
+    @track_db
+    async def schedule_daily_notification(self, user_id: int, notify_ts: int) -> bool:
+        """
+        Планує нагадування про нагороду на notify_ts
+        
+        Окремий UPDATE: daily_notify_ts не пише save_player, тож ця
+        колонка не перетинається із записом решти рядка гравця.
+        """
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                await db.execute(
+                    "UPDATE players SET daily_notify_ts = ? WHERE user_id = ?",
+                    (notify_ts, user_id)
+                )
+                await db.commit()
+                return True
+        
+        except Exception as e:
+            logger.error(f"Помилка планування нагадування {user_id}: {e}")
+            return False
+    
+    @track_db
+    async def get_due_daily_notifications(self, now_ts: int, limit: int) -> List[int]:
+        """Гравці, яким час нагадати про нагороду (діапазон по idx_players_daily_notify)"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute('''
+                    SELECT user_id FROM players
+                    WHERE daily_notify_ts <= ?
+                    ORDER BY daily_notify_ts
+                    LIMIT ?
+                ''', (now_ts, limit))
+                return [row[0] for row in await cursor.fetchall()]
+        
+        except Exception as e:
+            logger.error(f"Помилка вибірки нагадувань: {e}")
+            return []
+    
+    @track_db
+    async def clear_daily_notifications(self, user_ids: Sequence[int], now_ts: int) -> int:
+        """Знімає надіслані нагадування (крім тих, хто вже забрав нагороду і має нове)"""
+        if not user_ids:
+            return 0
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute(f'''
+                    UPDATE players SET daily_notify_ts = NULL
+                    WHERE user_id IN ({','.join('?' * len(user_ids))}) AND daily_notify_ts <= ?
+                ''', (*user_ids, now_ts))
+                await db.commit()
+                return cursor.rowcount
+        
+        except Exception as e:
+            logger.error(f"Помилка зняття нагадувань: {e}")
+            return 0
+    
+    # =====================================================
+    # РОЗСИЛКИ
+    # =====================================================
+    
+    @track_db
+    async def create_broadcast(self, admin_id: int, text: str, now_ts: int) -> Optional[int]:
+        """Нова розсилка у статусі 'pending' (чекає підтвердження)"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute(
+                    "INSERT INTO broadcasts (admin_id, text, created_ts) VALUES (?, ?, ?)",
+                    (admin_id, text, now_ts)
+                )
+                await db.commit()
+                return cursor.lastrowid
+        
+        except Exception as e:
+            logger.error(f"Помилка створення розсилки: {e}")
+            return None
+    
+    @track_db
+    async def get_broadcast(self, broadcast_id: int) -> Optional[Dict[str, Any]]:
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                db.row_factory = aiosqlite.Row
+                cursor = await db.execute("SELECT * FROM broadcasts WHERE id = ?", (broadcast_id,))
+                row = await cursor.fetchone()
+                return dict(row) if row else None
+        
+        except Exception as e:
+            logger.error(f"Помилка отримання розсилки {broadcast_id}: {e}")
+            return None
+    
+    @track_db
+    async def get_running_broadcasts(self) -> List[Dict[str, Any]]:
+        """Розсилки, перервані перезапуском бота"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                db.row_factory = aiosqlite.Row
+                cursor = await db.execute("SELECT * FROM broadcasts WHERE status = 'running' ORDER BY id")
+                return [dict(row) for row in await cursor.fetchall()]
+        
+        except Exception as e:
+            logger.error(f"Помилка отримання розсилок: {e}")
+            return []
+    
+    @track_db
+    async def set_broadcast_status(self, broadcast_id: int, status: str, from_statuses: Sequence[str],
+                                   now_ts: Optional[int] = None, total: Optional[int] = None,
+                                   progress_message_id: Optional[int] = None) -> bool:
+        """
+        Переводить розсилку в status, лише якщо вона зараз в одному з from_statuses
+        
+        Умова в WHERE - два натискання "Почати" не запустять розсилку двічі.
+        """
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute(f'''
+                    UPDATE broadcasts SET
+                        status = ?,
+                        finished_ts = COALESCE(?, finished_ts),
+                        total = COALESCE(?, total),
+                        progress_message_id = COALESCE(?, progress_message_id)
+                    WHERE id = ? AND status IN ({','.join('?' * len(from_statuses))})
+                ''', (status, now_ts, total, progress_message_id, broadcast_id, *from_statuses))
+                await db.commit()
+                return cursor.rowcount == 1
+        
+        except Exception as e:
+            logger.error(f"Помилка зміни статусу розсилки {broadcast_id}: {e}")
+            return False
+    
+    @track_db
+    async def save_broadcast_progress(self, broadcast_id: int, last_user_id: int,
+                                      sent: int, blocked: int, failed: int, elapsed: float) -> bool:
+        """Додає результати сторінки і зсуває курсор"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                await db.execute('''
+                    UPDATE broadcasts SET
+                        last_user_id = ?,
+                        sent = sent + ?,
+                        blocked = blocked + ?,
+                        failed = failed + ?,
+                        elapsed = elapsed + ?
+                    WHERE id = ?
+                ''', (last_user_id, sent, blocked, failed, elapsed, broadcast_id))
+                await db.commit()
+                return True
+        
+        except Exception as e:
+            logger.error(f"Помилка збереження прогресу розсилки {broadcast_id}: {e}")
+            return False
+    
+    @track_db
+    async def get_user_ids_page(self, after_user_id: int, limit: int) -> Optional[List[int]]:
+        """Наступна сторінка user_id за первинним ключем (None - помилка БД)"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute(
+                    "SELECT user_id FROM players WHERE user_id > ? ORDER BY user_id LIMIT ?",
+                    (after_user_id, limit)
+                )
+                return [row[0] for row in await cursor.fetchall()]
+        
+        except Exception as e:
+            logger.error(f"Помилка вибірки гравців після {after_user_id}: {e}")
+            return None
+    
+    @track_db
+    async def count_players(self) -> int:
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute("SELECT COUNT(*) FROM players")
+                return (await cursor.fetchone())[0]
+        
+        except Exception as e:
+            logger.error(f"Помилка підрахунку гравців: {e}")
+            return 0
@@ -4,5 +4,9 @@ from . import inventory
 from . import battle
 from . import shop
 from . import tavern
+from . import expedition
+from . import top
+from . import admin
+from . import daily
 
-__all__ = ['start', 'city', 'inventory', 'battle', 'shop', 'tavern']
\ No newline at end of file
+__all__ = ['start', 'city', 'inventory', 'battle', 'shop', 'tavern', 'expedition', 'top', 'admin', 'daily']
\ No newline at end of file
@@ -0,0 +1,137 @@
+﻿# src/handlers/admin.py - Адмін-команди (доступ - settings.ADMIN_IDS)
+
+import logging
+import time
+from aiogram import Router, F, types
+from aiogram.filters import Command, CommandObject
+
+from src.database import Database
+from src.config.settings import settings
+from src.services.broadcast import format_progress, progress_keyboard, start_broadcast, stop_broadcast
+from src.services.stats import run_stats_once
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+HISTOGRAM_WIDTH = 12
+
+
+def is_admin(user_id: int) -> bool:
+    return user_id in settings.ADMIN_IDS
+
+
+def format_stats(stats: dict) -> str:
+    """Текст звіту /stats"""
+    players = stats["players"]
+    average_gold = stats["gold"] // players if players else 0
+    
+    text = (
+        "📊 **Статистика економіки**\n\n"
+        f"👥 Гравців: {players}\n"
+        f"💰 Золото в обігу: {stats['gold']} (в середньому {average_gold})\n"
+        f"🏦 Зароблено за весь час: {stats['gold_earned']}\n"
+    )
+    
+    if stats["levels"]:
+        text += "\n📈 **Рівні:**\n"
+        peak = max(count for _, count in stats["levels"])
+        for level, count in stats["levels"]:
+            bar = "▇" * max(1, round(count / peak * HISTOGRAM_WIDTH))
+            text += f"`{level:>3}` {bar} {count}\n"
+    
+    if stats["items"]:
+        text += "\n🎒 **Найпоширеніші предмети:**\n"
+        for name, copies, holders in stats["items"]:
+            text += f"• {name} - у {holders} гравців, {copies} шт.\n"
+    
+    if stats["pending"]:
+        text += f"\n⏳ Ще не враховано змін: {stats['pending']}"
+    
+    return text
+
+
+@router.message(Command("stats"))
+async def cmd_stats(message: types.Message):
+    """Агрегована статистика економіки (без розбору JSON гравців)"""
+    if not is_admin(message.from_user.id):
+        return
+    
+    db = Database()
+    # Дотягуємо зміни з останнього проходу фонової задачі
+    await run_stats_once(db)
+    stats = await db.get_stats_overview()
+    
+    if stats is None:
+        await message.answer("❌ Не вдалося отримати статистику")
+        return
+    
+    await message.answer(format_stats(stats), parse_mode="Markdown")
+
+
+# ==================== РОЗСИЛКИ ====================
+
+@router.message(Command("broadcast"))
+async def cmd_broadcast(message: types.Message, command: CommandObject):
+    """/broadcast <текст> - розсилка всім гравцям (після підтвердження)"""
+    if not is_admin(message.from_user.id):
+        return
+    
+    if not command.args:
+        await message.answer("📣 Використання: /broadcast <текст повідомлення>")
+        return
+    
+    db = Database()
+    broadcast_id = await db.create_broadcast(message.from_user.id, command.args, int(time.time()))
+    if broadcast_id is None:
+        await message.answer("❌ Не вдалося створити розсилку")
+        return
+    
+    players = await db.count_players()
+    keyboard = types.InlineKeyboardMarkup(inline_keyboard=[
+        [types.InlineKeyboardButton(text=f"✅ Надіслати ({players})", callback_data=f"broadcast_start_{broadcast_id}")],
+        [types.InlineKeyboardButton(text="✖️ Скасувати", callback_data=f"broadcast_cancel_{broadcast_id}")],
+    ])
+    
+    # Без розмітки - адміністратор бачить саме те, що отримають гравці
+    await message.answer(
+        f"📣 Розсилка #{broadcast_id} для {players} гравців:\n\n{command.args}",
+        reply_markup=keyboard
+    )
+
+
+@router.callback_query(F.data.startswith("broadcast_"))
+async def broadcast_action(callback: types.CallbackQuery):
+    """Підтвердження, скасування і зупинка розсилки"""
+    if not is_admin(callback.from_user.id):
+        await callback.answer()
+        return
+    
+    _, action, broadcast_id = callback.data.split("_", 2)
+    broadcast_id = int(broadcast_id)
+    db = Database()
+    
+    if action == "start":
+        started = await db.set_broadcast_status(
+            broadcast_id, "running", ("pending",),
+            total=await db.count_players(),
+            progress_message_id=callback.message.message_id
+        )
+        if not started:
+            await callback.answer("Розсилку вже запущено або скасовано", show_alert=True)
+            return
+        start_broadcast(callback.bot, db, broadcast_id)
+    
+    elif action == "cancel":
+        if not await db.set_broadcast_status(broadcast_id, "cancelled", ("pending",), now_ts=int(time.time())):
+            await callback.answer("Розсилку вже запущено або скасовано", show_alert=True)
+            return
+    
+    elif action == "stop":
+        if not await stop_broadcast(db, broadcast_id):
+            await callback.answer("Розсилка вже завершилась", show_alert=True)
+            return
+    
+    broadcast = await db.get_broadcast(broadcast_id)
+    if broadcast:
+        await callback.message.edit_text(format_progress(broadcast), reply_markup=progress_keyboard(broadcast))
+    await callback.answer()
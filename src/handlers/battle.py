@@ -1,19 +1,22 @@
 ﻿# src/handlers/battle.py - Бойова система з D&D механіками
 
 import logging
-import random
 from aiogram import Router, F, types
 from typing import Optional
-import random
 
 from src.database import Database
 from src.models.player import Player
-from src.models.monster import Monster
 from src.utils.dice import DiceRoller, CombatCalculator, BattleText
-from src.ui.keyboards import get_city_keyboard, get_adventure_main_keyboard
+from src.utils import combat
+from src.utils.combat import BattleState
+from src.ui.keyboards import get_city_keyboard, get_adventure_main_keyboard, frozen_markup_cache
+from src.config.abilities import ABILITIES
 from src.config.constants import LOCATIONS
-from src.utils.skill_checks import SkillCheck, get_random_event
-from src.models.quest import Quest, QuestStatus
+from src.config.equipment import RARITY_EMOJI
+from src.config.settings import settings
+from src.utils.skill_checks import SkillCheck, roll_location_event
+from src.models.quest import Quest, QuestStatus, update_player_quests
+from src.services.event_store import create_event_store
 
 # Forward declaration для IDE
 async def monster_turn(callback, battle_state, battle_log): ...
@@ -24,137 +27,60 @@ logger = logging.getLogger(__name__)
 # Активні бої
 active_battles = {}
 
-def update_player_quests(player, event_type: str, event_detail: str = None):
-    """
-    Оновлює прогрес квестів гравця
-    
-    Args:
-        player: Об'єкт гравця
-        event_type: Тип події ("kill", "survive")
-        event_detail: Деталі (тип монстра, локація)
-    """
-    if not player.quests:
-        return []
-    
-    completed_quests = []
-    
-    for quest_id, quest_data in player.quests.items():
-        # Пропускаємо неактивні квести
-        if quest_data.get("status") != "active":
-            continue
-        
-        quest = Quest.from_dict(quest_data)
-        
-        # Перевіряємо тип квесту
-        if quest.quest_type.value != event_type:
-            continue
-        
-        # Перевіряємо деталі (якщо є)
-        if quest.target_detail and quest.target_detail != event_detail:
-            continue
-        
-        # Оновлюємо прогрес
-        was_completed = quest.update_progress(1)
-        
-        # Оновлюємо в даних гравця
-        player.quests[quest_id] = quest.to_dict()
-        
-        if was_completed:
-            completed_quests.append(quest)
-    
-    return completed_quests
+# ✨ Події skill check, що чекають на відповідь (id події - у callback_data)
+pending_events = create_event_store()
 
-class BattleState:
-    """Стан бою з додатковими полями для D&D"""
-    
-    def __init__(self, player: Player, monster: Monster):
-        self.player = player
-        self.monster = monster
-        self.abilities_used = set()
-        self.round = 1
-        self.battle_log = []
-        
-        # Тимчасові ефекти
-        self.divine_shield_active = False
-        
-        # Лічильники використань здібностей за бій
-        self.fireballs_used = 0  # Маг
-        self.smite_undead_used = 0  # Паладин
-        
-        self.max_fireballs = 3
-        self.max_smite_undead = 3
-        
-        # ✨ НОВЕ: Отрута розбійника
-        self.poison_stacks = 0  # Кількість ходів з отрутою
-        self.poison_damage = 0  # Урон отрути за хід
+def _battle_ability_flags(player: Player, battle_state: BattleState) -> tuple:
+    """Стан кнопок навичок класу - ключ для кешу клавіатури бою"""
+    flags = []
+    for ability_id, ability in player.class_abilities.items():
+        block = combat.ability_block(battle_state, ability_id, check_target=False)
+        # Лічильник потрібен у ключі лише там, де він видно на кнопці
+        used = battle_state.ability_uses.get(ability_id, 0) if ability.get("uses_per_battle", 0) > 1 else 0
+        flags.append((ability_id, block, used))
+    return tuple(flags)
 
 
-def get_battle_keyboard(player: Player, battle_state: BattleState) -> types.InlineKeyboardMarkup:
-    """Клавіатура для бойових дій з навичками класу"""
+@frozen_markup_cache(maxsize=256)
+def _build_battle_keyboard(flags: tuple, has_inventory: bool) -> types.InlineKeyboardMarkup:
+    """Будує клавіатуру бою для прапорців навичок - результат кешується"""
     buttons = [
         [types.InlineKeyboardButton(text="⚔️ Атакувати", callback_data="battle_attack")],
         [types.InlineKeyboardButton(text="🛡️ Захищатися", callback_data="battle_defend")],
     ]
     
-    # Додаємо кнопку навички класу
-    if player.character_class == "mage":
-        if player.can_use_ability("fireball") and battle_state.fireballs_used < battle_state.max_fireballs:
-            buttons.append([
-                types.InlineKeyboardButton(
-                    text=f"🔥 Вогняний шар (5 мани) [{battle_state.fireballs_used}/{battle_state.max_fireballs}]",
-                    callback_data="battle_ability_fireball"
-                )
-            ])
-    
-    elif player.character_class == "warrior":
-        if "mighty_strike" not in battle_state.abilities_used:
-            if player.can_use_ability("mighty_strike"):
-                buttons.append([
-                    types.InlineKeyboardButton(
-                        text="💪 Могутній удар (6 мани, 1 раз)",
-                        callback_data="battle_ability_mighty_strike"
-                    )
-                ])
-            else:
-                buttons.append([
-                    types.InlineKeyboardButton(
-                        text="💪 Могутній удар (❌ мало мани)",
-                        callback_data="battle_no_mana"
-                    )
-                ])
-    
-    elif player.character_class == "rogue":
-        if player.can_use_ability("poison_strike"):
-            buttons.append([
-                types.InlineKeyboardButton(
-                    text="🗡️☠️ Ядовитий удар (4 мани)",
-                    callback_data="battle_ability_poison_strike"
-                )
-            ])
-    
-    elif player.character_class == "paladin":
-        if player.can_use_ability("divine_shield") and not battle_state.divine_shield_active:
+    # Кнопки навичок класу (з реєстру src/config/abilities.py)
+    for ability_id, block, used in flags:
+        ability = ABILITIES[ability_id]
+        limit = ability.get("uses_per_battle", 0)
+        
+        if block is None:
+            cost = f"{ability['mana_cost']} мани" + (", 1 раз" if limit == 1 else "")
+            text = f"{ability['name']} ({cost})"
+            if limit > 1:
+                text += f" [{used}/{limit}]"
             buttons.append([
-                types.InlineKeyboardButton(
-                    text="✨ Божественний щит (5 мани)",
-                    callback_data="battle_ability_divine_shield"
-                )
+                types.InlineKeyboardButton(text=text, callback_data=f"battle_ability_{ability_id}")
             ])
         
-        if player.can_use_ability("smite_undead") and battle_state.smite_undead_used < battle_state.max_smite_undead:
+        elif block == "mana" and ability.get("show_when_no_mana"):
             buttons.append([
                 types.InlineKeyboardButton(
-                    text=f"⚡ Знищення нежиті (5 мани) [{battle_state.smite_undead_used}/{battle_state.max_smite_undead}]",
-                    callback_data="battle_ability_smite_undead"
+                    text=f"{ability['name']} (❌ мало мани)",
+                    callback_data="battle_no_mana"
                 )
             ])
     
-    # Кнопки зілль і втечі
-    if player.inventory:
+    # Кнопки зілль, автобою і втечі
+    if has_inventory:
         buttons.append([
             types.InlineKeyboardButton(text="🧪 Зілля", callback_data="battle_use_potion")
         ])
     
+    buttons.append([
+        types.InlineKeyboardButton(text="🤖 Автобій", callback_data="battle_auto")
+    ])
+    
     buttons.append([
         types.InlineKeyboardButton(text="💨 Втекти", callback_data="battle_flee")
     ])
@@ -162,6 +88,16 @@ def get_battle_keyboard(player: Player, battle_state: BattleState) -> types.Inli
     return types.InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+def get_battle_keyboard(player: Player, battle_state: BattleState) -> types.InlineKeyboardMarkup:
+    """Клавіатура для бойових дій з навичками класу"""
+    # ✨ Розмітка не змінюється між раундами з однаковим станом навичок,
+    # тому беремо готовий заморожений екземпляр з кешу (див. src/ui/keyboards.py)
+    return _build_battle_keyboard(
+        _battle_ability_flags(player, battle_state),
+        bool(player.inventory)
+    )
+
+
 # Додайте обробник для "немає мани"
 @router.callback_query(F.data == "battle_no_mana")
 async def battle_no_mana(callback: types.CallbackQuery):
@@ -262,11 +198,7 @@ async def return_to_city_button(message: types.Message):
         player = Player.from_dict(player_data)
         
         # Застосовуємо регенерацію на основі ЧАСУ
-<<<<<<< HEAD
-        regen_result = player.apply_regeneration(in_combat=True)
-=======
         regen_result = player.apply_regeneration()
->>>>>>> dbfefd437cfb4e6361874e9c11e0aa09b24b1cd4
         
         # Зберігаємо
         await db.save_player(player.to_dict())
@@ -331,12 +263,17 @@ async def explore_location(callback: types.CallbackQuery):
         await callback.answer(f"❌ Потрібен {location['level_required']} рівень!", show_alert=True)
         return
     
-    # ✨ НОВЕ: 30% шанс на випадкову подію
-    if random.random() < 0.3:
-        event = get_random_event(location_id)
-        if event:
-            await show_skill_check_event(callback, location_id, location, event)
-            return
+    # ✨ Поки загін в експедиції, гравець не досліджує сам
+    expedition = await db.get_open_expedition(callback.from_user.id)
+    if expedition and expedition["status"] == "active":
+        await callback.answer("🧭 Ви в експедиції! Дочекайтесь повернення.", show_alert=True)
+        return
+    
+    # ✨ Випадкова подія за шансом і вагами таблиці локації
+    event = roll_location_event(location_id)
+    if event:
+        await show_skill_check_event(callback, location_id, location, event)
+        return
     
     # Якщо події немає - звичайний бій
     await start_monster_encounter(callback, location_id, location, player)
@@ -357,14 +294,21 @@ async def show_skill_check_event(callback: types.CallbackQuery, location_id: str
         "charisma": "🎭 Харизма"
     }
     
+    # Зберігаємо подію для наступної дії
+    event_id = await pending_events.put(callback.from_user.id, location_id, event)
+    if event_id is None:
+        # ✨ Подію не збережено - кнопки завжди казали б "подія минула"
+        await callback.answer("❌ Помилка! Спробуйте ще раз.", show_alert=True)
+        return
+    
     keyboard = types.InlineKeyboardMarkup(inline_keyboard=[
         [types.InlineKeyboardButton(
             text=f"🎲 Спробувати ({stat_names[event['stat']]})",
-            callback_data=f"skill_check_{location_id}_{event['stat']}"
+            callback_data=f"skill_check_{event_id}"
         )],
         [types.InlineKeyboardButton(
             text="↩️ Пропустити",
-            callback_data=f"skip_event_{location_id}"
+            callback_data=f"skip_event_{event_id}"
         )]
     ])
     
@@ -377,11 +321,6 @@ async def show_skill_check_event(callback: types.CallbackQuery, location_id: str
         f"Що робитимете?"
     )
     
-    # Зберігаємо подію для наступної дії
-    if not hasattr(explore_location, 'active_events'):
-        explore_location.active_events = {}
-    explore_location.active_events[callback.from_user.id] = event
-    
     await callback.message.edit_text(
         event_text,
         reply_markup=keyboard,
@@ -392,18 +331,7 @@ async def show_skill_check_event(callback: types.CallbackQuery, location_id: str
 
 async def start_monster_encounter(callback: types.CallbackQuery, location_id: str, location: dict, player):
     """Створює зустріч з монстром"""
-    available_monsters = location.get("monsters", ["wolf"])
-    monster_type = random.choice(available_monsters)
-    
-    # ✨ ВИПРАВЛЕННЯ: Рівень монстра базується на локації, а не на гравці
-    location_level = location.get("level_required", 1)
-    
-    # Монстр може бути ±1 рівень від рівня локації
-    # Але не менше 1 і не більше ніж рівень локації + 2
-    monster_level = location_level + random.randint(-1, 1)
-    monster_level = max(1, min(monster_level, location_level + 2))
-    
-    monster = Monster(monster_type, monster_level)
+    monster = combat.spawn_monster(location_id)
     
     battle_state = BattleState(player, monster)
     active_battles[callback.from_user.id] = battle_state
@@ -441,16 +369,17 @@ async def start_monster_encounter(callback: types.CallbackQuery, location_id: st
 @router.callback_query(F.data.startswith("skill_check_"))
 async def handle_skill_check(callback: types.CallbackQuery):
     """Обробка спроби skill check"""
-    parts = callback.data.split("_")
-    location_id = parts[2]
-    stat_type = parts[3]
-    
-    # Отримуємо збережену подію
-    event = getattr(explore_location, 'active_events', {}).get(callback.from_user.id)
-    if not event:
-        await callback.answer("❌ Подія не знайдена!")
+    event_id = callback.data.replace("skill_check_", "")
+    
+    # Забираємо збережену подію одразу - повторне натискання її вже не знайде
+    pending = await pending_events.pop(event_id, callback.from_user.id)
+    if not pending:
+        await callback.answer("❌ Подія не знайдена або застаріла!")
         return
     
+    event = pending.event
+    stat_type = event['stat']
+    
     db = Database()
     player_data = await db.get_player(callback.from_user.id)
     player = Player.from_dict(player_data)
@@ -502,10 +431,6 @@ async def handle_skill_check(callback: types.CallbackQuery):
     # Зберігаємо зміни
     await db.save_player(player.to_dict())
     
-    # Очищуємо збережену подію
-    if hasattr(explore_location, 'active_events') and callback.from_user.id in explore_location.active_events:
-        del explore_location.active_events[callback.from_user.id]
-    
     keyboard = types.InlineKeyboardMarkup(inline_keyboard=[
         [types.InlineKeyboardButton(
             text="🌲 Продовжити дослідження",
@@ -524,13 +449,15 @@ async def handle_skill_check(callback: types.CallbackQuery):
 @router.callback_query(F.data.startswith("skip_event_"))
 async def skip_event(callback: types.CallbackQuery):
     """Пропускає подію і йде до бою"""
-    location_id = callback.data.replace("skip_event_", "")
+    event_id = callback.data.replace("skip_event_", "")
     
-    # Очищуємо збережену подію
-    if hasattr(explore_location, 'active_events') and callback.from_user.id in explore_location.active_events:
-        del explore_location.active_events[callback.from_user.id]
+    pending = await pending_events.pop(event_id, callback.from_user.id)
+    if not pending or pending.location_id not in LOCATIONS:
+        await callback.answer("❌ Подія не знайдена або застаріла!")
+        return
     
     # Отримуємо дані для бою
+    location_id = pending.location_id
     location = LOCATIONS[location_id]
     db = Database()
     player_data = await db.get_player(callback.from_user.id)
@@ -549,8 +476,9 @@ async def battle_attack(callback: types.CallbackQuery):
         return
     
     battle_state = active_battles[user_id]
-    player = battle_state.player
-    monster = battle_state.monster
+    
+    # Результат рахує рушій, хендлер лише анімує його
+    result = combat.player_attack(battle_state)
     
     # ============ АНІМАЦІЯ КУБИКА ============
     import asyncio
@@ -572,103 +500,25 @@ async def battle_attack(callback: types.CallbackQuery):
     )
     await asyncio.sleep(0.4)
     
-    # Розраховуємо результат
-    attack_bonus = player.get_attack_bonus()
-    d20_result, total_roll, is_critical = CombatCalculator.attack_roll(attack_bonus)
-    
     # Анімація: показуємо результат
     await callback.message.edit_text(
-        f"{current_text}\n\n🎲 Випало: **{d20_result}**!",
+        f"{current_text}\n\n🎲 Випало: **{result['d20']}**!",
         parse_mode="Markdown"
     )
     await asyncio.sleep(0.5)
     # =========================================
     
-    monster_ac = monster.defense + 10
-    battle_log = []
-    
-    # Критичний промах
-    if d20_result == 1:
-        battle_log.append(f"💀 Критичний промах! (випало 1)")
-        battle_log.append(f"Ви не наносите урону")
-    
-    # Попадання
-    elif total_roll >= monster_ac or is_critical:
-        weapon = player.equipment.get("weapon")
-        
-        if not weapon:
-            damage = 1 + (player.strength - 10) // 2
-            battle_log.append(f"🥊 Удар кулаком: {damage} урону")
-        else:
-            weapon_type = weapon.get("weapon_type", "melee")
-            
-            if weapon_type == "melee":
-                stat_bonus = (player.strength + player.get_total_stat_bonus("strength") - 10) // 2
-            elif weapon_type == "ranged":
-                stat_bonus = (player.agility + player.get_total_stat_bonus("agility") - 10) // 2
-            else:
-                stat_bonus = (player.intelligence + player.get_total_stat_bonus("intelligence") - 10) // 2
-            
-            damage, damage_desc = CombatCalculator.damage_roll(weapon, stat_bonus, is_critical)
-            
-            if is_critical:
-                battle_log.append(f"💥 КРИТИЧНИЙ УДАР! (випало 20)")
-            
-            # ✨ ПАСИВКА РОЗБІЙНИКА - Критичний удар
-            if player.character_class == "rogue" and not is_critical:
-                crit_chance = player.get_critical_chance()
-                if random.randint(1, 100) <= crit_chance:
-                    damage *= 2
-                    battle_log.append(f"🗡️ ПАСИВКА: Критичний удар розбійника! ({crit_chance}%)")
-                    battle_log.append(f"💥 Урон подвоєно!")
-            
-            battle_log.append(f"🎲 d20: {d20_result} + {attack_bonus} = {total_roll} (AC {monster_ac})")
-            battle_log.append(f"⚔️ Урон: {damage_desc}")
-        
-        monster.health -= damage
-        player.total_damage_dealt += damage
-        
-        # ✨ ПАСИВКА ВОЇНА - Подвійний удар
-        if player.character_class == "warrior":
-            double_chance = player.get_double_attack_chance()
-            if random.randint(1, 100) <= double_chance:
-                # Другий удар
-                d20_second, total_second, is_crit_second = CombatCalculator.attack_roll(attack_bonus)
-                
-                battle_log.append(f"\n⚔️⚔️ ПАСИВКА: Подвійний удар! ({double_chance}%)")
-                
-                if total_second >= monster_ac or is_crit_second:
-                    # Попадання другого удару
-                    if weapon:
-                        damage_second, desc_second = CombatCalculator.damage_roll(weapon, stat_bonus, is_crit_second)
-                        
-                        if is_crit_second:
-                            battle_log.append(f"💥 Другий удар - КРИТ!")
-                    else:
-                        damage_second = 1 + (player.strength - 10) // 2
-                        desc_second = str(damage_second)
-                    
-                    monster.health -= damage_second
-                    player.total_damage_dealt += damage_second
-                    battle_log.append(f"🎲 d20: {d20_second} → Урон: {desc_second}")
-                else:
-                    battle_log.append(f"❌ Другий удар промахнувся! (d20: {d20_second})")
-    
-    # Промах
-    else:
-        battle_log.append(f"❌ Промах! d20: {d20_result} + {attack_bonus} = {total_roll} (потрібно {monster_ac}+)")
+    battle_log = result["log"]
     
     # Перевірка смерті монстра
-    if monster.health <= 0:
+    if result["victory"]:
         await handle_victory(callback, battle_state, battle_log)
         return
     
     # Хід монстра
     await monster_turn(callback, battle_state, battle_log)
-# ↑↑↑ ТУТ ЗАКІНЧУЄТЬСЯ battle_attack ↑↑↑
 
 
-# ↓↓↓ ТУТ ПОЧИНАЄТЬСЯ monster_turn ↓↓↓
 async def monster_turn(callback: types.CallbackQuery, battle_state: BattleState, battle_log: list):
     """Хід монстра з анімацією"""
     import asyncio
@@ -688,58 +538,37 @@ async def monster_turn(callback: types.CallbackQuery, battle_state: BattleState,
     await asyncio.sleep(0.8)
     
     # ============ ХІД МОНСТРА ============
-    if battle_state.divine_shield_active:
-        battle_log.append(f"\n✨ Божественний щит блокує атаку!")
-        battle_state.divine_shield_active = False
-    else:
+    if combat.monster_will_roll(battle_state):
         # Анімація кубика монстра
         await callback.message.edit_text(
             f"{temp_text}\n\n👹 {monster.name} атакує...\n🎲 Кубик крутиться...",
             parse_mode="Markdown"
         )
         await asyncio.sleep(0.5)
-        
-        monster_attack_bonus = (monster.attack - 10) // 2
-        d20_result, total_roll, is_critical = CombatCalculator.attack_roll(monster_attack_bonus)
-        player_ac = player.get_armor_class()
-        
+    
+    result = combat.monster_attack(battle_state, battle_log)
+    
+    if result["d20"] is not None:
         # Показуємо результат кубика монстра
         await callback.message.edit_text(
-            f"{temp_text}\n\n👹 {monster.name} атакує...\n🎲 Випало: **{d20_result}**!",
+            f"{temp_text}\n\n👹 {monster.name} атакує...\n🎲 Випало: **{result['d20']}**!",
             parse_mode="Markdown"
         )
         await asyncio.sleep(0.5)
-        
-        # Критичний промах
-        if d20_result == 1:
-            battle_log.append(f"\n💀 {monster.name} критично промахнувся!")
-        
-        # Попадання
-        elif total_roll >= player_ac or is_critical:
-            damage = max(1, monster.attack - player.get_defense() // 2)
-            
-            if is_critical:
-                damage *= 2
-                battle_log.append(f"\n💥 {monster.name} завдає КРИТИЧНИЙ УДАР!")
-            
-            battle_log.append(f"\n👹 {monster.name} атакує!")
-            battle_log.append(f"🎲 d20: {d20_result} + {monster_attack_bonus} = {total_roll} (ваш AC {player_ac})")
-            battle_log.append(f"💔 Ви отримали {damage} урону")
-            
-            player.health -= damage
-            player.total_damage_taken += damage
-        
-        # Промах
-        else:
-            battle_log.append(f"\n👹 {monster.name} промахнувся! ({total_roll} проти AC {player_ac})")
     
     # Перевірка смерті гравця
-    if player.health <= 0:
+    if result["defeat"]:
         await handle_defeat(callback, battle_state, battle_log)
         return
     
-    # Наступний раунд
-    battle_state.round += 1
+    # ✨ Статус-ефекти (отрута тощо) та наступний раунд
+    round_result = combat.end_round(battle_state, battle_log)
+    if round_result["victory"]:
+        await handle_victory(callback, battle_state, battle_log)
+        return
+    if round_result["defeat"]:
+        await handle_defeat(callback, battle_state, battle_log)
+        return
     
     # Фінальний текст бою
     battle_text = "\n".join(battle_log)
@@ -766,168 +595,18 @@ async def use_class_ability(callback: types.CallbackQuery):
         return
     
     battle_state = active_battles[user_id]
-    player = battle_state.player
-    monster = battle_state.monster
     
-    battle_log = []
+    result = combat.use_ability(battle_state, ability)
     
-    # ========== МАГ: Вогняний шар ==========
-    if ability == "fireball":
-        if battle_state.fireballs_used >= battle_state.max_fireballs:
-            await callback.answer(f"❌ Ви вже використали Вогняний шар {battle_state.max_fireballs} рази!", show_alert=True)
-            return
-        
-        if not player.can_use_ability("fireball"):
-            await callback.answer("❌ Недостатньо мани!", show_alert=True)
-            return
-        
-        player.use_ability("fireball")
-        battle_state.fireballs_used += 1
-        
-        stat_bonus = (player.intelligence + player.get_total_stat_bonus("intelligence") - 10) // 2
-        damage, damage_desc = CombatCalculator.spell_damage("2d6", stat_bonus)
-        
-        battle_log.append(f"🔥 Ви використовуєте Вогняний шар! ({battle_state.fireballs_used}/{battle_state.max_fireballs})")
-        battle_log.append(f"🎲 {damage_desc}")
-        
-        monster.health -= damage
-        player.total_damage_dealt += damage
-    
-    # ========== ВОЇН: Могутній удар ==========
-    elif ability == "mighty_strike":
-        if "mighty_strike" in battle_state.abilities_used:
-            await callback.answer("❌ Ви вже використали Могутній удар!", show_alert=True)
-            return
-        
-        if not player.can_use_ability("mighty_strike"):
-            await callback.answer("❌ Недостатньо мани! (потрібно 6)", show_alert=True)
-            return
-        
-        player.use_ability("mighty_strike")
-        battle_state.abilities_used.add("mighty_strike")
-        
-        weapon = player.equipment.get("weapon")
-        if not weapon:
-            damage = int((1 + (player.strength - 10) // 2) * 2.5)
-        else:
-            stat_bonus = (player.strength + player.get_total_stat_bonus("strength") - 10) // 2
-            base_damage, _ = CombatCalculator.damage_roll(weapon, stat_bonus, False)
-            damage = int(base_damage * 2.5)
-        
-        battle_log.append("⚔️ Ви використовуєте Могутній удар!")
-        battle_log.append(f"💥 × 2.5 урону: {damage}")
-        
-        monster.health -= damage
-        player.total_damage_dealt += damage
-    
-    # ========== РОЗБІЙНИК: Ядовитий удар ==========
-    elif ability == "poison_strike":
-        if not player.can_use_ability("poison_strike"):
-            await callback.answer("❌ Недостатньо мани! (потрібно 4)", show_alert=True)
-            return
-        
-        player.use_ability("poison_strike")
-        
-        # Наносимо звичайний удар
-        weapon = player.equipment.get("weapon")
-        attack_bonus = player.get_attack_bonus()
-        d20_result, total_roll, is_critical = CombatCalculator.attack_roll(attack_bonus)
-        monster_ac = monster.defense + 10
-        
-        if total_roll >= monster_ac or is_critical:
-            if weapon:
-                stat_bonus = (player.agility + player.get_total_stat_bonus("agility") - 10) // 2
-                damage, damage_desc = CombatCalculator.damage_roll(weapon, stat_bonus, is_critical)
-            else:
-                damage = 1 + (player.agility - 10) // 2
-                damage_desc = str(damage)
-            
-            monster.health -= damage
-            player.total_damage_dealt += damage
-            
-            battle_log.append(f"🗡️ Ви використовуєте Ядовитий удар!")
-            battle_log.append(f"⚔️ Урон: {damage_desc}")
-            
-            # Накладаємо отруту на 3 ходи
-            battle_state.poison_stacks = 3
-            battle_state.poison_damage = random.randint(1, 4)  # 1d4
-            battle_log.append(f"☠️ Отрута накладена! ({battle_state.poison_damage} урону за хід, 3 ходи)")
-        else:
-            battle_log.append(f"🗡️ Ядовитий удар...")
-            battle_log.append(f"❌ Промах! d20: {d20_result}")
-    
-    # ========== ПАЛАДИН: Божественний щит ==========
-    elif ability == "divine_shield":
-        if battle_state.divine_shield_active:
-            await callback.answer("❌ Щит вже активний!", show_alert=True)
-            return
-        
-        if not player.can_use_ability("divine_shield"):
-            await callback.answer("❌ Недостатньо мани!", show_alert=True)
-            return
-        
-        player.use_ability("divine_shield")
-        battle_state.divine_shield_active = True
-        
-        battle_log.append("✨ Ви активуєте Божественний щит!")
-        battle_log.append("🛡️ Наступна атака монстра буде заблокована")
-    
-    # ========== ПАЛАДИН: Знищення нежиті ==========
-    elif ability == "smite_undead":
-        if battle_state.smite_undead_used >= battle_state.max_smite_undead:
-            await callback.answer(f"❌ Ви вже використали Знищення нежиті {battle_state.max_smite_undead} рази!", show_alert=True)
-            return
-        
-        if not player.can_use_ability("smite_undead"):
-            await callback.answer("❌ Недостатньо мани!", show_alert=True)
-            return
-        
-        # Перевірка чи це нежить
-        undead_types = ["skeleton", "zombie", "ghost", "vampire"]
-        if monster.monster_type not in undead_types:
-            await callback.answer("❌ Ця здібність працює лише проти нежиті!", show_alert=True)
-            return
-        
-        player.use_ability("smite_undead")
-        battle_state.smite_undead_used += 1
-        
-        # Кидок 1d20 урону
-        damage = random.randint(1, 20)
-        
-        battle_log.append(f"⚡ Ви використовуєте Знищення нежиті! ({battle_state.smite_undead_used}/{battle_state.max_smite_undead})")
-        battle_log.append(f"🎲 d20: {damage} святого урону")
-        
-        monster.health -= damage
-        player.total_damage_dealt += damage
+    if result["error"]:
+        await callback.answer(result["error"], show_alert=True)
+        return
     
-    if monster.health <= 0:
-        await handle_victory(callback, battle_state, battle_log)
+    if result["victory"]:
+        await handle_victory(callback, battle_state, result["log"])
         return
     
-    await monster_turn(callback, battle_state, battle_log)
-
-
-# ============================================================
-# КРОК 7: Додати урон отрути в monster_turn
-# ============================================================
-# У функції monster_turn ПЕРЕД "Наступний раунд" додайте:
-
-    # ✨ НОВЕ: Урон від отрути
-    if battle_state.poison_stacks > 0:
-        poison_dmg = battle_state.poison_damage
-        monster.health -= poison_dmg
-        battle_log.append(f"\n☠️ Отрута наносить {poison_dmg} урону")
-        battle_state.poison_stacks -= 1
-        
-        if battle_state.poison_stacks > 0:
-            battle_log.append(f"☠️ Отрута діє ще {battle_state.poison_stacks} ходів")
-        else:
-            battle_log.append(f"✓ Отрута перестала діяти")
-        
-        # Перевірка смерті від отрути
-        if monster.health <= 0:
-            await handle_victory(callback, battle_state, battle_log)
-            return
+    await monster_turn(callback, battle_state, result["log"])
 
 
 async def handle_victory(callback: types.CallbackQuery, battle_state: BattleState, battle_log: list):
@@ -948,6 +627,11 @@ async def handle_victory(callback: types.CallbackQuery, battle_state: BattleStat
     # ✨ НОВЕ: Оновлюємо квести
     completed_quests = update_player_quests(player, "kill", monster.monster_type)
     
+    # ✨ Лут з таблиці монстра; що не влазить в інвентар - пропадає
+    free_slots = max(0, settings.MAX_INVENTORY_SIZE - len(player.inventory))
+    loot = monster.get_loot(battle_state.rng)[:free_slots]
+    player.inventory.extend(loot)
+    
     db = Database()
     await db.save_player(player.to_dict())
     
@@ -959,6 +643,11 @@ async def handle_victory(callback: types.CallbackQuery, battle_state: BattleStat
     victory_text += f"✨ +{exp_reward} досвіду\n"
     victory_text += f"💰 +{gold_reward} золота\n"
     
+    if loot:
+        victory_text += f"\n🎒 **Здобич:**\n"
+        for item in loot:
+            victory_text += f"{RARITY_EMOJI.get(item.get('rarity'), '📦')} {item['name']}\n"
+    
     if level_up_result["leveled_up"]:
         victory_text += f"\n🎊 **НОВИЙ РІВЕНЬ {level_up_result['new_level']}!**\n"
         victory_text += f"⭐ +3 вільних очка характеристик\n"
@@ -1015,7 +704,7 @@ async def handle_defeat(callback: types.CallbackQuery, battle_state: BattleState
 
 @router.callback_query(F.data == "battle_defend")
 async def battle_defend(callback: types.CallbackQuery):
-    """Захист - збільшує AC на цей раунд"""
+    """Захист - збільшує AC і захист на цей раунд (ефект бою, стати не змінюються)"""
     user_id = callback.from_user.id
     
     if user_id not in active_battles:
@@ -1023,16 +712,10 @@ async def battle_defend(callback: types.CallbackQuery):
         return
     
     battle_state = active_battles[user_id]
-    player = battle_state.player
-    
-    old_stamina = player.stamina
-    player.stamina += 5
     
-    battle_log = ["🛡️ Ви займаєте оборонну позицію"]
+    battle_log = combat.defend(battle_state)
     
     await monster_turn(callback, battle_state, battle_log)
-    
-    player.stamina = old_stamina
 
 
 @router.callback_query(F.data == "battle_use_potion")
@@ -1151,80 +834,83 @@ async def battle_drink_potion(callback: types.CallbackQuery):
         return
     
     battle_state = active_battles[user_id]
-    player = battle_state.player
-    monster = battle_state.monster
     
-    if real_index < 0 or real_index >= len(player.inventory):
-        await callback.answer("❌ Зілля не знайдено!")
+    result = combat.drink_potion(battle_state, real_index)
+    if result["error"]:
+        await callback.answer(result["error"], show_alert=result["alert"])
         return
     
-    potion = player.inventory[real_index]
+    # Зберігаємо зміни
+    db = Database()
+    await db.save_player(battle_state.player.to_dict())
     
-    if not isinstance(potion, dict) or potion.get("type") != "potion":
-        await callback.answer("❌ Це не зілля!")
-        return
+    # Хід монстра після використання зілля
+    await monster_turn(callback, battle_state, result["log"])
+
+
+def _auto_battle_summary(result: dict) -> list:
+    """Підсумок автобою - рядки для battle_log"""
+    lines = [
+        f"🤖 **Автобій**: {result['rounds']} раундів",
+        f"⚔️ Завдано урону: {result['damage_dealt']}",
+        f"💔 Отримано урону: {result['damage_taken']}",
+    ]
     
-    potion_name = potion.get("name", "Зілля")
-    effect_type = potion.get("effect_type", "")
-    effect_value = potion.get("effect_value", 0)
+    if result["potions"]:
+        lines.append(f"🧪 Випито зілль: {result['potions']}")
     
-    current_hp = player.health
-    max_hp = player.max_health
+    if result["abilities"]:
+        used = ", ".join(
+            f"{ABILITIES[ability_id]['title']} ×{count}"
+            for ability_id, count in result["abilities"].items()
+        )
+        lines.append(f"✨ Навички: {used}")
     
-    battle_log = []
+    lines.append("\n📜 **Останній раунд:**")
+    lines.extend(result["log"])
+    return lines
+
+
+@router.callback_query(F.data == "battle_auto")
+async def battle_auto(callback: types.CallbackQuery):
+    """✨ Автобій: решта бою рахується на сервері, гравець бачить одне повідомлення"""
+    user_id = callback.from_user.id
     
-    # ========== ЗІЛЛЯ ЗДОРОВ'Я ==========
-    if effect_type == "heal":
-        if current_hp >= max_hp:
-            await callback.answer("❤️ Ви вже на повному здоров'ї!", show_alert=True)
-            return
-        
-        healed = min(effect_value, max_hp - current_hp)
-        player.health += healed
-        battle_log.append(f"🧪 Ви випили {potion_name}")
-        battle_log.append(f"❤️ Відновлено {healed} HP")
-        
-    elif effect_type == "full_heal":
-        if current_hp >= max_hp:
-            await callback.answer("❤️ Ви вже на повному здоров'ї!", show_alert=True)
-            return
-        
-        healed = max_hp - current_hp
-        player.health = max_hp
-        battle_log.append(f"🧪 Ви випили {potion_name}")
-        battle_log.append(f"✨ Повністю відновлено! (+{healed} HP)")
-    
-    # ========== ✨ НОВЕ: ЗІЛЛЯ МАНИ ==========
-    elif effect_type == "mana":
-        current_mana = player.mana
-        max_mana = player.max_mana
-        
-        if current_mana >= max_mana:
-            await callback.answer("💙 Ви вже на повній мані!", show_alert=True)
-            return
-        
-        # effect_value - це % (0.25, 0.5, 1.0)
-        mana_restored = int(max_mana * effect_value)
-        mana_restored = min(mana_restored, max_mana - current_mana)
-        
-        player.mana += mana_restored
-        battle_log.append(f"🧪 Ви випили {potion_name}")
-        battle_log.append(f"💙 Відновлено {mana_restored} мани")
+    if user_id not in active_battles:
+        await callback.answer("❌ Бій не знайдено!")
+        return
     
-    # ========== НЕВІДОМИЙ ТИП ==========
-    else:
-        await callback.answer("❌ Невідомий тип зілля!")
+    battle_state = active_battles[user_id]
+    player = battle_state.player
+    monster = battle_state.monster
+    
+    result = combat.auto_battle(battle_state)
+    battle_log = _auto_battle_summary(result)
+    
+    if result["outcome"] == "victory":
+        await handle_victory(callback, battle_state, battle_log)
         return
     
-    # Видаляємо зілля з інвентаря
-    player.inventory.pop(real_index)
+    if result["outcome"] == "defeat":
+        await handle_defeat(callback, battle_state, battle_log)
+        return
     
-    # Зберігаємо зміни
+    # Бій затягнувся - повертаємо керування гравцю (зілля вже витрачені)
     db = Database()
     await db.save_player(player.to_dict())
     
-    # Хід монстра після використання зілля
-    await monster_turn(callback, battle_state, battle_log)
+    battle_text = "\n".join(battle_log)
+    battle_text += f"\n\n⏳ Бій затягнувся - продовжуйте вручну"
+    battle_text += f"\n\n👤 Ваше HP: {player.health}/{player.max_health}"
+    battle_text += f"\n💙 Мана: {player.mana}/{player.max_mana}"
+    battle_text += f"\n👹 {monster.name} HP: {monster.health}/{monster.max_health}"
+    
+    await callback.message.edit_text(
+        battle_text,
+        reply_markup=get_battle_keyboard(player, battle_state),
+        parse_mode="Markdown"
+    )
+    await callback.answer()
 
 
 @router.callback_query(F.data == "battle_flee")
@@ -1240,10 +926,11 @@ async def battle_flee(callback: types.CallbackQuery):
     player = battle_state.player
     
     # Шанс втечі: 50% + бонус спритності
-    flee_chance = 50 + (player.agility * 2)
-    roll = random.randint(1, 100)
+    flee = combat.attempt_flee(battle_state)
+    flee_chance = flee["chance"]
+    roll = flee["roll"]
     
-    if roll <= flee_chance:
+    if flee["success"]:
         # Успішна втеча
         player.reset_battle_cooldowns()
         
@@ -60,7 +60,7 @@ async def show_character(message: types.Message):
     
     # ✨ НОВЕ: Показуємо повідомлення про регенерацію
     if regen_result["hp"] > 0 or regen_result["mana"] > 0:
-        offline_minutes = regen_result["offline_time"] // 60
+        offline_minutes = regen_result["seconds"] // 60
         char_info += f"💤 Ви відпочивали {offline_minutes} хв\n"
         if regen_result["hp"] > 0:
             char_info += f"💚 Відновлено {regen_result['hp']} HP\n"
@@ -0,0 +1,56 @@
+﻿# src/handlers/daily.py - Щоденна нагорода (/daily і кнопка з нагадування)
+
+import logging
+from aiogram import Router, F, types
+from aiogram.filters import Command
+
+from src.database import Database
+from src.handlers.battle import active_battles
+from src.services.daily_rewards import DAILY_CLAIM_CALLBACK, claim_daily_reward, seconds_until_reward
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+
+async def daily_reward_text(user_id: int) -> str:
+    """Видає нагороду, якщо можна, і повертає текст відповіді"""
+    # Бій тримає гравця в пам'яті і збереже його наприкінці - нагорода загубилась би
+    if user_id in active_battles:
+        return "⚔️ Спочатку завершіть бій!"
+    
+    db = Database()
+    claimed = await claim_daily_reward(db, user_id)
+    
+    if claimed:
+        logger.info(f"Гравець {user_id} отримав щоденну нагороду: {claimed['reward']} золота")
+        return (
+            "🎁 **Щоденна нагорода!**\n\n"
+            f"💰 +{claimed['reward']} золота\n"
+            f"👛 Тепер у вас: {claimed['gold']} золота\n\n"
+            "Повертайтеся завтра!"
+        )
+    
+    player_data = await db.get_player(user_id)
+    if not player_data:
+        return "❌ Персонаж не знайдено. Використайте /start"
+    
+    wait = seconds_until_reward(player_data.get("last_daily_reward_ts"))
+    if wait == 0:
+        # Нагорода доступна, але не збереглась
+        return "❌ Помилка! Спробуйте ще раз."
+    hours, minutes = wait // 3600, wait % 3600 // 60
+    return f"⏳ Нагороду вже отримано. Наступна - через {hours} год {minutes} хв."
+
+
+@router.message(Command("daily"))
+async def cmd_daily(message: types.Message):
+    """Обробник команди /daily"""
+    await message.answer(await daily_reward_text(message.from_user.id), parse_mode="Markdown")
+
+
+@router.callback_query(F.data == DAILY_CLAIM_CALLBACK)
+async def claim_from_notification(callback: types.CallbackQuery):
+    """Кнопка "Забрати нагороду" з нагадування"""
+    text = await daily_reward_text(callback.from_user.id)
+    await callback.message.edit_text(text, parse_mode="Markdown")
+    await callback.answer()
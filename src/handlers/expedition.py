@@ -0,0 +1,193 @@
+﻿# src/handlers/expedition.py - Експедиції (офлайн-полювання)
+
+import json
+import logging
+import time
+from aiogram import Router, F, types
+
+from src.database import Database
+from src.models.player import Player
+from src.config.constants import LOCATIONS, EXPEDITION_SIZES, EXPEDITION_SECONDS_PER_ENCOUNTER
+from src.handlers.battle import active_battles
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+# Лише локації з монстрами (місто - ні)
+EXPEDITION_LOCATIONS = {
+    location_id: location for location_id, location in LOCATIONS.items()
+    if location.get("monsters")
+}
+
+
+def format_expedition_result(expedition: dict) -> str:
+    """Текст звіту про розраховану експедицію"""
+    result = json.loads(expedition.get("result") or "{}")
+    location = LOCATIONS.get(expedition["location_id"], {"name": expedition["location_id"]})
+    
+    text = f"🧭 **Експедиція повернулась:** {location['name']}\n\n"
+    
+    if result.get("error"):
+        return text + "❌ Експедиція загубилась у дорозі. Спробуйте ще раз."
+    
+    text += f"⚔️ Боїв: {result['fights']}/{result['encounters']}, перемог: {result['victories']}\n"
+    if result["timeouts"]:
+        text += f"💨 Монстри втекли: {result['timeouts']}\n"
+    text += f"✨ +{result['exp']} досвіду\n"
+    text += f"💰 +{result['gold']} золота\n"
+    if result["potions"]:
+        text += f"🧪 Випито зілль: {result['potions']}\n"
+    
+    if result["loot"]:
+        text += "\n🎒 **Здобич:**\n"
+        for item, count in result["loot"].items():
+            text += f"• {item} ×{count}\n"
+    
+    for level in result["levels"]:
+        text += f"\n🎊 **НОВИЙ РІВЕНЬ {level}!**"
+    if result["levels"]:
+        text += "\n"
+    
+    if result["quests"]:
+        text += "\n📋 **Квести:**\n"
+        for quest_name in result["quests"]:
+            text += f"✅ {quest_name} - ВИКОНАНО!\n"
+    
+    if result["defeated"]:
+        text += "\n💀 Загін розбито, ви ледь повернулися живим.\nВідвідайте лікаря."
+    
+    return text
+
+
+@router.message(F.text == "🧭 Експедиція")
+async def show_expedition(message: types.Message):
+    """Стан експедиції: вибір локації, очікування або звіт"""
+    db = Database()
+    player_data = await db.get_player(message.from_user.id)
+    
+    if not player_data:
+        await message.answer("❌ Персонаж не знайдено. Використайте /start")
+        return
+    
+    expedition = await db.get_open_expedition(message.from_user.id)
+    
+    if expedition and expedition["status"] == "active":
+        minutes_left = max(0, expedition["ready_ts"] - int(time.time()) + 59) // 60
+        location = LOCATIONS.get(expedition["location_id"], {"name": expedition["location_id"]})
+        await message.answer(
+            f"🧭 **Експедиція триває**\n\n"
+            f"{location['name']}, боїв: {expedition['encounters']}\n"
+            f"⏳ Повернення приблизно через {minutes_left} хв.",
+            parse_mode="Markdown"
+        )
+        return
+    
+    if expedition:
+        # Розрахована - показуємо звіт один раз
+        if await db.claim_expedition(expedition["id"]):
+            await message.answer(format_expedition_result(expedition), parse_mode="Markdown")
+        return
+    
+    player = Player.from_dict(player_data)
+    
+    keyboard_buttons = []
+    for location_id, location in EXPEDITION_LOCATIONS.items():
+        if player.level >= location.get("level_required", 1):
+            keyboard_buttons.append([
+                types.InlineKeyboardButton(
+                    text=f"{location['name']} (Рів. {location['level_required']}+)",
+                    callback_data=f"expedition_loc_{location_id}"
+                )
+            ])
+    
+    await message.answer(
+        "🧭 **Експедиція**\n\n"
+        "Оберіть локацію - загін проведе бої без вас,\n"
+        "а результат чекатиме на повернення.",
+        reply_markup=types.InlineKeyboardMarkup(inline_keyboard=keyboard_buttons),
+        parse_mode="Markdown"
+    )
+
+
+@router.callback_query(F.data.startswith("expedition_loc_"))
+async def choose_expedition_size(callback: types.CallbackQuery):
+    """Вибір кількості боїв"""
+    location_id = callback.data.replace("expedition_loc_", "")
+    
+    if location_id not in EXPEDITION_LOCATIONS:
+        await callback.answer("❌ Локація не знайдена!")
+        return
+    
+    location = EXPEDITION_LOCATIONS[location_id]
+    keyboard = types.InlineKeyboardMarkup(inline_keyboard=[
+        [types.InlineKeyboardButton(
+            text=f"⚔️ {size} боїв (~{size * EXPEDITION_SECONDS_PER_ENCOUNTER // 60} хв)",
+            callback_data=f"expedition_go_{size}_{location_id}"
+        )]
+        for size in EXPEDITION_SIZES
+    ])
+    
+    await callback.message.edit_text(
+        f"🧭 **{location['name']}**\n\nСкільки боїв провести?",
+        reply_markup=keyboard,
+        parse_mode="Markdown"
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("expedition_go_"))
+async def start_expedition(callback: types.CallbackQuery):
+    """Відправляє гравця в експедицію"""
+    user_id = callback.from_user.id
+    
+    try:
+        size_raw, location_id = callback.data.replace("expedition_go_", "").split("_", 1)
+        encounters = int(size_raw)
+    except ValueError:
+        await callback.answer("❌ Помилка!")
+        return
+    
+    if location_id not in EXPEDITION_LOCATIONS or encounters not in EXPEDITION_SIZES:
+        await callback.answer("❌ Помилка!")
+        return
+    
+    if user_id in active_battles:
+        await callback.answer("⚔️ Спершу завершіть бій!", show_alert=True)
+        return
+    
+    db = Database()
+    player_data = await db.get_player(user_id)
+    
+    if not player_data:
+        await callback.answer("❌ Персонаж не знайдено.")
+        return
+    
+    player = Player.from_dict(player_data)
+    location = EXPEDITION_LOCATIONS[location_id]
+    
+    if player.level < location.get("level_required", 1):
+        await callback.answer(f"❌ Потрібен {location['level_required']} рівень!", show_alert=True)
+        return
+    
+    if player.health <= 0:
+        await callback.answer("💀 Ви занадто ослаблені! Відвідайте лікаря.", show_alert=True)
+        return
+    
+    now = int(time.time())
+    duration = encounters * EXPEDITION_SECONDS_PER_ENCOUNTER
+    expedition_id = await db.create_expedition(user_id, location_id, encounters, now, now + duration)
+    
+    if expedition_id is None:
+        await callback.answer("🧭 У вас вже є експедиція!", show_alert=True)
+        return
+    
+    logger.info(f"Гравець {user_id} вирушив в експедицію {location_id} ({encounters} боїв)")
+    
+    await callback.message.edit_text(
+        f"🧭 **Експедицію розпочато!**\n\n"
+        f"{location['name']}, боїв: {encounters}\n"
+        f"⏳ Повернення приблизно через {duration // 60} хв.\n\n"
+        f"Результат - за кнопкою 🧭 Експедиція.",
+        parse_mode="Markdown"
+    )
+    await callback.answer()
@@ -426,13 +426,13 @@ async def use_potion(callback: types.CallbackQuery):
     
     # ✨ БАФИ З ТАЙМЕРОМ (3 хвилини)
     elif effect_type == "buff":
-        from datetime import datetime, timedelta
+        import time
         
         stat = potion.get("effect_stat")
         value = effect_value
         
-        # Створюємо баф з таймером
-        buff_end_time = (datetime.now() + timedelta(minutes=3)).isoformat()
+        # Створюємо баф з таймером (секунди від епохи)
+        buff_end_time = int(time.time()) + 3 * 60
         
         buff = {
             "type": "buff",
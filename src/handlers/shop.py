@@ -9,6 +9,7 @@ from src.config.equipment import (
     ALL_SHOP_ITEMS, get_item_price, get_items_by_level,
     format_item_description, RARITY_EMOJI, ItemRarity
 )
+from src.config.loot import get_sell_price
 from src.ui.keyboards import get_city_keyboard
 
 router = Router()
@@ -355,23 +356,18 @@ async def show_sell_menu(callback: types.CallbackQuery):
     keyboard_buttons = []
     
     for index, item in sellable_items[:10]:  # Показуємо перші 10
+        # ✨ Ціна - з каталогу (рідкість, матеріали, старі рядки луту)
+        sell_price = get_sell_price(item)
+        
         if isinstance(item, dict):
             # Спорядження або інші предмети-словники
             name = item.get("name", "Предмет")
-            base_price = item.get("base_price", 10)
-            
-            from src.config.equipment import RARITY_PRICE_MULTIPLIER, RARITY_EMOJI
-            rarity = item.get("rarity", "common")
-            multiplier = RARITY_PRICE_MULTIPLIER.get(rarity, 1.0)
-            sell_price = int(base_price * multiplier * 0.5)
-            
-            rarity_emoji = RARITY_EMOJI.get(rarity, "⚪")
+            rarity_emoji = RARITY_EMOJI.get(item.get("rarity", "common"), "⚪")
             button_text = f"{rarity_emoji} {name} - {sell_price}💰"
         
         elif isinstance(item, str):
-            # Лут з монстрів (строка)
+            # Лут з монстрів (старий формат - строка)
             name = item
-            sell_price = 5  # Базова ціна для луту
             button_text = f"📦 {name} - {sell_price}💰"
         
         keyboard_buttons.append([
@@ -417,24 +413,18 @@ async def sell_item(callback: types.CallbackQuery):
             await callback.answer("❌ Цей предмет не можна продати!")
             return
         
-        # Розраховуємо ціну для спорядження
-        base_price = item.get("base_price", 10)
-        from src.config.equipment import RARITY_PRICE_MULTIPLIER
-        rarity = item.get("rarity", "common")
-        multiplier = RARITY_PRICE_MULTIPLIER.get(rarity, 1.0)
-        sell_price = int(base_price * multiplier * 0.5)
         item_name = item.get("name", "Предмет")
     
     elif isinstance(item, str):
-        # Лут з монстрів (строка)
+        # Лут з монстрів (старий формат - строка)
         item_name = item
-        sell_price = 5  # Базова ціна для луту
     
     else:
         await callback.answer("❌ Невідомий тип предмета!")
         return
     
     # Продаємо
+    sell_price = get_sell_price(item)
     player.gold += sell_price
     player.inventory.pop(item_index)
     
@@ -25,11 +25,7 @@ async def cmd_start(message: types.Message):
         # Гравець вже існує - вітаємо повернення
         player = Player.from_dict(player_data)
         
-<<<<<<< HEAD
         # ✨ ВИКОРИСТОВУЄМО ЄДИНУ СИСТЕМУ РЕГЕНЕРАЦІЇ
-=======
-        # ✨ Застосовуємо офлайн регенерацію
->>>>>>> dbfefd437cfb4e6361874e9c11e0aa09b24b1cd4
         regen_result = player.apply_regeneration()
         
         # Зберігаємо оновлений стан
@@ -210,7 +206,9 @@ async def cmd_help(message: types.Message):
         "📖 **Довідка по грі**\n\n"
         "**Команди:**\n"
         "• /start - Почати гру або повернутися\n"
-        "• /help - Показати цю довідку\n\n"
+        "• /help - Показати цю довідку\n"
+        "• /top - Таблиці лідерів\n"
+        "• /daily - Щоденна нагорода\n\n"
         "**Як грати:**\n"
         "1️⃣ Створіть персонажа та оберіть клас\n"
         "2️⃣ Досліджуйте локації у розділі 🌲 Пригоди\n"
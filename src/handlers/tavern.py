@@ -5,6 +5,7 @@ from aiogram import Router, F, types
 
 from src.database import Database
 from src.models.player import Player
+from src.utils.rng import get_rng
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -377,7 +378,6 @@ async def buy_potion(callback: types.CallbackQuery):
 @router.callback_query(F.data == "tavern_bard")
 async def talk_to_bard(callback: types.CallbackQuery):
     """Розмова з бардом"""
-    import random
     import time
     
     stories = [
@@ -421,7 +421,7 @@ async def talk_to_bard(callback: types.CallbackQuery):
     ]
     
     # ✨ ВИПРАВЛЕННЯ: Додаємо timestamp щоб кожне повідомлення було унікальним
-    story = random.choice(stories)
+    story = get_rng().choice(stories)
     timestamp = int(time.time())
     
     # Додаємо невидимий символ з timestamp щоб текст завжди був різним
@@ -511,8 +511,6 @@ async def dice_game(callback: types.CallbackQuery):
 @router.callback_query(F.data == "tavern_play_dice")
 async def play_dice_game(callback: types.CallbackQuery):
     """Грає в кості"""
-    import random
-    
     db = Database()
     player_data = await db.get_player(callback.from_user.id)
     player = Player.from_dict(player_data)
@@ -524,8 +522,9 @@ async def play_dice_game(callback: types.CallbackQuery):
         return
     
     # Кидаємо кості
-    player_roll = random.randint(1, 6)
-    dealer_roll = random.randint(1, 6)
+    rng = get_rng()
+    player_roll = rng.d(6)
+    dealer_roll = rng.d(6)
     
     # Списуємо ставку
     player.gold -= bet_amount
@@ -0,0 +1,108 @@
+﻿# src/handlers/top.py - Таблиці лідерів (/top)
+
+import logging
+from aiogram import Router, F, types
+from aiogram.filters import Command
+
+from src.database import Database
+from src.config.constants import CLASS_NAMES
+from src.services.leaderboard import get_leaderboard_page
+from src.utils.leaderboard import LEADERBOARDS
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}
+
+
+def format_leaderboard(page_data: dict) -> str:
+    """Текст сторінки таблиці лідерів"""
+    text = f"🏆 **Таблиця лідерів: {page_data['title']}**\n\n"
+    
+    if not page_data["entries"]:
+        return text + "Поки що тут порожньо."
+    
+    for place, entry in enumerate(page_data["entries"], start=page_data["offset"] + 1):
+        # Ім'я може містити "_" - екрануємо для Markdown
+        name = entry["character_name"].replace("_", "\\_")
+        class_name = CLASS_NAMES.get(entry["class"], "")
+        values = " / ".join(f"{entry[column]:,}".replace(",", " ") for column in page_data["columns"])
+        text += f"{MEDALS.get(place, f'{place}.')} {name} {class_name} - {values}\n"
+    
+    if page_data["rank"]:
+        text += f"\n📍 Ваше місце: {page_data['rank']}"
+    
+    return text
+
+
+def leaderboard_keyboard(page_data: dict) -> types.InlineKeyboardMarkup:
+    """Перемикач таблиць і сторінок"""
+    board_buttons = [
+        types.InlineKeyboardButton(
+            text=("• " if board_id == page_data["board_id"] else "") + board["title"],
+            callback_data=f"top_{board_id}_0"
+        )
+        for board_id, board in LEADERBOARDS.items()
+    ]
+    
+    keyboard_buttons = [board_buttons[:2], board_buttons[2:]]
+    
+    page, pages = page_data["page"], page_data["pages"]
+    if pages > 1:
+        nav_buttons = []
+        if page > 0:
+            nav_buttons.append(types.InlineKeyboardButton(
+                text="◀️", callback_data=f"top_{page_data['board_id']}_{page - 1}"
+            ))
+        nav_buttons.append(types.InlineKeyboardButton(
+            text=f"{page + 1}/{pages}", callback_data=f"top_{page_data['board_id']}_{page}"
+        ))
+        if page < pages - 1:
+            nav_buttons.append(types.InlineKeyboardButton(
+                text="▶️", callback_data=f"top_{page_data['board_id']}_{page + 1}"
+            ))
+        keyboard_buttons.append(nav_buttons)
+    
+    return types.InlineKeyboardMarkup(inline_keyboard=keyboard_buttons)
+
+
+@router.message(Command("top"))
+async def cmd_top(message: types.Message):
+    """Обробник команди /top - таблиця за рівнем"""
+    page_data = await get_leaderboard_page(Database(), "level", 0, message.from_user.id)
+    
+    if page_data is None:
+        await message.answer("❌ Таблиця лідерів тимчасово недоступна")
+        return
+    
+    await message.answer(
+        format_leaderboard(page_data),
+        reply_markup=leaderboard_keyboard(page_data),
+        parse_mode="Markdown"
+    )
+
+
+@router.callback_query(F.data.startswith("top_"))
+async def show_leaderboard_page(callback: types.CallbackQuery):
+    """Перемикання таблиці або сторінки"""
+    board_id, _, page = callback.data[len("top_"):].rpartition("_")
+    
+    page_data = None
+    if page.isdigit():
+        page_data = await get_leaderboard_page(Database(), board_id, int(page), callback.from_user.id)
+    
+    if page_data is None:
+        await callback.answer("❌ Таблиця лідерів недоступна", show_alert=True)
+        return
+    
+    try:
+        await callback.message.edit_text(
+            format_leaderboard(page_data),
+            reply_markup=leaderboard_keyboard(page_data),
+            parse_mode="Markdown"
+        )
+    except Exception as e:
+        # Та сама сторінка (кнопка з номером) - "message is not modified"
+        if "message is not modified" not in str(e):
+            logger.error(f"Помилка показу таблиці лідерів: {e}")
+    await callback.answer()
@@ -0,0 +1,7 @@
+﻿# src/middlewares/__init__.py
+
+from .metrics import MetricsMiddleware, ApiMetricsMiddleware
+from .throttling import ThrottlingMiddleware
+from .in_flight import InFlightCallbackMiddleware
+
+__all__ = ['MetricsMiddleware', 'ApiMetricsMiddleware', 'ThrottlingMiddleware', 'InFlightCallbackMiddleware']
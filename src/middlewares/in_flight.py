@@ -0,0 +1,70 @@
+﻿# src/middlewares/in_flight.py - Повторні натискання, поки попереднє ще обробляється
+#
+# Хендлер атаки показує анімацію (asyncio.sleep між кроками), і друге
+# натискання під час неї заходило в той самий BattleState та кидало ще
+# одну атаку. Middleware пам'ятає callback, що виконуються, за ключем
+# (гравець, повідомлення, вид дії) і на повтор одразу відповідає, не
+# запускаючи хендлер. Вид дії - префікс даних до першого "_": поки йде
+# battle_attack, натискання battle_flee на тому ж повідомленні теж чекає.
+#
+# Множина містить лише ті callback, що виконуються зараз, тож її розмір
+# обмежений кількістю одночасних хендлерів.
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Set
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject
+
+from src.utils.metrics import metrics
+
+BUSY_TEXT = "⏳ Зачекайте, попередня дія ще виконується"
+
+
+def callback_kind(data: str) -> str:
+    """battle_attack -> battle"""
+    return (data or "").split("_", 1)[0]
+
+
+class InFlightCallbackMiddleware(BaseMiddleware):
+    """
+    Відповідає на callback, якщо такий самий вид дії вже виконується
+    
+    Реєструється як outer middleware dp.callback_query перед
+    ThrottlingMiddleware - відкинуті повтори не витрачають ліміт гравця.
+    """
+    
+    def __init__(self, kind: Callable[[str], str] = callback_kind, busy_text: str = BUSY_TEXT):
+        self.kind = kind
+        self.busy_text = busy_text
+        self._in_flight: Set[Hashable] = set()
+    
+    def __len__(self) -> int:
+        return len(self._in_flight)
+    
+    def _key(self, event: CallbackQuery) -> Hashable:
+        if event.message:
+            target = (event.message.chat.id, event.message.message_id)
+        else:
+            target = event.inline_message_id
+        return event.from_user.id, target, self.kind(event.data)
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        if not isinstance(event, CallbackQuery):
+            return await handler(event, data)
+        
+        key = self._key(event)
+        if key in self._in_flight:
+            metrics.observe_dropped("in_flight")
+            await event.answer(self.busy_text)
+            return None
+        
+        self._in_flight.add(key)
+        try:
+            return await handler(event, data)
+        finally:
+            self._in_flight.discard(key)
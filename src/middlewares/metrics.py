@@ -0,0 +1,56 @@
+﻿# src/middlewares/metrics.py - Middleware для збору метрик
+
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import TelegramMethod
+from aiogram.types import TelegramObject
+
+from src.utils.metrics import metrics
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """
+    Час виконання хендлера + кількість звернень до БД і API за апдейт
+    
+    Реєструється як inner middleware (dp.message.middleware(...)),
+    тому викликається лише коли хендлер вже знайдено.
+    """
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        handler_object = data.get("handler")
+        name = getattr(getattr(handler_object, "callback", None), "__name__", "unknown")
+        
+        stats = metrics.start_update()
+        start = time.perf_counter()
+        failed = False
+        try:
+            return await handler(event, data)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            metrics.finish_update(name, stats, time.perf_counter() - start, failed)
+
+
+class ApiMetricsMiddleware(BaseRequestMiddleware):
+    """Рахує вихідні виклики Telegram API (bot.session.middleware(...))"""
+    
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot,
+        method: TelegramMethod
+    ):
+        start = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        finally:
+            metrics.observe_api(type(method).__name__, time.perf_counter() - start)
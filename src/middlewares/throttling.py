@@ -0,0 +1,155 @@
+﻿# src/middlewares/throttling.py - Обмеження частоти дій гравця (Settings.RATE_LIMIT)
+#
+# Кожен гравець має маркерний кошик: RATE_LIMIT дій на хвилину з
+# запасом RATE_LIMIT. Стан - слотований об'єкт у OrderedDict (LRU),
+# не більше RATE_LIMIT_MAX_USERS записів. Гравець, що простояв довше
+# за повне наповнення кошика, видаляється: його кошик однаково був би
+# повним, тож видалення нічого не змінює.
+#
+# Повтор того самого callback (ті самі дані, те саме повідомлення)
+# протягом CALLBACK_REPEAT_WINDOW відкидається без витрати маркера:
+#   drop     - вікно рахується від останнього прийнятого натискання;
+#   debounce - кожен повтор продовжує вікно (поки гравець "барабанить");
+#   off      - вимкнено.
+#
+# Реєструється як outer middleware: відкинуті апдейти не доходять
+# навіть до фільтрів.
+
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, Message, TelegramObject
+
+from src.config.settings import settings
+from src.utils.metrics import metrics
+from src.utils.rate_limit import TokenBucket
+
+REPEAT_MODES = ("drop", "debounce", "off")
+EVICT_PER_CALL = 2  # Скільки найстаріших записів перевіряти на простій за звернення
+
+
+class UserState(TokenBucket):
+    """Кошик гравця + останній прийнятий callback"""
+    
+    __slots__ = ("last_data", "last_message_id", "last_ts", "warned")
+    
+    def __init__(self, rate: float, capacity: float, now: float):
+        super().__init__(rate, capacity, now)
+        self.last_data: Optional[str] = None
+        self.last_message_id: Optional[int] = None
+        self.last_ts = 0.0
+        self.warned = False  # Попередження вже показано - далі мовчки
+
+
+class UserStateTable:
+    """Обмежена таблиця станів гравців (LRU + видалення тих, хто простоює)"""
+    
+    def __init__(self, rate: float, capacity: float, max_users: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_users = max_users
+        self.idle_after = capacity / rate  # За цей час кошик наповнюється повністю
+        self._states: "OrderedDict[int, UserState]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._states)
+    
+    def get(self, user_id: int, now: float) -> UserState:
+        state = self._states.get(user_id)
+        if state is None:
+            state = self._states[user_id] = UserState(self.rate, self.capacity, now)
+        else:
+            self._states.move_to_end(user_id)
+        self._evict(now)
+        return state
+    
+    def _evict(self, now: float):
+        states = self._states
+        while len(states) > self.max_users:
+            states.popitem(last=False)
+        # Амортизовано: кілька найстаріших за звернення
+        for _ in range(EVICT_PER_CALL):
+            if len(states) <= 1:
+                break
+            oldest = next(iter(states.values()))
+            if now - max(oldest.updated, oldest.last_ts) < self.idle_after:
+                break
+            states.popitem(last=False)
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Відкидає апдейти понад ліміт і повтори callback
+    
+    Один екземпляр на dp.message і dp.callback_query - спільний ліміт.
+    """
+    
+    def __init__(
+        self,
+        rate_per_minute: int = settings.RATE_LIMIT,
+        max_users: int = settings.RATE_LIMIT_MAX_USERS,
+        repeat_window: float = settings.CALLBACK_REPEAT_WINDOW,
+        repeat_mode: str = settings.CALLBACK_REPEAT_MODE,
+        exempt_user_ids: Iterable[int] = settings.ADMIN_IDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if repeat_mode not in REPEAT_MODES:
+            raise ValueError(f"CALLBACK_REPEAT_MODE: очікується одне з {REPEAT_MODES}")
+        self.states = UserStateTable(rate_per_minute / 60, rate_per_minute, max_users)
+        self.repeat_window = repeat_window if repeat_mode != "off" else 0
+        self.debounce = repeat_mode == "debounce"
+        self.exempt = frozenset(exempt_user_ids)
+        self.clock = clock
+    
+    def _is_repeat(self, state: UserState, event: CallbackQuery, now: float) -> bool:
+        if self.repeat_window <= 0:
+            return False
+        message_id = event.message.message_id if event.message else None
+        repeat = (
+            event.data == state.last_data
+            and message_id == state.last_message_id
+            and now - state.last_ts < self.repeat_window
+        )
+        if repeat and self.debounce:
+            state.last_ts = now
+        return repeat
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is None or user.id in self.exempt:
+            return await handler(event, data)
+        
+        now = self.clock()
+        state = self.states.get(user.id, now)
+        is_callback = isinstance(event, CallbackQuery)
+        
+        if is_callback and self._is_repeat(state, event, now):
+            metrics.observe_dropped("repeat_callback")
+            await event.answer()
+            return None
+        
+        if not state.try_take(now):
+            metrics.observe_dropped("rate_limit")
+            # Попереджаємо один раз за серію - спам не має коштувати викликів API
+            if not state.warned:
+                state.warned = True
+                text = f"⏳ Забагато дій! Спробуйте через {math.ceil(state.wait_time(now))} с"
+                if isinstance(event, (CallbackQuery, Message)):
+                    await event.answer(text)
+            return None
+        
+        state.warned = False
+        if is_callback:
+            state.last_data = event.data
+            state.last_message_id = event.message.message_id if event.message else None
+            state.last_ts = now
+        
+        return await handler(event, data)
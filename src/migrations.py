@@ -0,0 +1,431 @@
+﻿# src/migrations.py - Версійовані міграції схеми БД
+
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, List, Tuple
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+Migration = Tuple[int, str, Callable[[aiosqlite.Connection], Awaitable[None]]]
+
+
+async def _get_columns(db: aiosqlite.Connection, table: str) -> set:
+    """Повертає назви колонок таблиці"""
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in await cursor.fetchall()}
+
+
+async def _add_column(db: aiosqlite.Connection, table: str, column: str, definition: str) -> bool:
+    """
+    Додає колонку, якщо її ще немає
+    
+    Старі бази могли пройти ручні скрипти з migrations/,
+    тому кожен крок має бути ідемпотентним.
+    """
+    if column in await _get_columns(db, table):
+        return False
+    await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return True
+
+
+def _iso_to_epoch(value) -> int:
+    """ISO-рядок (локальний час) -> секунди від епохи, 0 якщо не вдалося"""
+    if isinstance(value, int):
+        return value
+    if not value:
+        return 0
+    try:
+        return int(datetime.fromisoformat(str(value).split('.')[0]).timestamp())
+    except ValueError:
+        return 0
+
+
+# =====================================================
+# КРОКИ МІГРАЦІЙ
+# =====================================================
+
+async def _v1_base_schema(db: aiosqlite.Connection):
+    """Початкова таблиця гравців"""
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS players (
+            user_id INTEGER PRIMARY KEY,
+            username TEXT,
+            character_name TEXT DEFAULT 'Безіменний',
+            class TEXT DEFAULT 'warrior',
+            level INTEGER DEFAULT 1,
+            experience INTEGER DEFAULT 0,
+            gold INTEGER DEFAULT 100,
+            
+            strength INTEGER DEFAULT 0,
+            agility INTEGER DEFAULT 0,
+            intelligence INTEGER DEFAULT 0,
+            stamina INTEGER DEFAULT 0,
+            charisma INTEGER DEFAULT 0,
+            free_points INTEGER DEFAULT 5,
+            
+            health INTEGER DEFAULT 0,
+            max_health INTEGER DEFAULT 0,
+            
+            equipment TEXT DEFAULT '{}',
+            inventory TEXT DEFAULT '[]',
+            
+            current_location TEXT DEFAULT 'city',
+            
+            quests TEXT DEFAULT '{}',
+            achievements TEXT DEFAULT '[]',
+            last_daily_reward TEXT,
+            
+            monsters_killed INTEGER DEFAULT 0,
+            quests_completed INTEGER DEFAULT 0,
+            total_gold_earned INTEGER DEFAULT 100,
+            total_damage_dealt INTEGER DEFAULT 0,
+            total_damage_taken INTEGER DEFAULT 0,
+            
+            active_effects TEXT DEFAULT '[]',
+            
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+async def _v2_mana_system(db: aiosqlite.Connection):
+    """Мана та перезарядка навичок (було migrations/add_mana_system.py)"""
+    await _add_column(db, "players", "mana", "INTEGER DEFAULT 0")
+    await _add_column(db, "players", "max_mana", "INTEGER DEFAULT 0")
+    await _add_column(db, "players", "ability_cooldowns", "TEXT DEFAULT '{}'")
+    
+    # Мана для гравців, створених до появи системи
+    await db.execute('''
+        UPDATE players
+        SET max_mana = CASE WHEN intelligence > 0 THEN intelligence * 5 ELSE 15 END,
+            mana = CASE WHEN intelligence > 0 THEN intelligence * 5 ELSE 15 END
+        WHERE max_mana = 0 OR max_mana IS NULL
+    ''')
+
+
+async def _v3_last_login(db: aiosqlite.Connection):
+    """Час останнього входу (було migrations/add_offline_regen.py)"""
+    if await _add_column(db, "players", "last_login", "TEXT"):
+        await db.execute(
+            "UPDATE players SET last_login = ? WHERE last_login IS NULL",
+            (datetime.now().isoformat(),)
+        )
+
+
+async def _v4_epoch_timestamps(db: aiosqlite.Connection):
+    """Час у секундах від епохи (було migrations/convert_timestamps_to_epoch.py)"""
+    await _add_column(db, "players", "last_regeneration_ts", "INTEGER")
+    await _add_column(db, "players", "last_daily_reward_ts", "INTEGER")
+    
+    columns = await _get_columns(db, "players")
+    regen_source = "last_login" if "last_login" in columns else "NULL"
+    if "last_regeneration" in columns:
+        regen_source = f"COALESCE({regen_source}, last_regeneration)"
+    
+    cursor = await db.execute(f'''
+        SELECT user_id, {regen_source}, last_daily_reward, active_effects
+        FROM players
+        WHERE last_regeneration_ts IS NULL
+    ''')
+    rows = await cursor.fetchall()
+    
+    now_ts = int(time.time())
+    updates = []
+    for user_id, regen_iso, daily_iso, effects_raw in rows:
+        try:
+            effects = json.loads(effects_raw or "[]")
+        except ValueError:
+            effects = []
+        for effect in effects:
+            if isinstance(effect.get("expires_at"), str):
+                effect["expires_at"] = _iso_to_epoch(effect["expires_at"])
+        
+        updates.append((
+            _iso_to_epoch(regen_iso) or now_ts,
+            _iso_to_epoch(daily_iso) or None,
+            json.dumps(effects, ensure_ascii=False),
+            user_id
+        ))
+    
+    await db.executemany('''
+        UPDATE players SET
+            last_regeneration_ts = ?,
+            last_daily_reward_ts = ?,
+            active_effects = ?
+        WHERE user_id = ?
+    ''', updates)
+    
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_players_regen_ts ON players(last_regeneration_ts)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_players_daily_reward_ts ON players(last_daily_reward_ts)")
+
+
+async def _v5_expeditions(db: aiosqlite.Connection):
+    """Експедиції: бої розраховуються фоновою задачею (src/services/expeditions.py)"""
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS expeditions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            location_id TEXT NOT NULL,
+            encounters INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'active',
+            started_ts INTEGER NOT NULL,
+            ready_ts INTEGER NOT NULL,
+            resolved_ts INTEGER,
+            result TEXT
+        )
+    ''')
+    
+    # Вибірка готових до розрахунку: status = 'active' AND ready_ts <= ?
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_expeditions_due ON expeditions(status, ready_ts)")
+    # Не більше однієї незабраної експедиції на гравця
+    await db.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_expeditions_open
+        ON expeditions(user_id) WHERE status != 'claimed'
+    ''')
+
+
+async def _v6_pending_events(db: aiosqlite.Connection):
+    """Події skill check для SQLite-бекенду (src/services/event_store.py)"""
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS pending_events (
+            event_id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL UNIQUE,
+            location_id TEXT NOT NULL,
+            event TEXT NOT NULL,
+            expires_ts INTEGER NOT NULL
+        )
+    ''')
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_pending_events_expires ON pending_events(expires_ts)")
+
+
+async def _v7_leaderboard_indexes(db: aiosqlite.Connection):
+    """Індекси таблиць лідерів: ORDER BY ... DESC LIMIT N без сканування players"""
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_players_level_exp ON players(level DESC, experience DESC)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_players_monsters_killed ON players(monsters_killed DESC)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_players_gold_earned ON players(total_gold_earned DESC)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_players_damage_dealt ON players(total_damage_dealt DESC)")
+
+
+async def _v8_stats_tables(db: aiosqlite.Connection):
+    """Агрегована статистика економіки (src/services/stats.py)"""
+    # Гравці, чий внесок в агрегати треба перерахувати
+    await db.execute("CREATE TABLE IF NOT EXISTS stats_dirty (user_id INTEGER PRIMARY KEY)")
+    
+    # Поточний внесок кожного гравця - щоб відняти його при зміні
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS stats_player (
+            user_id INTEGER PRIMARY KEY,
+            level INTEGER NOT NULL,
+            gold INTEGER NOT NULL,
+            gold_earned INTEGER NOT NULL
+        )
+    ''')
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS stats_player_items (
+            user_id INTEGER NOT NULL,
+            item_name TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, item_name)
+        ) WITHOUT ROWID
+    ''')
+    
+    # Самі агрегати
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS stats_levels (
+            level INTEGER PRIMARY KEY,
+            players INTEGER NOT NULL
+        )
+    ''')
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS stats_items (
+            item_name TEXT PRIMARY KEY,
+            copies INTEGER NOT NULL,
+            holders INTEGER NOT NULL
+        )
+    ''')
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS stats_totals (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    ''')
+    
+    # Будь-який шлях запису (save_player, пакет експедицій, імпорт)
+    # позначає гравця; UPDATE без змін цих колонок - ні
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_players_insert AFTER INSERT ON players
+        BEGIN
+            INSERT OR IGNORE INTO stats_dirty (user_id) VALUES (NEW.user_id);
+        END
+    ''')
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_players_update
+        AFTER UPDATE OF level, gold, total_gold_earned, inventory, equipment ON players
+        WHEN OLD.level IS NOT NEW.level
+          OR OLD.gold IS NOT NEW.gold
+          OR OLD.total_gold_earned IS NOT NEW.total_gold_earned
+          OR OLD.inventory IS NOT NEW.inventory
+          OR OLD.equipment IS NOT NEW.equipment
+        BEGIN
+            INSERT OR IGNORE INTO stats_dirty (user_id) VALUES (NEW.user_id);
+        END
+    ''')
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_players_delete AFTER DELETE ON players
+        BEGIN
+            INSERT OR IGNORE INTO stats_dirty (user_id) VALUES (OLD.user_id);
+        END
+    ''')
+    
+    # Наявні гравці потрапляють в агрегати першим проходом фонової задачі
+    await db.execute("INSERT OR IGNORE INTO stats_dirty (user_id) SELECT user_id FROM players")
+
+
+async def _v9_daily_notify(db: aiosqlite.Connection):
+    """Час нагадування про щоденну нагороду (src/services/daily_rewards.py)"""
+    # NULL - нагадувати нічого; після нагадування знову NULL до наступної нагороди
+    await _add_column(db, "players", "daily_notify_ts", "INTEGER")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_players_daily_notify ON players(daily_notify_ts)")
+
+
+async def _v10_broadcasts(db: aiosqlite.Connection):
+    """Розсилки адміністраторів з прогресом для відновлення (src/services/broadcast.py)"""
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS broadcasts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            admin_id INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            total INTEGER NOT NULL DEFAULT 0,
+            last_user_id INTEGER NOT NULL DEFAULT 0,
+            sent INTEGER NOT NULL DEFAULT 0,
+            blocked INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            elapsed REAL NOT NULL DEFAULT 0,
+            progress_message_id INTEGER,
+            created_ts INTEGER NOT NULL,
+            finished_ts INTEGER
+        )
+    ''')
+
+
+async def _v11_stats_triggers_upsert(db: aiosqlite.Connection):
+    """
+    Тригери stats_dirty, що не ламають upsert у players
+    
+    Зовнішній INSERT ... ON CONFLICT DO UPDATE підміняє OR IGNORE
+    всередині тригера, і повторна позначка гравця падала з UNIQUE
+    constraint failed (імпорт поверх наявних гравців). ON CONFLICT
+    DO NOTHING у тілі тригера не підміняється.
+    """
+    for name in ("insert", "update", "delete"):
+        await db.execute(f"DROP TRIGGER IF EXISTS trg_stats_players_{name}")
+    
+    await db.execute('''
+        CREATE TRIGGER trg_stats_players_insert AFTER INSERT ON players
+        BEGIN
+            INSERT INTO stats_dirty (user_id) VALUES (NEW.user_id) ON CONFLICT DO NOTHING;
+        END
+    ''')
+    await db.execute('''
+        CREATE TRIGGER trg_stats_players_update
+        AFTER UPDATE OF level, gold, total_gold_earned, inventory, equipment ON players
+        WHEN OLD.level IS NOT NEW.level
+          OR OLD.gold IS NOT NEW.gold
+          OR OLD.total_gold_earned IS NOT NEW.total_gold_earned
+          OR OLD.inventory IS NOT NEW.inventory
+          OR OLD.equipment IS NOT NEW.equipment
+        BEGIN
+            INSERT INTO stats_dirty (user_id) VALUES (NEW.user_id) ON CONFLICT DO NOTHING;
+        END
+    ''')
+    await db.execute('''
+        CREATE TRIGGER trg_stats_players_delete AFTER DELETE ON players
+        BEGIN
+            INSERT INTO stats_dirty (user_id) VALUES (OLD.user_id) ON CONFLICT DO NOTHING;
+        END
+    ''')
+
+
+# ✨ Порядок важливий! Нові кроки - лише в кінець списку
+MIGRATIONS: List[Migration] = [
+    (1, "base schema", _v1_base_schema),
+    (2, "mana system", _v2_mana_system),
+    (3, "last login", _v3_last_login),
+    (4, "epoch timestamps", _v4_epoch_timestamps),
+    (5, "expeditions", _v5_expeditions),
+    (6, "pending events", _v6_pending_events),
+    (7, "leaderboard indexes", _v7_leaderboard_indexes),
+    (8, "stats tables", _v8_stats_tables),
+    (9, "daily reward notifications", _v9_daily_notify),
+    (10, "broadcasts", _v10_broadcasts),
+    (11, "upsert-safe stats triggers", _v11_stats_triggers_upsert),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# =====================================================
+# ЗАПУСК
+# =====================================================
+
+async def get_schema_version(db: aiosqlite.Connection) -> int:
+    """Поточна версія схеми (0 - нова або стара база без версій)"""
+    try:
+        cursor = await db.execute("SELECT MAX(version) FROM schema_version")
+    except aiosqlite.OperationalError:
+        # Таблиці ще немає (її створює apply_migrations)
+        return 0
+    row = await cursor.fetchone()
+    return row[0] or 0
+
+
+async def apply_migrations(db: aiosqlite.Connection) -> int:
+    """
+    Застосовує всі нові кроки в одній транзакції
+    
+    При актуальній схемі - лише один SELECT (без транзакції і DDL).
+    Інакше версія перечитується вже під BEGIN IMMEDIATE: якщо два
+    процеси (бот і scripts/players_io.py) стартують разом, другий
+    дочекається першого і побачить, що кроків не лишилось. Якщо
+    будь-який крок падає, відкочується все, і база лишається на
+    старій версії.
+    
+    Returns:
+        Кількість застосованих кроків
+    """
+    current = await get_schema_version(db)
+    if current >= LATEST_VERSION:
+        return 0
+    
+    # Явний BEGIN: DDL (ALTER/CREATE) теж потрапляє в транзакцію
+    try:
+        await db.execute("BEGIN IMMEDIATE")
+        await db.execute(
+            "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"
+        )
+        # Під блокуванням запису - інший процес міг уже мігрувати
+        current = await get_schema_version(db)
+        pending = [m for m in MIGRATIONS if m[0] > current]
+        if not pending:
+            await db.commit()
+            return 0
+        
+        for version, description, step in pending:
+            logger.info(f"Міграція схеми v{version}: {description}")
+            await step(db)
+            await db.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+        await db.commit()
+    
+    except Exception:
+        await db.rollback()
+        logger.error(f"Міграцію схеми відкочено, версія лишається v{current}")
+        raise
+    
+    logger.info(f"Схема БД оновлена: v{current} → v{LATEST_VERSION}")
+    return len(pending)
@@ -1,8 +1,9 @@
 ﻿# src/models/monster.py - Модель монстра
 
-import random
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
 from src.config.constants import MONSTER_BASE_STATS
+from src.utils.loot import roll_loot
+from src.utils.rng import GameRNG
 
 
 class Monster:
@@ -55,21 +56,17 @@ class Monster:
         """Перевіряє чи живий монстр"""
         return self.health > 0
     
-    def get_loot(self) -> List[str]:
+    def get_loot(self, rng: Optional[GameRNG] = None) -> List[Dict[str, Any]]:
         """
-        Генерує лут з монстра
+        Генерує лут з монстра (таблиці - src/config/loot.py)
+        
+        Args:
+            rng: Генератор (наприклад, BattleState.rng)
         
         Returns:
-            Список предметів
+            Список предметів-словників для інвентаря
         """
-        loot = []
-        
-        # Шанс випадання кожного предмета 70%
-        for item in self.loot_table:
-            if random.random() < 0.7:
-                loot.append(item)
-        
-        return loot
+        return roll_loot(self.monster_type, self.level, rng)
     
     def to_dict(self) -> Dict:
         """Конвертує у словник"""
@@ -1,13 +1,32 @@
 ﻿# src/models/player.py - Модель гравця (ОПТИМІЗОВАНА ВЕРСІЯ)
 
 import json
+import time
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 
-from src.config.constants import CLASS_BASE_STATS, CharacterClass
+from src.config.abilities import CLASS_ABILITIES
+from src.config.constants import CLASS_BASE_STATS, CharacterClass, REGEN_TICK_SECONDS
 from src.config.settings import settings
 
 
+def to_epoch(value: Any) -> int:
+    """
+    Перетворює час у секунди від епохи
+    
+    Цілі числа повертаються як є (швидкий шлях), ISO-рядки зі старих
+    записів парсяться як локальний час. Невідоме значення - 0.
+    """
+    if isinstance(value, int):
+        return value
+    if not value:
+        return 0
+    try:
+        return int(datetime.fromisoformat(str(value).split('.')[0]).timestamp())
+    except ValueError:
+        return 0
+
+
 class Player:
     """Модель гравця у грі"""
     
@@ -18,8 +37,8 @@ class Player:
         self.character_name = character_name or "Безіменний"
         self.character_class = character_class
         
-        # ✨ ВАЖЛИВО: Єдине поле для регенерації
-        self.last_regeneration_time = datetime.now().isoformat()
+        # ✨ ВАЖЛИВО: Єдине поле для регенерації (секунди від епохи)
+        self.last_regeneration_time = int(time.time())
         
         # Прогресія
         self.level = 1
@@ -45,8 +64,7 @@ class Player:
         self.max_mana = self._calculate_max_mana()
         self.mana = self.max_mana
         
-        # Навички класу
-        self.class_abilities = self._get_class_abilities()
+        # Навички класу - див. властивість class_abilities
         self.ability_cooldowns = {}
         
         # Екіпірування (12 слотів)
@@ -75,7 +93,7 @@ class Player:
         
         # Досягнення
         self.achievements = []
-        self.last_daily_reward = None
+        self.last_daily_reward: Optional[int] = None  # секунди від епохи
         
         # Активні ефекти
         self.active_effects = []
@@ -99,29 +117,22 @@ class Player:
         Returns:
             Словник з інформацією про регенерацію
         """
-        # Парсимо час останньої регенерації
         if not self.last_regeneration_time:
-            self.last_regeneration_time = datetime.now().isoformat()
+            self.last_regeneration_time = int(time.time())
             return {"hp": 0, "mana": 0, "seconds": 0, "ticks": 0}
         
         try:
-            # Підтримка різних форматів часу
-            if isinstance(self.last_regeneration_time, str):
-                last_time = datetime.fromisoformat(self.last_regeneration_time.split('.')[0])
-            else:
-                last_time = self.last_regeneration_time
+            now = int(time.time())
+            elapsed_seconds = now - self.last_regeneration_time
             
-            now = datetime.now()
-            elapsed_seconds = int((now - last_time).total_seconds())
-            
-            # Менше 60 секунд - немає регенерації
-            if elapsed_seconds < 60:
+            # Менше одного тіку - немає регенерації
+            if elapsed_seconds < REGEN_TICK_SECONDS:
                 return {"hp": 0, "mana": 0, "seconds": elapsed_seconds, "ticks": 0}
             
             # =====================================================
             # ЄДИНА ФОРМУЛА РЕГЕНЕРАЦІЇ
             # =====================================================
-            regen_ticks = elapsed_seconds // 60
+            regen_ticks = elapsed_seconds // REGEN_TICK_SECONDS
             
             # HP регенерація
             hp_per_tick = self.stamina + 1
@@ -142,7 +153,7 @@ class Player:
             
             # Оновлюємо час останньої регенерації
             if force_update and (hp_regen > 0 or mana_regen > 0):
-                self.last_regeneration_time = now.isoformat()
+                self.last_regeneration_time = now
             
             return {
                 "hp": hp_regen,
@@ -153,7 +164,7 @@ class Player:
             
         except Exception as e:
             print(f"Помилка регенерації: {e}")
-            self.last_regeneration_time = datetime.now().isoformat()
+            self.last_regeneration_time = int(time.time())
             return {"hp": 0, "mana": 0, "seconds": 0, "ticks": 0}
     
     def apply_offline_regeneration(self) -> Dict[str, int]:
@@ -189,50 +200,6 @@ class Player:
         """Розраховує максимальну ману"""
         return self.intelligence * 5
     
-    def _get_class_abilities(self) -> dict:
-        """Повертає навички класу"""
-        abilities = {
-            "warrior": {
-                "mighty_strike": {
-                    "name": "💪 Могутній удар",
-                    "description": "Наносить подвійний урон",
-                    "mana_cost": 6,
-                    "cost_type": "mana"
-                }
-            },
-            "mage": {
-                "fireball": {
-                    "name": "🔥 Вогняний шар",
-                    "description": "Магічна атака (2d6 + Інтелект урону)",
-                    "mana_cost": 5,
-                    "cost_type": "mana"
-                }
-            },
-            "paladin": {
-                "divine_shield": {
-                    "name": "✨ Божественний щит",
-                    "description": "Блокує наступну атаку ворога",
-                    "mana_cost": 5,
-                    "cost_type": "mana"
-                },
-                "smite_undead": {
-                    "name": "⚡ Знищення нежиті",
-                    "description": "1d20 урону по нежиті",
-                    "mana_cost": 5,
-                    "cost_type": "mana"
-                }
-            },
-            "rogue": {
-                "poison_strike": {
-                    "name": "🗡️☠️ Ядовитий удар",
-                    "description": "Атака з отрутою (1d4 урону 3 ходи)",
-                    "mana_cost": 4,
-                    "cost_type": "mana"
-                }
-            }
-        }
-        return abilities.get(self.character_class, {})
-    
     # =====================================================
     # ПРОГРЕСІЯ
     # =====================================================
@@ -342,6 +309,11 @@ class Player:
         self.mana = min(self.mana + amount, self.max_mana)
         return self.mana - old_mana
     
+    @property
+    def class_abilities(self) -> Dict[str, Dict[str, Any]]:
+        """Навички класу зі спільного реєстру (без копій на кожного гравця)"""
+        return CLASS_ABILITIES.get(self.character_class, {})
+    
     def can_use_ability(self, ability_name: str) -> bool:
         """Перевіряє чи може використати здібність"""
         if ability_name not in self.class_abilities:
@@ -556,16 +528,13 @@ class Player:
         """Отримує бонус від активних бафів"""
         bonus = 0
         active_buffs = []
+        now = int(time.time())
         
         for effect in self.active_effects:
             if effect.get("type") == "buff" and effect.get("stat") == stat_name:
-                try:
-                    expires_at = datetime.fromisoformat(effect["expires_at"])
-                    if datetime.now() < expires_at:
-                        bonus += effect.get("value", 0)
-                        active_buffs.append(effect)
-                except:
-                    pass
+                if now < to_epoch(effect.get("expires_at")):
+                    bonus += effect.get("value", 0)
+                    active_buffs.append(effect)
         
         # Оновлюємо список - залишаємо тільки активні
         self.active_effects = active_buffs
@@ -575,14 +544,11 @@ class Player:
     def clean_expired_buffs(self):
         """Видаляє прострочені бафи"""
         active = []
+        now = int(time.time())
         for effect in self.active_effects:
             if effect.get("type") == "buff":
-                try:
-                    expires_at = datetime.fromisoformat(effect["expires_at"])
-                    if datetime.now() < expires_at:
-                        active.append(effect)
-                except:
-                    pass
+                if now < to_epoch(effect.get("expires_at")):
+                    active.append(effect)
             else:
                 active.append(effect)
         
@@ -681,7 +647,7 @@ class Player:
             "current_location": self.current_location,
             "quests": json.dumps(self.quests, ensure_ascii=False),
             "achievements": json.dumps(self.achievements, ensure_ascii=False),
-            "last_daily_reward": self.last_daily_reward,
+            "last_daily_reward_ts": self.last_daily_reward,
             "monsters_killed": self.monsters_killed,
             "quests_completed": self.quests_completed,
             "total_gold_earned": self.total_gold_earned,
@@ -689,9 +655,7 @@ class Player:
             "total_damage_taken": self.total_damage_taken,
             "active_effects": json.dumps(self.active_effects, ensure_ascii=False),
             "ability_cooldowns": json.dumps(self.ability_cooldowns, ensure_ascii=False),
-            # Підтримка обох полів для сумісності
-            "last_login": self.last_regeneration_time,
-            "last_regeneration": self.last_regeneration_time
+            "last_regeneration_ts": self.last_regeneration_time
         }
     
     @classmethod
@@ -710,13 +674,14 @@ class Player:
         player.gold = data.get("gold", 100)
         player.free_points = data.get("free_points", 5)
         
-        # ✨ Міграція полів регенерації (підтримка старих баз)
-        if "last_regeneration" in data and data["last_regeneration"]:
-            player.last_regeneration_time = data["last_regeneration"]
-        elif "last_login" in data and data["last_login"]:
-            player.last_regeneration_time = data["last_login"]
-        else:
-            player.last_regeneration_time = datetime.now().isoformat()
+        # ✨ Час регенерації - ціле число секунд (last_regeneration_ts).
+        # ISO-рядок last_login лишився лише в базах до міграції
+        # migrations/convert_timestamps_to_epoch.py
+        player.last_regeneration_time = (
+            data.get("last_regeneration_ts")
+            or to_epoch(data.get("last_login"))
+            or int(time.time())
+        )
         
         # Характеристики
         player.strength = data.get("strength", 10)
@@ -787,7 +752,11 @@ class Player:
         
         # Інші дані
         player.current_location = data.get("current_location", "city")
-        player.last_daily_reward = data.get("last_daily_reward")
+        player.last_daily_reward = (
+            data.get("last_daily_reward_ts")
+            or to_epoch(data.get("last_daily_reward"))
+            or None
+        )
         
         # Статистика
         player.monsters_killed = data.get("monsters_killed", 0)
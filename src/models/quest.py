@@ -91,4 +91,45 @@ class Quest:
         quest = cls(data["quest_id"], data)
         quest.progress = data.get("progress", 0)
         quest.status = QuestStatus(data.get("status", "available"))
-        return quest
\ No newline at end of file
+        return quest
+
+
+def update_player_quests(player, event_type: str, event_detail: str = None):
+    """
+    Оновлює прогрес квестів гравця
+    
+    Args:
+        player: Об'єкт гравця
+        event_type: Тип події ("kill", "survive")
+        event_detail: Деталі (тип монстра, локація)
+    """
+    if not player.quests:
+        return []
+    
+    completed_quests = []
+    
+    for quest_id, quest_data in player.quests.items():
+        # Пропускаємо неактивні квести
+        if quest_data.get("status") != "active":
+            continue
+        
+        quest = Quest.from_dict(quest_data)
+        
+        # Перевіряємо тип квесту
+        if quest.quest_type.value != event_type:
+            continue
+        
+        # Перевіряємо деталі (якщо є)
+        if quest.target_detail and quest.target_detail != event_detail:
+            continue
+        
+        # Оновлюємо прогрес
+        was_completed = quest.update_progress(1)
+        
+        # Оновлюємо в даних гравця
+        player.quests[quest_id] = quest.to_dict()
+        
+        if was_completed:
+            completed_quests.append(quest)
+    
+    return completed_quests
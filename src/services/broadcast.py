@@ -0,0 +1,151 @@
+﻿# src/services/broadcast.py - Розсилки адміністраторів усім гравцям
+#
+# Отримувачі читаються сторінками за первинним ключем (user_id > курсор),
+# тож пам'ять не залежить від кількості гравців. Сторінка йде через
+# send_bulk - спільний ліміт масових повідомлень (BULK_SEND_RATE, нижче
+# ~30/с Telegram) і обмежену паралельність. Після кожної сторінки курсор
+# і лічильники зберігаються в broadcasts: після перезапуску бота
+# розсилка продовжується з наступної сторінки. Доставка "хоча б раз":
+# сторінку, перервану посередині, буде надіслано повторно.
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from aiogram import Bot, types
+
+from src.config.settings import settings
+from src.database import Database
+from src.services.notifier import SendStatus, send_bulk
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_EDIT_INTERVAL = 10  # Секунд між оновленнями повідомлення з прогресом
+DB_RETRY_DELAY = 5  # Пауза, якщо БД не віддала сторінку
+
+STATUS_TITLES = {
+    "pending": "⏸ Очікує підтвердження",
+    "running": "📤 Надсилається",
+    "done": "✅ Завершено",
+    "cancelled": "⏹ Зупинено",
+}
+
+# Розсилки, що виконуються в цьому процесі: id -> задача
+running_broadcasts: Dict[int, asyncio.Task] = {}
+
+
+def format_progress(broadcast: Dict[str, Any]) -> str:
+    """Стан розсилки з пропускною здатністю"""
+    processed = broadcast["sent"] + broadcast["blocked"] + broadcast["failed"]
+    total = max(broadcast["total"], processed)
+    percent = processed * 100 // total if total else 100
+    rate = processed / broadcast["elapsed"] if broadcast["elapsed"] > 0 else 0.0
+    
+    return (
+        f"📣 Розсилка #{broadcast['id']}: {STATUS_TITLES.get(broadcast['status'], broadcast['status'])}\n\n"
+        f"📊 Оброблено: {processed}/{total} ({percent}%)\n"
+        f"✅ Доставлено: {broadcast['sent']}\n"
+        f"🚫 Заблокували бота: {broadcast['blocked']}\n"
+        f"❌ Помилки: {broadcast['failed']}\n"
+        f"⚡ Швидкість: {rate:.1f} повід./с, час: {broadcast['elapsed']:.0f} с"
+    )
+
+
+def progress_keyboard(broadcast: Dict[str, Any]) -> Optional[types.InlineKeyboardMarkup]:
+    if broadcast["status"] != "running":
+        return None
+    return types.InlineKeyboardMarkup(inline_keyboard=[
+        [types.InlineKeyboardButton(text="⏹ Зупинити", callback_data=f"broadcast_stop_{broadcast['id']}")]
+    ])
+
+
+async def show_progress(bot: Bot, broadcast: Dict[str, Any]):
+    """Оновлює повідомлення адміністратора з прогресом"""
+    if not broadcast.get("progress_message_id"):
+        return
+    try:
+        await bot.edit_message_text(
+            format_progress(broadcast),
+            chat_id=broadcast["admin_id"],
+            message_id=broadcast["progress_message_id"],
+            reply_markup=progress_keyboard(broadcast)
+        )
+    except Exception as e:
+        if "message is not modified" not in str(e):
+            logger.warning(f"Не вдалося оновити прогрес розсилки #{broadcast['id']}: {e}")
+
+
+async def run_broadcast(bot: Bot, db: Database, broadcast_id: int,
+                        page_size: int = settings.BROADCAST_PAGE_SIZE):
+    """Надсилає розсилку з місця, де вона зупинилась"""
+    broadcast = await db.get_broadcast(broadcast_id)
+    if broadcast is None or broadcast["status"] != "running":
+        return
+    
+    last_shown = time.monotonic()
+    logger.info(f"Розсилка #{broadcast_id}: старт з user_id > {broadcast['last_user_id']}")
+    
+    while True:
+        page_started = time.monotonic()
+        user_ids = await db.get_user_ids_page(broadcast["last_user_id"], page_size)
+        if user_ids is None:
+            await asyncio.sleep(DB_RETRY_DELAY)
+            continue
+        if not user_ids:
+            break
+        
+        # Текст адміністратора - як є, без розмітки
+        statuses = await send_bulk(bot, user_ids, broadcast["text"], parse_mode=None)
+        
+        counts = {SendStatus.SENT: 0, SendStatus.BLOCKED: 0, SendStatus.FAILED: 0}
+        for status in statuses.values():
+            counts[status] += 1
+        elapsed = time.monotonic() - page_started
+        
+        await db.save_broadcast_progress(
+            broadcast_id, user_ids[-1],
+            counts[SendStatus.SENT], counts[SendStatus.BLOCKED], counts[SendStatus.FAILED], elapsed
+        )
+        broadcast["last_user_id"] = user_ids[-1]
+        broadcast["sent"] += counts[SendStatus.SENT]
+        broadcast["blocked"] += counts[SendStatus.BLOCKED]
+        broadcast["failed"] += counts[SendStatus.FAILED]
+        broadcast["elapsed"] += elapsed
+        
+        if time.monotonic() - last_shown >= PROGRESS_EDIT_INTERVAL:
+            await show_progress(bot, broadcast)
+            last_shown = time.monotonic()
+    
+    await db.set_broadcast_status(broadcast_id, "done", ("running",), now_ts=int(time.time()))
+    broadcast["status"] = "done"
+    await show_progress(bot, broadcast)
+    logger.info(f"Розсилка #{broadcast_id} завершена:\n{format_progress(broadcast)}")
+
+
+def start_broadcast(bot: Bot, db: Database, broadcast_id: int) -> asyncio.Task:
+    """Запускає розсилку фоновою задачею"""
+    task = asyncio.create_task(run_broadcast(bot, db, broadcast_id))
+    running_broadcasts[broadcast_id] = task
+    task.add_done_callback(lambda _: running_broadcasts.pop(broadcast_id, None))
+    return task
+
+
+async def resume_broadcasts(bot: Bot, db: Database) -> int:
+    """Продовжує розсилки, перервані перезапуском"""
+    broadcasts = await db.get_running_broadcasts()
+    for broadcast in broadcasts:
+        start_broadcast(bot, db, broadcast["id"])
+    if broadcasts:
+        logger.info(f"Відновлено розсилок: {len(broadcasts)}")
+    return len(broadcasts)
+
+
+async def stop_broadcast(db: Database, broadcast_id: int) -> bool:
+    """Зупиняє розсилку назавжди (на відміну від перезапуску бота)"""
+    if not await db.set_broadcast_status(broadcast_id, "cancelled", ("running",), now_ts=int(time.time())):
+        return False
+    task = running_broadcasts.get(broadcast_id)
+    if task:
+        task.cancel()
+    return True
@@ -0,0 +1,131 @@
+﻿# src/services/daily_rewards.py - Щоденна нагорода і нагадування про неї
+#
+# Після кожної нагороди в players.daily_notify_ts записується момент,
+# коли вона знову стане доступною. Планувальник раз на
+# DAILY_NOTIFY_INTERVAL бере гравців з daily_notify_ts <= зараз -
+# діапазон по індексу, без перевірок на кожне повідомлення - і надсилає
+# їм нагадування пачками через спільний ліміт розсилок. Надіслане
+# нагадування знімається, тож кожен отримує одне на нагороду.
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from aiogram import Bot, types
+
+from src.config.constants import (
+    DAILY_REWARD_COOLDOWN, DAILY_REWARD_BASE_GOLD, DAILY_REWARD_GOLD_PER_LEVEL,
+)
+from src.config.settings import settings
+from src.database import Database
+from src.models.player import Player
+from src.services.notifier import send_bulk
+
+logger = logging.getLogger(__name__)
+
+DAILY_CLAIM_CALLBACK = "daily_claim"
+
+NOTIFY_TEXT = "🎁 **Щоденна нагорода чекає!**\n\nЗавітайте до Вентерри та заберіть золото."
+
+
+def daily_reward_keyboard() -> types.InlineKeyboardMarkup:
+    return types.InlineKeyboardMarkup(inline_keyboard=[
+        [types.InlineKeyboardButton(text="🎁 Забрати нагороду", callback_data=DAILY_CLAIM_CALLBACK)]
+    ])
+
+
+async def claim_daily_reward(db: Database, user_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Видає нагороду звичайним шляхом get_player -> Player -> save_player
+    
+    Як і решта хендлерів, записується весь рядок гравця: одночасна дія
+    (покупка тощо) підкоряється тому самому правилу "останній запис
+    виграє", а не перезаписує золото і час нагороди повз нього.
+    
+    Returns:
+        {"reward", "gold"} або None (гравця немає, ще рано чи помилка БД)
+    """
+    player_data = await db.get_player(user_id)
+    if not player_data:
+        return None
+    
+    player = Player.from_dict(player_data)
+    now_ts = int(time.time())
+    if seconds_until_reward(player.last_daily_reward, now_ts) > 0:
+        return None
+    
+    reward = DAILY_REWARD_BASE_GOLD + DAILY_REWARD_GOLD_PER_LEVEL * player.level
+    player.add_gold(reward)
+    player.last_daily_reward = now_ts
+    if not await db.save_player(player.to_dict()):
+        return None
+    
+    await db.schedule_daily_notification(user_id, now_ts + DAILY_REWARD_COOLDOWN)
+    return {"reward": reward, "gold": player.gold}
+
+
+def seconds_until_reward(last_reward_ts: Optional[int], now_ts: Optional[int] = None) -> int:
+    """Скільки секунд до наступної нагороди (0 - вже можна)"""
+    if last_reward_ts is None:
+        return 0
+    now_ts = int(time.time()) if now_ts is None else now_ts
+    return max(0, last_reward_ts + DAILY_REWARD_COOLDOWN - now_ts)
+
+
+async def run_daily_notifications_once(
+    bot: Bot,
+    db: Database,
+    batch_size: int = settings.DAILY_NOTIFY_BATCH_SIZE
+) -> Dict[str, int]:
+    """
+    Надсилає всі нагадування, що настали, пачками по batch_size
+    
+    Returns:
+        Кількість за статусами SendStatus
+    """
+    totals: Dict[str, int] = {}
+    
+    while True:
+        now_ts = int(time.time())
+        user_ids = await db.get_due_daily_notifications(now_ts, batch_size)
+        if not user_ids:
+            break
+        
+        statuses = await send_bulk(bot, user_ids, NOTIFY_TEXT, reply_markup=daily_reward_keyboard())
+        for status in statuses.values():
+            totals[status] = totals.get(status, 0) + 1
+        
+        # Знімаємо і невдалі: заблокованим не повторюємо щокількахвилини
+        await db.clear_daily_notifications(user_ids, now_ts)
+        
+        if len(user_ids) < batch_size:
+            break
+    
+    if totals:
+        logger.info(f"Нагадування про щоденну нагороду: {totals}")
+    return totals
+
+
+async def daily_notify_worker(bot: Bot, db: Database, interval: int,
+                              batch_size: int = settings.DAILY_NOTIFY_BATCH_SIZE):
+    """
+    Періодично надсилає нагадування про нагороду
+    
+    Args:
+        bot: Бот для надсилання
+        db: База даних
+        interval: Секунд між перевірками
+        batch_size: Гравців за вибірку
+    """
+    logger.info(f"Нагадування про щоденну нагороду запущені (кожні {interval} с)")
+    
+    while True:
+        try:
+            await run_daily_notifications_once(bot, db, batch_size)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Помилка нагадувань про нагороду: {e}")
+        
+        await asyncio.sleep(interval)
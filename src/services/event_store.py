@@ -0,0 +1,139 @@
+﻿# src/services/event_store.py - Сховище подій skill check, що чекають на гравця
+#
+# Подія живе від показу (show_skill_check_event) до натискання кнопки.
+# У callback_data - лише короткий id події, а локація і стат беруться
+# зі сховища, тож id локацій з "_" (ice_peaks) більше не ламають розбір.
+#
+# Бекенди (settings.EVENT_STORE_BACKEND):
+#   memory - словник у процесі: обмежений розмір, TTL, найстаріші витісняються;
+#   sqlite - таблиця pending_events: переживає рестарт і спільна для процесів.
+
+import json
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from src.config.settings import settings
+from src.database import Database
+
+# 6 байт -> 8 символів base64url: коротко для callback_data (ліміт 64 байти)
+EVENT_ID_BYTES = 6
+
+
+def new_event_id() -> str:
+    return secrets.token_urlsafe(EVENT_ID_BYTES)
+
+
+class PendingEvent:
+    """Подія, що чекає на відповідь гравця"""
+    
+    __slots__ = ("event_id", "user_id", "location_id", "event", "expires_ts")
+    
+    def __init__(self, event_id: str, user_id: int, location_id: str,
+                 event: Dict[str, Any], expires_ts: int):
+        self.event_id = event_id
+        self.user_id = user_id
+        self.location_id = location_id
+        self.event = event
+        self.expires_ts = expires_ts
+
+
+class MemoryEventStore:
+    """
+    Події в пам'яті процесу
+    
+    TTL однаковий для всіх, тому порядок вставки = порядок старіння:
+    прострочені завжди на початку OrderedDict і чистяться за O(прострочених).
+    На гравця - одна подія: нова замінює попередню.
+    """
+    
+    def __init__(self, ttl: int = settings.EVENT_TTL_SECONDS,
+                 max_size: int = settings.EVENT_STORE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._events: "OrderedDict[str, PendingEvent]" = OrderedDict()
+        self._by_user: Dict[int, str] = {}
+    
+    def __len__(self) -> int:
+        return len(self._events)
+    
+    def _drop(self, event_id: str) -> Optional[PendingEvent]:
+        pending = self._events.pop(event_id, None)
+        if pending and self._by_user.get(pending.user_id) == event_id:
+            del self._by_user[pending.user_id]
+        return pending
+    
+    def _evict(self, now: int):
+        """Прострочені, а потім найстаріші понад max_size"""
+        while self._events:
+            event_id, pending = next(iter(self._events.items()))
+            if pending.expires_ts > now and len(self._events) <= self.max_size:
+                break
+            self._drop(event_id)
+    
+    async def put(self, user_id: int, location_id: str, event: Dict[str, Any]) -> str:
+        """Зберігає подію гравця, повертає її id"""
+        now = int(time.time())
+        
+        previous = self._by_user.get(user_id)
+        if previous:
+            self._drop(previous)
+        
+        event_id = new_event_id()
+        while event_id in self._events:
+            event_id = new_event_id()
+        
+        self._events[event_id] = PendingEvent(event_id, user_id, location_id, event, now + self.ttl)
+        self._by_user[user_id] = event_id
+        self._evict(now)
+        return event_id
+    
+    async def pop(self, event_id: str, user_id: int) -> Optional[PendingEvent]:
+        """
+        Забирає подію (один раз)
+        
+        None - немає, прострочена або чужа (id з чужого повідомлення).
+        """
+        pending = self._events.get(event_id)
+        if not pending or pending.user_id != user_id:
+            return None
+        
+        self._drop(event_id)
+        if pending.expires_ts <= int(time.time()):
+            return None
+        return pending
+
+
+class SQLiteEventStore:
+    """Події в таблиці pending_events (див. міграцію v6)"""
+    
+    def __init__(self, db: Optional[Database] = None, ttl: int = settings.EVENT_TTL_SECONDS):
+        self.db = db or Database()
+        self.ttl = ttl
+    
+    async def put(self, user_id: int, location_id: str, event: Dict[str, Any]) -> Optional[str]:
+        """id події або None, якщо БД її не зберегла"""
+        now = int(time.time())
+        event_id = new_event_id()
+        saved = await self.db.put_pending_event(
+            event_id, user_id, location_id,
+            json.dumps(event, ensure_ascii=False), now + self.ttl, now
+        )
+        return event_id if saved else None
+    
+    async def pop(self, event_id: str, user_id: int) -> Optional[PendingEvent]:
+        row = await self.db.pop_pending_event(event_id, user_id, int(time.time()))
+        if not row:
+            return None
+        return PendingEvent(
+            row["event_id"], row["user_id"], row["location_id"],
+            json.loads(row["event"]), row["expires_ts"]
+        )
+
+
+def create_event_store():
+    """Сховище за settings.EVENT_STORE_BACKEND"""
+    if settings.EVENT_STORE_BACKEND == "sqlite":
+        return SQLiteEventStore()
+    return MemoryEventStore()
@@ -0,0 +1,185 @@
+﻿# src/services/expeditions.py - Експедиції: пакетний розрахунок офлайн-полювань
+#
+# Гравець обирає локацію і кількість боїв, а сервер проводить їх сам,
+# коли експедиція "повертається": фонова задача бере готові експедиції
+# пачкою, проганяє бої через рушій (combat.auto_battle), оновлює квести
+# та лут і записує все однією транзакцією.
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from src.config.constants import LOCATIONS
+from src.config.settings import settings
+from src.database import Database
+from src.models.player import Player
+from src.models.quest import update_player_quests
+from src.utils import combat
+from src.utils.combat import BattleState
+from src.utils.rng import GameRNG, get_rng
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_expedition(
+    player: Player,
+    location_id: str,
+    encounters: int,
+    rng: Optional[GameRNG] = None
+) -> Dict[str, Any]:
+    """
+    Проводить бої експедиції (змінює player)
+    
+    Кожен бій - як у звичайному дослідженні: монстр локації, квести
+    "survive" і "kill", нагорода, лут. Поразка завершує експедицію
+    достроково (HP = 1, як після програного бою).
+    
+    Args:
+        player: Гравець
+        location_id: Локація з LOCATIONS
+        encounters: Скільки боїв провести
+        rng: Генератор (кожен бій отримує дочірній потік)
+    
+    Returns:
+        Підсумок для гравця (зберігається в expeditions.result як JSON)
+    """
+    rng = rng or get_rng()
+    
+    summary = {
+        "location": location_id,
+        "encounters": encounters,
+        "fights": 0,
+        "victories": 0,
+        "timeouts": 0,
+        "defeated": False,
+        "exp": 0,
+        "gold": 0,
+        "loot": {},
+        "levels": [],
+        "quests": [],
+        "potions": 0,
+        "damage_dealt": 0,
+        "damage_taken": 0,
+    }
+    
+    # Час експедиції теж відпочинок
+    player.apply_regeneration()
+    
+    for _ in range(encounters):
+        monster = combat.spawn_monster(location_id, rng)
+        completed = update_player_quests(player, "survive", location_id)
+        
+        state = BattleState(player, monster, rng.spawn())
+        fight = combat.auto_battle(state)
+        player.reset_battle_cooldowns()
+        
+        summary["fights"] += 1
+        summary["potions"] += fight["potions"]
+        summary["damage_dealt"] += fight["damage_dealt"]
+        summary["damage_taken"] += fight["damage_taken"]
+        
+        if fight["outcome"] == "victory":
+            level_up = player.add_experience(monster.exp_reward)
+            player.add_gold(monster.gold_reward)
+            player.monsters_killed += 1
+            
+            summary["victories"] += 1
+            summary["exp"] += monster.exp_reward
+            summary["gold"] += monster.gold_reward
+            if level_up["leveled_up"]:
+                summary["levels"].append(level_up["new_level"])
+            
+            completed += update_player_quests(player, "kill", monster.monster_type)
+            
+            for item in monster.get_loot(state.rng):
+                if len(player.inventory) >= settings.MAX_INVENTORY_SIZE:
+                    break
+                player.inventory.append(item)
+                summary["loot"][item["name"]] = summary["loot"].get(item["name"], 0) + 1
+        
+        elif fight["outcome"] == "defeat":
+            player.health = 1
+            summary["defeated"] = True
+        
+        else:
+            summary["timeouts"] += 1
+        
+        summary["quests"].extend(quest.name for quest in completed)
+        
+        if summary["defeated"]:
+            break
+    
+    return summary
+
+
+def _resolve_row(row: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """Рядок гравця з полями expedition_* -> (нові дані гравця, підсумок)"""
+    location_id = row["expedition_location"]
+    
+    # Збій однієї експедиції не повинен відкочувати всю пачку
+    try:
+        if location_id not in LOCATIONS:
+            raise ValueError(f"невідома локація {location_id}")
+        player = Player.from_dict(row)
+        result = resolve_expedition(player, location_id, row["expedition_encounters"])
+    except Exception as e:
+        logger.error(f"Помилка розрахунку експедиції {row['expedition_id']}: {e}")
+        return None, {"location": location_id, "error": str(e)}
+    
+    return player.to_dict(), result
+
+
+async def run_expeditions_once(
+    db: Database,
+    batch_size: int = settings.EXPEDITION_BATCH_SIZE,
+    exclude_user_ids: Iterable[int] = ()
+) -> int:
+    """
+    Розраховує всі готові експедиції пачками по batch_size
+    
+    Розрахунок синхронний, тому пачка обмежена: між пачками
+    цикл подій встигає обробити повідомлення гравців.
+    """
+    exclude = list(exclude_user_ids)
+    total = 0
+    
+    while True:
+        resolved = await db.resolve_due_expeditions(int(time.time()), batch_size, _resolve_row, exclude)
+        total += resolved
+        if resolved < batch_size:
+            break
+        await asyncio.sleep(0)
+    
+    if total:
+        logger.info(f"Експедиції: розраховано {total}")
+    return total
+
+
+async def expedition_worker(
+    db: Database,
+    interval: int,
+    batch_size: int = settings.EXPEDITION_BATCH_SIZE,
+    get_excluded: Optional[Callable[[], Iterable[int]]] = None
+):
+    """
+    Періодично розраховує експедиції, що повернулися
+    
+    Args:
+        db: База даних
+        interval: Секунд між проходами
+        batch_size: Експедицій в одній транзакції
+        get_excluded: Повертає user_id, яких пропускаємо (гравці в бою)
+    """
+    logger.info(f"Фонові експедиції запущені (кожні {interval} с)")
+    
+    while True:
+        try:
+            excluded = get_excluded() if get_excluded else ()
+            await run_expeditions_once(db, batch_size, excluded)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Помилка фонових експедицій: {e}")
+        
+        await asyncio.sleep(interval)
@@ -0,0 +1,67 @@
+﻿# src/services/leaderboard.py - Заповнення таблиць лідерів і сторінки /top
+
+import logging
+from typing import Any, Dict, Optional
+
+from src.config.settings import settings
+from src.database import Database
+from src.utils.leaderboard import LEADERBOARDS, leaderboards
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_board(db: Database, board_id: str) -> bool:
+    """(Пере)заповнює таблицю з БД одним індексним запитом"""
+    board = leaderboards.get(board_id)
+    rows = await db.get_top_players(board.columns, board.capacity)
+    if rows is None:
+        return False
+    board.load(rows)
+    return True
+
+
+async def warm_leaderboards(db: Database) -> int:
+    """Заповнює всі таблиці при старті бота"""
+    loaded = 0
+    for board_id in LEADERBOARDS:
+        loaded += await refresh_board(db, board_id)
+    logger.info(f"Таблиці лідерів заповнено: {loaded}/{len(LEADERBOARDS)}")
+    return loaded
+
+
+async def get_leaderboard_page(db: Database, board_id: str, page: int,
+                               user_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Сторінка таблиці лідерів
+    
+    Args:
+        db: База (лише якщо таблицю треба перечитати)
+        board_id: Ключ LEADERBOARDS
+        page: Номер сторінки з 0 (обрізається до наявних)
+        user_id: Гравець, чиє місце показати
+    
+    Returns:
+        {"board_id", "title", "columns", "page", "pages", "offset",
+         "entries", "rank"} або None, якщо таблиці немає чи БД недоступна
+    """
+    board = leaderboards.get(board_id)
+    if board is None:
+        return None
+    if board.dirty and not await refresh_board(db, board_id):
+        return None
+    
+    page_size = settings.LEADERBOARD_PAGE_SIZE
+    pages = max(1, -(-len(board) // page_size))
+    page = min(max(page, 0), pages - 1)
+    offset = page * page_size
+    
+    return {
+        "board_id": board_id,
+        "title": LEADERBOARDS[board_id]["title"],
+        "columns": board.columns,
+        "page": page,
+        "pages": pages,
+        "offset": offset,
+        "entries": board.page(offset, page_size),
+        "rank": board.rank(user_id) if user_id is not None else None,
+    }
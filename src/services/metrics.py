@@ -0,0 +1,48 @@
+﻿# src/services/metrics.py - Вивід метрик: періодичний лог та /metrics
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from src.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+async def metrics_log_worker(interval: int):
+    """Періодично пише зведення метрик у лог"""
+    while True:
+        await asyncio.sleep(interval)
+        logger.info(metrics.format_summary())
+
+
+async def _metrics_handler(request: "web.Request") -> "web.Response":
+    from aiohttp import web
+    
+    return web.Response(text=metrics.render_prometheus(), content_type="text/plain")
+
+
+async def start_metrics_server(host: str, port: int) -> "web.AppRunner":
+    """
+    Запускає локальний HTTP-ендпоінт /metrics (формат Prometheus)
+    
+    aiohttp.web (~15 мс імпорту) завантажується лише тут - при
+    METRICS_PORT=0 старт бота за нього не платить.
+    
+    Returns:
+        AppRunner - для зупинки через await runner.cleanup()
+    """
+    from aiohttp import web
+    
+    app = web.Application()
+    app.router.add_get("/metrics", _metrics_handler)
+    
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    
+    logger.info(f"Метрики доступні на http://{host}:{port}/metrics")
+    return runner
@@ -0,0 +1,84 @@
+﻿# src/services/notifier.py - Масове надсилання повідомлень у межах лімітів Telegram
+#
+# Усі масові розсилки (нагадування, оголошення) ділять один
+# AsyncRateLimiter - разом вони не перевищують BULK_SEND_RATE, і
+# відповіді гравцям у хендлерах не впираються у ліміт бота.
+# Паралельність обмежена семафором: повільна відповідь API не
+# затримує решту пачки, але й не відкриває сотні з'єднань.
+
+import asyncio
+import logging
+from typing import Dict, Optional, Sequence
+
+from aiogram import Bot, types
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+
+from src.config.settings import settings
+from src.utils.rate_limit import AsyncRateLimiter
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3  # Спроб на повідомлення (повтор лише після 429)
+
+bulk_limiter = AsyncRateLimiter(settings.BULK_SEND_RATE, burst=settings.BULK_SEND_RATE)
+
+
+class SendStatus:
+    SENT = "sent"
+    BLOCKED = "blocked"  # Гравець заблокував бота або видалив акаунт
+    FAILED = "failed"
+
+
+async def send_one(bot: Bot, user_id: int, text: str,
+                   reply_markup: Optional[types.InlineKeyboardMarkup] = None,
+                   parse_mode: Optional[str] = "Markdown",
+                   limiter: AsyncRateLimiter = bulk_limiter) -> str:
+    """Одне повідомлення з повтором після Retry-After"""
+    for _ in range(MAX_ATTEMPTS):
+        await limiter.acquire()
+        try:
+            await bot.send_message(user_id, text, reply_markup=reply_markup, parse_mode=parse_mode)
+            return SendStatus.SENT
+        except TelegramRetryAfter as e:
+            # Ліміт перевищено - пауза для всіх розсилок, потім повтор
+            logger.warning(f"Telegram просить зачекати {e.retry_after} с")
+            limiter.pause(e.retry_after)
+        except TelegramForbiddenError:
+            return SendStatus.BLOCKED
+        except TelegramBadRequest as e:
+            logger.debug(f"Повідомлення {user_id} не надіслано: {e}")
+            return SendStatus.FAILED
+        except Exception as e:
+            logger.warning(f"Помилка надсилання {user_id}: {e}")
+            return SendStatus.FAILED
+    return SendStatus.FAILED
+
+
+async def send_bulk(bot: Bot, user_ids: Sequence[int], text: str,
+                    reply_markup: Optional[types.InlineKeyboardMarkup] = None,
+                    parse_mode: Optional[str] = "Markdown",
+                    concurrency: int = settings.BULK_SEND_CONCURRENCY,
+                    limiter: AsyncRateLimiter = bulk_limiter) -> Dict[int, str]:
+    """
+    Надсилає text усім user_ids
+    
+    Args:
+        bot: Бот
+        user_ids: Отримувачі (пачка - таски створюються на всіх одразу)
+        text: Текст повідомлення
+        reply_markup: Inline-клавіатура
+        parse_mode: Розмітка тексту
+        concurrency: Максимум одночасних запитів
+        limiter: Ліміт частоти (за замовчуванням - спільний)
+    
+    Returns:
+        {user_id: SendStatus}
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def send(user_id: int) -> str:
+        async with semaphore:
+            return await send_one(bot, user_id, text, reply_markup, parse_mode, limiter)
+    
+    statuses = await asyncio.gather(*(send(user_id) for user_id in user_ids))
+    return dict(zip(user_ids, statuses))
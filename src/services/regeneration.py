@@ -0,0 +1,49 @@
+﻿# src/services/regeneration.py - Фонова пакетна регенерація
+
+import asyncio
+import logging
+import time
+from typing import Callable, Iterable, Optional
+
+from src.database import Database
+
+logger = logging.getLogger(__name__)
+
+
+async def run_regeneration_once(
+    db: Database,
+    exclude_user_ids: Iterable[int] = ()
+) -> int:
+    """Один прохід регенерації для всіх гравців"""
+    updated = await db.regenerate_players(int(time.time()), exclude_user_ids)
+    if updated:
+        logger.debug(f"Регенерація: оновлено {updated} гравців")
+    return updated
+
+
+async def regeneration_worker(
+    db: Database,
+    interval: int,
+    get_excluded: Optional[Callable[[], Iterable[int]]] = None
+):
+    """
+    Періодично застосовує регенерацію до всіх гравців
+    
+    Args:
+        db: База даних
+        interval: Секунд між проходами
+        get_excluded: Повертає user_id, яких пропускаємо (гравці в бою -
+                      їхній стан живе в пам'яті і буде збережений після бою)
+    """
+    logger.info(f"Фонова регенерація запущена (кожні {interval} с)")
+    
+    while True:
+        try:
+            excluded = get_excluded() if get_excluded else ()
+            await run_regeneration_once(db, excluded)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Помилка фонової регенерації: {e}")
+        
+        await asyncio.sleep(interval)
@@ -0,0 +1,89 @@
+﻿# src/services/stats.py - Фонове оновлення агрегованої статистики економіки
+#
+# Тригери на players (міграція v8) позначають гравців у stats_dirty при
+# будь-якій зміні рівня, золота, інвентаря чи спорядження. Фонова
+# задача переносить лише їхні зміни в stats_levels / stats_items /
+# stats_totals, тож /stats читає кілька маленьких таблиць замість
+# розбору JSON інвентаря кожного гравця.
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Tuple
+
+from src.config.settings import settings
+from src.database import Database
+
+logger = logging.getLogger(__name__)
+
+
+def _item_name(item: Any) -> str:
+    """Ключ предмета в статистиці - назва (старий лут - рядок)"""
+    if isinstance(item, dict):
+        return item.get("name") or "?"
+    return str(item)
+
+
+def summarize_player(row: Dict[str, Any]) -> Tuple[int, int, int, Dict[str, int]]:
+    """Внесок гравця: (рівень, золото, зароблено всього, {предмет: кількість})"""
+    items: Dict[str, int] = {}
+    
+    try:
+        inventory = json.loads(row.get("inventory") or "[]")
+    except ValueError:
+        inventory = []
+    try:
+        equipment = json.loads(row.get("equipment") or "{}")
+    except ValueError:
+        equipment = {}
+    
+    # Вдягнене теж належить гравцю
+    for item in [*inventory, *equipment.values()]:
+        if item:
+            name = _item_name(item)
+            items[name] = items.get(name, 0) + 1
+    
+    return (
+        int(row.get("level") or 1),
+        int(row.get("gold") or 0),
+        int(row.get("total_gold_earned") or 0),
+        items,
+    )
+
+
+async def run_stats_once(db: Database, batch_size: int = settings.STATS_BATCH_SIZE) -> int:
+    """Переносить в агрегати всіх позначених гравців пачками по batch_size"""
+    total = 0
+    
+    while True:
+        applied = await db.apply_stats_batch(batch_size, summarize_player)
+        total += applied
+        if applied < batch_size:
+            break
+        await asyncio.sleep(0)
+    
+    if total:
+        logger.debug(f"Статистика: оновлено внесок {total} гравців")
+    return total
+
+
+async def stats_worker(db: Database, interval: int, batch_size: int = settings.STATS_BATCH_SIZE):
+    """
+    Періодично оновлює агрегати
+    
+    Args:
+        db: База даних
+        interval: Секунд між проходами
+        batch_size: Гравців в одній транзакції
+    """
+    logger.info(f"Фонова статистика запущена (кожні {interval} с)")
+    
+    while True:
+        try:
+            await run_stats_once(db, batch_size)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Помилка фонової статистики: {e}")
+        
+        await asyncio.sleep(interval)
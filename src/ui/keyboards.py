@@ -1,9 +1,78 @@
 ﻿# src/ui/keyboards.py - Клавіатури інтерфейсу
 
+from functools import lru_cache, wraps
+
 from aiogram import types
+from pydantic import ConfigDict
 from src.config.constants import CLASS_NAMES, CharacterClass
 
+# ✨ Статичні клавіатури будуються один раз і далі повертається той самий
+# екземпляр. Розмітка aiogram 3 змінювана (MutableTelegramObject), тому
+# кешований екземпляр заморожується: класи нижче забороняють присвоєння
+# полів, а ряди кнопок - FrozenList (append/зміна рядів неможливі).
+# Саме підклас list, а не кортеж: з кортежем pydantic серіалізує кнопки
+# загальним шляхом, і в запит потрапляють порожні поля ("url": null).
+
+
+class FrozenList(list):
+    """Список лише для читання"""
+    
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Клавіатура з кешу незмінна")
+    
+    append = extend = insert = remove = pop = clear = sort = reverse = _readonly
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+
+
+class FrozenKeyboardButton(types.KeyboardButton):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenInlineKeyboardButton(types.InlineKeyboardButton):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenReplyKeyboardMarkup(types.ReplyKeyboardMarkup):
+    model_config = ConfigDict(frozen=True)
+
 
+class FrozenInlineKeyboardMarkup(types.InlineKeyboardMarkup):
+    model_config = ConfigDict(frozen=True)
+
+
+_FROZEN_TYPES = {
+    types.KeyboardButton: FrozenKeyboardButton,
+    types.InlineKeyboardButton: FrozenInlineKeyboardButton,
+    types.ReplyKeyboardMarkup: FrozenReplyKeyboardMarkup,
+    types.InlineKeyboardMarkup: FrozenInlineKeyboardMarkup,
+}
+
+
+def freeze_markup(markup):
+    """Незмінна копія клавіатури (Reply/InlineKeyboardMarkup)"""
+    field = "inline_keyboard" if isinstance(markup, types.InlineKeyboardMarkup) else "keyboard"
+    rows = FrozenList(
+        FrozenList(_FROZEN_TYPES[type(button)](**button.model_dump(exclude_unset=True)) for button in row)
+        for row in getattr(markup, field)
+    )
+    frozen = _FROZEN_TYPES[type(markup)](**markup.model_dump(exclude_unset=True))
+    # Валідація робить звичайні списки - підміняємо в обхід frozen
+    frozen.__dict__[field] = rows
+    return frozen
+
+
+def frozen_markup_cache(maxsize=None):
+    """lru_cache для функцій, що будують клавіатуру: кеш тримає заморожений екземпляр"""
+    def decorator(builder):
+        @lru_cache(maxsize=maxsize)
+        @wraps(builder)
+        def cached(*args, **kwargs):
+            return freeze_markup(builder(*args, **kwargs))
+        return cached
+    return decorator
+
+
+@frozen_markup_cache()
 def get_class_selection_keyboard() -> types.InlineKeyboardMarkup:
     """Клавіатура вибору класу персонажа"""
     buttons = []
@@ -20,6 +89,7 @@ def get_class_selection_keyboard() -> types.InlineKeyboardMarkup:
     return types.InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+@frozen_markup_cache()
 def get_adventure_main_keyboard() -> types.ReplyKeyboardMarkup:
     """Клавіатура під час пригод (поза містом)"""
     keyboard = types.ReplyKeyboardMarkup(
@@ -31,6 +101,9 @@ def get_adventure_main_keyboard() -> types.ReplyKeyboardMarkup:
             [
                 types.KeyboardButton(text="🏰 Повернутися до міста"),
                 types.KeyboardButton(text="🗺️ Досліджувати") 
+            ],
+            [
+                types.KeyboardButton(text="🧭 Експедиція")
             ]
         ],
         resize_keyboard=True
@@ -38,6 +111,7 @@ def get_adventure_main_keyboard() -> types.ReplyKeyboardMarkup:
     return keyboard
 
 
+@frozen_markup_cache()
 def get_city_keyboard() -> types.ReplyKeyboardMarkup:
     """Головна клавіатура міста"""
     keyboard = types.ReplyKeyboardMarkup(
@@ -64,6 +138,7 @@ def get_city_keyboard() -> types.ReplyKeyboardMarkup:
     return keyboard
 
 
+@frozen_markup_cache(maxsize=32)
 def get_adventures_keyboard(player_level: int = 1) -> types.InlineKeyboardMarkup:
     """Клавіатура вибору локації для пригод"""
     from src.config.constants import LOCATIONS, Location
@@ -98,6 +173,7 @@ def get_adventures_keyboard(player_level: int = 1) -> types.InlineKeyboardMarkup
     return types.InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+@frozen_markup_cache()
 def get_battle_keyboard() -> types.InlineKeyboardMarkup:
     """Клавіатура бою"""
     keyboard = types.InlineKeyboardMarkup(inline_keyboard=[
@@ -108,6 +184,7 @@ def get_battle_keyboard() -> types.InlineKeyboardMarkup:
     return keyboard
 
 
+@frozen_markup_cache()
 def get_victory_keyboard() -> types.InlineKeyboardMarkup:
     """Клавіатура після перемоги"""
     keyboard = types.InlineKeyboardMarkup(inline_keyboard=[
@@ -118,6 +195,7 @@ def get_victory_keyboard() -> types.InlineKeyboardMarkup:
     return keyboard
 
 
+@frozen_markup_cache()
 def get_shop_keyboard() -> types.InlineKeyboardMarkup:
     """Клавіатура магазину"""
     keyboard = types.InlineKeyboardMarkup(inline_keyboard=[
@@ -130,6 +208,7 @@ def get_shop_keyboard() -> types.InlineKeyboardMarkup:
     return keyboard
 
 
+@frozen_markup_cache()
 def get_inventory_keyboard() -> types.InlineKeyboardMarkup:
     """Клавіатура інвентаря"""
     keyboard = types.InlineKeyboardMarkup(inline_keyboard=[
@@ -141,6 +220,7 @@ def get_inventory_keyboard() -> types.InlineKeyboardMarkup:
     return keyboard
 
 
+@frozen_markup_cache()
 def get_character_keyboard() -> types.InlineKeyboardMarkup:
     """Клавіатура персонажа"""
     keyboard = types.InlineKeyboardMarkup(inline_keyboard=[
@@ -151,6 +231,7 @@ def get_character_keyboard() -> types.InlineKeyboardMarkup:
     return keyboard
 
 
+@frozen_markup_cache()
 def get_stats_distribution_keyboard() -> types.InlineKeyboardMarkup:
     """Клавіатура розподілу статів"""
     keyboard = types.InlineKeyboardMarkup(inline_keyboard=[
@@ -0,0 +1,779 @@
+﻿# src/utils/combat.py - Бойовий рушій без Telegram (чисті функції над BattleState)
+#
+# Хендлери battle.py викликають ці функції та лише показують результат
+# (анімації, edit_text). Симулятор scripts/simulate_combat.py ганяє ті самі
+# функції мільйонами боїв.
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from src.models.player import Player
+from src.models.monster import Monster
+from src.config.abilities import (
+    ABILITIES, ABILITY_PRIORITY, UNDEAD_TYPES, AbilityEffect, StatusKind, StatusTarget
+)
+from src.config.constants import LOCATIONS
+from src.config.equipment import WEAPONS
+from src.utils.dice import CombatCalculator, compile_dice, roll_dice
+from src.utils.encounter_tables import get_encounter_table
+from src.utils.rng import GameRNG, get_rng
+from src.utils.status_effects import EffectList, StatusEffect
+
+# Бонус витривалості в оборонній позиції
+DEFEND_STAMINA_BONUS = 5
+
+# Автобій: зілля лікування, коли HP нижче цієї частки максимуму
+AUTO_POTION_THRESHOLD = 0.3
+# Автобій зупиняється після стількох раундів (далі - вручну)
+AUTO_MAX_ROUNDS = 50
+
+# Вирази кубиків зброї компілюються при імпорті: помилка в даних
+# видна одразу, а не посеред бою
+for _weapon in WEAPONS.values():
+    compile_dice(_weapon.get("damage_dice", "1d6"))
+
+
+# Характеристики, бонуси яких дає спорядження
+COMBAT_STATS = ("strength", "agility", "intelligence", "stamina", "charisma")
+
+
+class CombatSnapshot(NamedTuple):
+    """
+    Бойові характеристики гравця, зафіксовані на початку бою
+    
+    Спорядження під час бою не змінюється, тому AC, бонус атаки,
+    модифікатори тощо рахуються один раз, а кожен раунд - лише арифметика.
+    """
+    armor_class: int
+    attack_bonus: int
+    defense: int
+    crit_chance: int
+    double_chance: int
+    weapon: Optional[Dict[str, Any]]
+    weapon_stat_bonus: int       # Модифікатор характеристики для урону зброєю
+    stat_mods: Dict[str, int]    # D&D-модифікатори з урахуванням спорядження
+    equipment_stamina: int       # Бонус витривалості від спорядження (для оборони)
+    fist_damage: int             # Урон без зброї
+    
+    @classmethod
+    def capture(cls, player: Player) -> "CombatSnapshot":
+        # Один прохід по спорядженню замість get_total_stat_bonus на кожну характеристику
+        equipment_bonus = dict.fromkeys(COMBAT_STATS, 0)
+        for item in player.equipment.values():
+            if item and isinstance(item, dict):
+                for stat in COMBAT_STATS:
+                    equipment_bonus[stat] += item.get(f"{stat}_bonus", 0)
+        
+        stat_mods = {
+            stat: (getattr(player, stat) + equipment_bonus[stat] - 10) // 2
+            for stat in COMBAT_STATS
+        }
+        
+        weapon = player.equipment.get("weapon")
+        weapon_type = weapon.get("weapon_type", "melee") if weapon else None
+        if weapon_type == "melee":
+            weapon_stat_bonus = stat_mods["strength"]
+        elif weapon_type == "ranged":
+            weapon_stat_bonus = stat_mods["agility"]
+        else:
+            weapon_stat_bonus = stat_mods["intelligence"]
+        
+        return cls(
+            armor_class=player.get_armor_class(),
+            attack_bonus=player.get_attack_bonus(),
+            defense=player.get_defense(),
+            crit_chance=player.get_critical_chance(),
+            double_chance=player.get_double_attack_chance(),
+            weapon=weapon,
+            weapon_stat_bonus=weapon_stat_bonus,
+            stat_mods=stat_mods,
+            equipment_stamina=equipment_bonus["stamina"],
+            fist_damage=1 + (player.strength - 10) // 2,
+        )
+
+
+class BattleState:
+    """Стан бою з додатковими полями для D&D"""
+    
+    def __init__(self, player: Player, monster: Monster, rng: Optional[GameRNG] = None):
+        self.player = player
+        self.monster = monster
+        # Характеристики гравця на початок бою (див. invalidate_snapshot)
+        self._snapshot: Optional[CombatSnapshot] = CombatSnapshot.capture(player)
+        # Власний потік кидків бою (дочірній від глобального генератора)
+        self.rng = rng or get_rng().spawn()
+        self.round = 1
+        self.battle_log = []
+        
+        # Статус-ефекти (отрута, щит, оборона, оглушення)
+        self.effects = EffectList()
+        
+        # Лічильники використань навичок за бій (id -> разів)
+        self.ability_uses: Dict[str, int] = {}
+    
+    @property
+    def snapshot(self) -> CombatSnapshot:
+        if self._snapshot is None:
+            self._snapshot = CombatSnapshot.capture(self.player)
+        return self._snapshot
+    
+    def invalidate_snapshot(self):
+        """Викликати після подій, що змінюють характеристики в бою (зілля)"""
+        self._snapshot = None
+    
+    def monster_ac(self) -> int:
+        """AC монстра з урахуванням ефектів"""
+        return self.monster.defense + 10 + self.effects.total(StatusKind.AC_BONUS, StatusTarget.MONSTER)
+
+
+def spawn_monster(location_id: str, rng: Optional[GameRNG] = None) -> Monster:
+    """
+    Випадковий монстр локації за таблицею зустрічей
+    
+    Рівень - від локації, а не від гравця; рідкісні записи таблиці
+    додають level_bonus.
+    """
+    rng = rng or get_rng()
+    location_level = LOCATIONS[location_id].get("level_required", 1)
+    
+    entry = get_encounter_table(location_id).roll_encounter(rng)
+    if entry is None:
+        return Monster("wolf", location_level)
+    
+    # Монстр може бути ±1 рівень від рівня локації, але не менше 1
+    bonus = entry["level_bonus"]
+    monster_level = location_level + bonus + rng.randint(-1, 1)
+    monster_level = max(1, min(monster_level, location_level + 2 + bonus))
+    
+    return Monster(entry["monster"], monster_level)
+
+
+# =====================================================
+# ХІД ГРАВЦЯ
+# =====================================================
+
+def player_attack(state: BattleState) -> Dict[str, Any]:
+    """
+    Звичайна атака гравця (Attack Roll + пасивки класу)
+    
+    Returns:
+        {"d20": кидок, "log": рядки логу, "victory": чи помер монстр}
+    """
+    player = state.player
+    monster = state.monster
+    snapshot = state.snapshot
+    battle_log = []
+    
+    attack_bonus = snapshot.attack_bonus
+    d20_result, total_roll, is_critical = CombatCalculator.attack_roll(attack_bonus, state.rng)
+    monster_ac = state.monster_ac()
+    
+    # Критичний промах
+    if d20_result == 1:
+        battle_log.append(f"💀 Критичний промах! (випало 1)")
+        battle_log.append(f"Ви не наносите урону")
+    
+    # Попадання
+    elif total_roll >= monster_ac or is_critical:
+        weapon = snapshot.weapon
+        
+        if not weapon:
+            damage = snapshot.fist_damage
+            battle_log.append(f"🥊 Удар кулаком: {damage} урону")
+        else:
+            stat_bonus = snapshot.weapon_stat_bonus
+            damage, damage_desc = CombatCalculator.damage_roll(weapon, stat_bonus, is_critical, rng=state.rng)
+            
+            if is_critical:
+                battle_log.append(f"💥 КРИТИЧНИЙ УДАР! (випало 20)")
+            
+            # ✨ ПАСИВКА РОЗБІЙНИКА - Критичний удар
+            if player.character_class == "rogue" and not is_critical:
+                crit_chance = snapshot.crit_chance
+                if state.rng.randint(1, 100) <= crit_chance:
+                    damage *= 2
+                    battle_log.append(f"🗡️ ПАСИВКА: Критичний удар розбійника! ({crit_chance}%)")
+                    battle_log.append(f"💥 Урон подвоєно!")
+            
+            battle_log.append(f"🎲 d20: {d20_result} + {attack_bonus} = {total_roll} (AC {monster_ac})")
+            battle_log.append(f"⚔️ Урон: {damage_desc}")
+        
+        monster.health -= damage
+        player.total_damage_dealt += damage
+        
+        # ✨ ПАСИВКА ВОЇНА - Подвійний удар
+        if player.character_class == "warrior":
+            double_chance = snapshot.double_chance
+            if state.rng.randint(1, 100) <= double_chance:
+                d20_second, total_second, is_crit_second = CombatCalculator.attack_roll(attack_bonus, state.rng)
+                
+                battle_log.append(f"\n⚔️⚔️ ПАСИВКА: Подвійний удар! ({double_chance}%)")
+                
+                if total_second >= monster_ac or is_crit_second:
+                    if weapon:
+                        damage_second, desc_second = CombatCalculator.damage_roll(weapon, stat_bonus, is_crit_second, rng=state.rng)
+                        
+                        if is_crit_second:
+                            battle_log.append(f"💥 Другий удар - КРИТ!")
+                    else:
+                        damage_second = snapshot.fist_damage
+                        desc_second = str(damage_second)
+                    
+                    monster.health -= damage_second
+                    player.total_damage_dealt += damage_second
+                    battle_log.append(f"🎲 d20: {d20_second} → Урон: {desc_second}")
+                else:
+                    battle_log.append(f"❌ Другий удар промахнувся! (d20: {d20_second})")
+    
+    # Промах
+    else:
+        battle_log.append(f"❌ Промах! d20: {d20_result} + {attack_bonus} = {total_roll} (потрібно {monster_ac}+)")
+    
+    return {"d20": d20_result, "log": battle_log, "victory": monster.health <= 0}
+
+
+def attempt_flee(state: BattleState) -> Dict[str, int]:
+    """
+    Спроба втечі: 50% + 2% за спритність
+    
+    Returns:
+        {"success": bool, "chance": відсоток, "roll": кидок 1-100}
+    """
+    flee_chance = 50 + (state.player.agility * 2)
+    roll = state.rng.randint(1, 100)
+    return {"success": roll <= flee_chance, "chance": flee_chance, "roll": roll}
+
+
+# =====================================================
+# НАВИЧКИ КЛАСІВ
+# =====================================================
+
+def _deal_damage(state: BattleState, damage: int):
+    state.monster.health -= damage
+    state.player.total_damage_dealt += damage
+
+
+def _use_line(state: BattleState, ability: Dict[str, Any]) -> str:
+    """Рядок логу про використання (з лічильником, якщо ліміт більше 1)"""
+    limit = ability.get("uses_per_battle", 0)
+    if limit > 1:
+        return f"{ability['use_text']} ({state.ability_uses[ability['id']]}/{limit})"
+    return ability["use_text"]
+
+
+def _apply_status(state: BattleState, status: Dict[str, Any]) -> StatusEffect:
+    """Накладає статус з даних навички (повторне накладання оновлює його)"""
+    value = roll_dice(status["dice"], state.rng)[0] if status.get("dice") else status.get("value", 0)
+    return state.effects.add(StatusEffect(
+        status["id"], status["kind"], status["target"], value, status["duration"],
+        status.get("name", ""), status.get("icon", "✨")
+    ))
+
+
+def _spell_damage(state: BattleState, ability: Dict[str, Any], battle_log: List[str]):
+    """Закляття: кубики + модифікатор характеристики, без кидка атаки"""
+    stat_bonus = state.snapshot.stat_mods[ability["stat"]]
+    damage, damage_desc = CombatCalculator.spell_damage(ability["dice"], stat_bonus, state.rng)
+    
+    battle_log.append(_use_line(state, ability))
+    battle_log.append(f"🎲 {damage_desc}")
+    _deal_damage(state, damage)
+
+
+def _weapon_multiplier(state: BattleState, ability: Dict[str, Any], battle_log: List[str]):
+    """Посилений удар зброєю (без кидка атаки)"""
+    player = state.player
+    multiplier = ability["multiplier"]
+    weapon = state.snapshot.weapon
+    
+    if not weapon:
+        damage = int((1 + (getattr(player, ability["stat"]) - 10) // 2) * multiplier)
+    else:
+        base_damage, _ = CombatCalculator.damage_roll(
+            weapon, state.snapshot.stat_mods[ability["stat"]], False, rng=state.rng
+        )
+        damage = int(base_damage * multiplier)
+    
+    battle_log.append(_use_line(state, ability))
+    battle_log.append(f"💥 × {multiplier} урону: {damage}")
+    _deal_damage(state, damage)
+
+
+def _poison_attack(state: BattleState, ability: Dict[str, Any], battle_log: List[str]):
+    """Атака з кидком d20; при влучанні накладає отруту"""
+    player = state.player
+    monster = state.monster
+    
+    d20_result, total_roll, is_critical = CombatCalculator.attack_roll(state.snapshot.attack_bonus, state.rng)
+    monster_ac = state.monster_ac()
+    
+    if total_roll < monster_ac and not is_critical:
+        battle_log.append(f"{ability['name']}...")
+        battle_log.append(f"❌ Промах! d20: {d20_result}")
+        return
+    
+    weapon = state.snapshot.weapon
+    if weapon:
+        stat_bonus = state.snapshot.stat_mods[ability["stat"]]
+        damage, damage_desc = CombatCalculator.damage_roll(weapon, stat_bonus, is_critical, rng=state.rng)
+    else:
+        damage = 1 + (getattr(player, ability["stat"]) - 10) // 2
+        damage_desc = str(damage)
+    
+    _deal_damage(state, damage)
+    battle_log.append(_use_line(state, ability))
+    battle_log.append(f"⚔️ Урон: {damage_desc}")
+    
+    effect = _apply_status(state, ability["status"])
+    battle_log.append(
+        f"{effect.icon} {effect.name} накладена! ({effect.value} урону за хід, {effect.remaining} ходи)"
+    )
+
+
+def _status_only(state: BattleState, ability: Dict[str, Any], battle_log: List[str]):
+    """Навичка без урону: лише накладає статус (щит, баф)"""
+    _apply_status(state, ability["status"])
+    battle_log.append(_use_line(state, ability))
+    if ability.get("status_text"):
+        battle_log.append(ability["status_text"])
+
+
+def _dice_damage(state: BattleState, ability: Dict[str, Any], battle_log: List[str]):
+    """Чисті кубики урону (без модифікаторів)"""
+    damage, _ = roll_dice(ability["dice"], state.rng)
+    battle_log.append(_use_line(state, ability))
+    battle_log.append(f"🎲 {ability['dice']}: {damage} {ability.get('damage_label', 'урону')}")
+    _deal_damage(state, damage)
+
+
+# Ефект -> обробник (O(1) замість ланцюжка if/elif)
+ABILITY_HANDLERS: Dict[str, Callable[[BattleState, Dict[str, Any], List[str]], None]] = {
+    AbilityEffect.SPELL_DAMAGE: _spell_damage,
+    AbilityEffect.WEAPON_MULTIPLIER: _weapon_multiplier,
+    AbilityEffect.POISON_ATTACK: _poison_attack,
+    AbilityEffect.APPLY_STATUS: _status_only,
+    AbilityEffect.DICE_DAMAGE: _dice_damage,
+}
+
+# Дані навичок перевіряються при імпорті, як і кубики зброї
+for _ability in ABILITIES.values():
+    if _ability["effect"] not in ABILITY_HANDLERS:
+        raise ValueError(f"Невідомий ефект навички {_ability['id']}: {_ability['effect']}")
+    for _dice in (_ability.get("dice"), _ability.get("status", {}).get("dice")):
+        if _dice:
+            compile_dice(_dice)
+
+
+def ability_block(state: BattleState, ability_id: str, check_target: bool = True) -> Optional[str]:
+    """
+    Чому навичку зараз не можна використати
+    
+    Args:
+        check_target: Перевіряти тип монстра (клавіатура показує кнопку незалежно від цілі)
+    
+    Returns:
+        None якщо можна, інакше "unknown", "limit", "active", "mana" або "target"
+    """
+    ability = state.player.class_abilities.get(ability_id)
+    if ability is None:
+        return "unknown"
+    
+    limit = ability.get("uses_per_battle")
+    if limit and state.ability_uses.get(ability_id, 0) >= limit:
+        return "limit"
+    
+    status = ability.get("status")
+    if status and not status.get("refresh") and state.effects.has(status["id"]):
+        return "active"
+    
+    if not state.player.can_use_ability(ability_id):
+        return "mana"
+    
+    targets = ability.get("target_types")
+    if check_target and targets and state.monster.monster_type not in targets:
+        return "target"
+    
+    return None
+
+
+def _block_message(ability: Optional[Dict[str, Any]], code: str) -> str:
+    """Текст alert для коду з ability_block"""
+    if code == "limit":
+        limit = ability["uses_per_battle"]
+        if limit == 1:
+            return f"❌ Ви вже використали {ability['title']}!"
+        return f"❌ Ви вже використали {ability['title']} {limit} рази!"
+    if code == "active":
+        return ability.get("active_message", "❌ Ефект вже активний!")
+    if code == "mana":
+        return f"❌ Недостатньо мани! (потрібно {ability['mana_cost']})"
+    if code == "target":
+        return ability.get("target_message", "❌ Ця здібність не діє на цю ціль!")
+    return "❌ Невідома навичка!"
+
+
+def use_ability(state: BattleState, ability: str) -> Dict[str, Any]:
+    """
+    Навичка класу
+    
+    Returns:
+        {"error": текст для alert або None, "log": рядки логу, "victory": bool}
+        Якщо error не None - стан бою не змінено.
+    """
+    code = ability_block(state, ability)
+    if code:
+        spec = state.player.class_abilities.get(ability)
+        return {"error": _block_message(spec, code), "log": [], "victory": False}
+    
+    spec = state.player.class_abilities[ability]
+    state.player.use_ability(ability)
+    state.ability_uses[ability] = state.ability_uses.get(ability, 0) + 1
+    
+    battle_log = []
+    ABILITY_HANDLERS[spec["effect"]](state, spec, battle_log)
+    
+    return {"error": None, "log": battle_log, "victory": state.monster.health <= 0}
+
+
+# =====================================================
+# ЗІЛЛЯ
+# =====================================================
+
+def drink_potion(state: BattleState, index: int) -> Dict[str, Any]:
+    """
+    Зілля з інвентаря під час бою
+    
+    Returns:
+        {"error": текст або None, "alert": показати як alert, "log": рядки логу}
+        Якщо error не None - стан бою не змінено.
+    """
+    player = state.player
+    
+    def fail(message: str, alert: bool = False) -> Dict[str, Any]:
+        return {"error": message, "alert": alert, "log": []}
+    
+    if index < 0 or index >= len(player.inventory):
+        return fail("❌ Зілля не знайдено!")
+    
+    potion = player.inventory[index]
+    
+    if not isinstance(potion, dict) or potion.get("type") != "potion":
+        return fail("❌ Це не зілля!")
+    
+    potion_name = potion.get("name", "Зілля")
+    effect_type = potion.get("effect_type", "")
+    effect_value = potion.get("effect_value", 0)
+    
+    current_hp = player.health
+    max_hp = player.max_health
+    
+    battle_log = []
+    
+    # ========== ЗІЛЛЯ ЗДОРОВ'Я ==========
+    if effect_type == "heal":
+        if current_hp >= max_hp:
+            return fail("❤️ Ви вже на повному здоров'ї!", alert=True)
+        
+        healed = min(effect_value, max_hp - current_hp)
+        player.health += healed
+        battle_log.append(f"🧪 Ви випили {potion_name}")
+        battle_log.append(f"❤️ Відновлено {healed} HP")
+    
+    elif effect_type == "full_heal":
+        if current_hp >= max_hp:
+            return fail("❤️ Ви вже на повному здоров'ї!", alert=True)
+        
+        healed = max_hp - current_hp
+        player.health = max_hp
+        battle_log.append(f"🧪 Ви випили {potion_name}")
+        battle_log.append(f"✨ Повністю відновлено! (+{healed} HP)")
+    
+    # ========== ЗІЛЛЯ МАНИ ==========
+    elif effect_type == "mana":
+        if player.mana >= player.max_mana:
+            return fail("💙 Ви вже на повній мані!", alert=True)
+        
+        # effect_value - це % (0.25, 0.5, 1.0)
+        mana_restored = int(player.max_mana * effect_value)
+        mana_restored = min(mana_restored, player.max_mana - player.mana)
+        
+        player.mana += mana_restored
+        battle_log.append(f"🧪 Ви випили {potion_name}")
+        battle_log.append(f"💙 Відновлено {mana_restored} мани")
+    
+    else:
+        return fail("❌ Невідомий тип зілля!")
+    
+    player.inventory.pop(index)
+    
+    # Зілля може змінити характеристики - наступний раунд перерахує знімок
+    state.invalidate_snapshot()
+    
+    return {"error": None, "alert": False, "log": battle_log}
+
+
+# =====================================================
+# ХІД МОНСТРА
+# =====================================================
+
+def defend(state: BattleState) -> List[str]:
+    """
+    Оборонна позиція до кінця раунду
+    
+    +DEFEND_STAMINA_BONUS витривалості перераховується в бонуси AC і захисту
+    за тими ж формулами, що й у Player, - але як ефекти бою, без зміни
+    player.stamina.
+    """
+    player = state.player
+    total_stamina = player.stamina + state.snapshot.equipment_stamina
+    
+    ac_bonus = (total_stamina + DEFEND_STAMINA_BONUS) // 3 - total_stamina // 3
+    defense_bonus = (player.stamina + DEFEND_STAMINA_BONUS) // 2 - player.stamina // 2
+    
+    state.effects.add(StatusEffect("defend_ac", StatusKind.AC_BONUS, StatusTarget.PLAYER, ac_bonus, 1, "Оборона", "🛡️"))
+    state.effects.add(StatusEffect("defend_defense", StatusKind.DEFENSE_BONUS, StatusTarget.PLAYER, defense_bonus, 1, "Оборона", "🛡️"))
+    
+    return ["🛡️ Ви займаєте оборонну позицію"]
+
+
+def monster_will_roll(state: BattleState) -> bool:
+    """Чи кидатиме монстр кубик (не оглушений і не впирається у щит) - для анімації"""
+    effects = state.effects
+    return not (effects.has_kind(StatusKind.STUN, StatusTarget.MONSTER)
+                or effects.has_kind(StatusKind.BLOCK, StatusTarget.PLAYER))
+
+
+def monster_attack(state: BattleState, battle_log: List[str]) -> Dict[str, Any]:
+    """
+    Атака монстра (дописує в battle_log)
+    
+    Returns:
+        {"d20": кидок або None якщо атаки не було (щит, оглушення), "defeat": чи впав гравець}
+    """
+    player = state.player
+    monster = state.monster
+    effects = state.effects
+    
+    if effects.has_kind(StatusKind.STUN, StatusTarget.MONSTER):
+        battle_log.append(f"\n💫 {monster.name} оглушений і пропускає хід!")
+        return {"d20": None, "defeat": player.health <= 0}
+    
+    shield = effects.consume(StatusKind.BLOCK, StatusTarget.PLAYER)
+    if shield:
+        battle_log.append(f"\n{shield.icon} {shield.name} блокує атаку!")
+        return {"d20": None, "defeat": player.health <= 0}
+    
+    monster_attack_bonus = (monster.attack - 10) // 2
+    d20_result, total_roll, is_critical = CombatCalculator.attack_roll(monster_attack_bonus, state.rng)
+    
+    player_ac = state.snapshot.armor_class + effects.total(StatusKind.AC_BONUS, StatusTarget.PLAYER)
+    player_defense = state.snapshot.defense + effects.total(StatusKind.DEFENSE_BONUS, StatusTarget.PLAYER)
+    
+    # Критичний промах
+    if d20_result == 1:
+        battle_log.append(f"\n💀 {monster.name} критично промахнувся!")
+    
+    # Попадання
+    elif total_roll >= player_ac or is_critical:
+        damage = max(1, monster.attack - player_defense // 2)
+        
+        if is_critical:
+            damage *= 2
+            battle_log.append(f"\n💥 {monster.name} завдає КРИТИЧНИЙ УДАР!")
+        
+        battle_log.append(f"\n👹 {monster.name} атакує!")
+        battle_log.append(f"🎲 d20: {d20_result} + {monster_attack_bonus} = {total_roll} (ваш AC {player_ac})")
+        battle_log.append(f"💔 Ви отримали {damage} урону")
+        
+        player.health -= damage
+        player.total_damage_taken += damage
+    
+    # Промах
+    else:
+        battle_log.append(f"\n👹 {monster.name} промахнувся! ({total_roll} проти AC {player_ac})")
+    
+    return {"d20": d20_result, "defeat": player.health <= 0}
+
+
+def end_round(state: BattleState, battle_log: List[str]) -> Dict[str, bool]:
+    """
+    Кінець раунду: тік статус-ефектів (DoT) і перехід до наступного раунду
+    
+    Returns:
+        {"victory": монстр помер від ефектів, "defeat": гравець помер від ефектів}
+    """
+    player = state.player
+    monster = state.monster
+    
+    dots = state.effects.of_kind(StatusKind.DOT)
+    for effect in dots:
+        if effect.target == StatusTarget.MONSTER:
+            monster.health -= effect.value
+        else:
+            player.health -= effect.value
+            player.total_damage_taken += effect.value
+        battle_log.append(f"\n{effect.icon} {effect.name} наносить {effect.value} урону")
+    
+    state.effects.advance()
+    
+    for effect in dots:
+        if effect.remaining > 0:
+            battle_log.append(f"{effect.icon} {effect.name} діє ще {effect.remaining} ходів")
+        else:
+            battle_log.append(f"✓ {effect.name} перестала діяти")
+    
+    if monster.health <= 0 or player.health <= 0:
+        return {"victory": monster.health <= 0, "defeat": monster.health > 0}
+    
+    state.round += 1
+    return {"victory": False, "defeat": False}
+
+
+# =====================================================
+# ПОВНИЙ РАУНД (симулятор, автобій)
+# =====================================================
+
+def resolve_round(state: BattleState, action: str, ability: Optional[str] = None,
+                  potion_index: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Повний раунд без пауз: дія гравця → атака монстра → кінець раунду
+    
+    Args:
+        action: "attack", "ability", "defend" або "potion"
+        ability: Назва навички для action="ability"
+        potion_index: Індекс зілля в інвентарі для action="potion"
+    
+    Returns:
+        {"log": рядки, "victory": bool, "defeat": bool, "error": текст або None}
+    """
+    if action == "ability":
+        result = use_ability(state, ability)
+        if result["error"]:
+            return {"log": [], "victory": False, "defeat": False, "error": result["error"]}
+        battle_log = result["log"]
+        victory = result["victory"]
+    elif action == "potion":
+        result = drink_potion(state, potion_index)
+        if result["error"]:
+            return {"log": [], "victory": False, "defeat": False, "error": result["error"]}
+        battle_log = result["log"]
+        victory = False
+    elif action == "defend":
+        battle_log = defend(state)
+        victory = False
+    else:
+        result = player_attack(state)
+        battle_log = result["log"]
+        victory = result["victory"]
+    
+    if victory:
+        return {"log": battle_log, "victory": True, "defeat": False, "error": None}
+    
+    if monster_attack(state, battle_log)["defeat"]:
+        return {"log": battle_log, "victory": False, "defeat": True, "error": None}
+    
+    result = end_round(state, battle_log)
+    return {"log": battle_log, "victory": result["victory"], "defeat": result["defeat"], "error": None}
+
+
+def choose_ability(state: BattleState) -> Optional[str]:
+    """Проста політика: перша доступна навичка за пріоритетом або None"""
+    for ability_id in ABILITY_PRIORITY.get(state.player.character_class, ()):
+        if ability_block(state, ability_id):
+            continue
+        # Не перекидаємо статус, який ще діє (отрута)
+        status = ABILITIES[ability_id].get("status")
+        if status and state.effects.has(status["id"]):
+            continue
+        return ability_id
+    
+    return None
+
+
+# =====================================================
+# АВТОБІЙ
+# =====================================================
+
+def pick_heal_potion(player: Player) -> Optional[int]:
+    """
+    Індекс зілля лікування для автобою або None
+    
+    Береться найменше зілля, що закриває нестачу HP, інакше найбільше.
+    """
+    missing = player.max_health - player.health
+    options = []
+    
+    for index, item in enumerate(player.inventory):
+        if not isinstance(item, dict) or item.get("type") != "potion":
+            continue
+        if item.get("effect_type") == "heal":
+            options.append((item.get("effect_value", 0), index))
+        elif item.get("effect_type") == "full_heal":
+            options.append((player.max_health, index))
+    
+    if not options:
+        return None
+    
+    enough = [option for option in options if option[0] >= missing]
+    return (min(enough) if enough else max(options))[1]
+
+
+def auto_battle(state: BattleState, potion_threshold: float = AUTO_POTION_THRESHOLD,
+                max_rounds: int = AUTO_MAX_ROUNDS) -> Dict[str, Any]:
+    """
+    Розраховує решту бою без участі гравця
+    
+    Політика на кожен раунд: зілля лікування, якщо HP <= potion_threshold
+    від максимуму; інакше навичка з choose_ability; інакше атака.
+    
+    Returns:
+        {"outcome": "victory" / "defeat" / "timeout", "rounds": зіграно раундів,
+         "log": лог останнього раунду, "potions": випито зілль,
+         "abilities": {id: разів}, "damage_dealt": int, "damage_taken": int}
+    """
+    player = state.player
+    dealt_before = player.total_damage_dealt
+    taken_before = player.total_damage_taken
+    
+    outcome = "timeout"
+    potions = 0
+    abilities: Dict[str, int] = {}
+    battle_log: List[str] = []
+    rounds = 0
+    
+    while rounds < max_rounds:
+        rounds += 1
+        result = None
+        
+        if player.health <= player.max_health * potion_threshold:
+            potion_index = pick_heal_potion(player)
+            if potion_index is not None:
+                result = resolve_round(state, "potion", potion_index=potion_index)
+                if result["error"]:
+                    result = None
+                else:
+                    potions += 1
+        
+        if result is None:
+            ability = choose_ability(state)
+            result = resolve_round(state, "ability" if ability else "attack", ability)
+            if ability:
+                abilities[ability] = abilities.get(ability, 0) + 1
+        
+        battle_log = result["log"]
+        
+        if result["victory"]:
+            outcome = "victory"
+            break
+        if result["defeat"]:
+            outcome = "defeat"
+            break
+    
+    return {
+        "outcome": outcome,
+        "rounds": rounds,
+        "log": battle_log,
+        "potions": potions,
+        "abilities": abilities,
+        "damage_dealt": player.total_damage_dealt - dealt_before,
+        "damage_taken": player.total_damage_taken - taken_before,
+    }
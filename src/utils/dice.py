@@ -1,70 +1,180 @@
 ﻿# src/utils/dice.py - Система кидків кубиків
 
-import random
-from typing import Tuple, List
+import re
+from functools import lru_cache
+from typing import Tuple, List, Optional
+
+from src.utils.rng import GameRNG, get_rng
+
+# Один доданок виразу: "+2d6", "-1", "1d20kh1", "d8"
+_TERM_RE = re.compile(r"\s*([+-]?)\s*(?:(\d*)d(\d+)(?:(kh|kl)(\d+))?|(\d+))")
+
+
+class DicePlan:
+    """
+    Скомпільований вираз кубиків ("2d6+3", "1d20kh1", "1d8+1d4-1")
+    
+    terms - кортежі (знак, кількість, грані, скільки_лишити, найвищі),
+    constant - сума числових доданків. Створюється через compile_dice,
+    тому один і той самий вираз парситься лише раз.
+    """
+    
+    __slots__ = ("expression", "terms", "constant")
+    
+    def __init__(self, expression: str, terms: Tuple[Tuple[int, int, int, int, bool], ...], constant: int):
+        self.expression = expression
+        self.terms = terms
+        self.constant = constant
+    
+    def roll(self, rng: Optional[GameRNG] = None,
+             critical: bool = False) -> Tuple[int, List[Tuple[int, List[int]]]]:
+        """
+        Кидає всі кубики виразу
+        
+        Args:
+            rng: Генератор (за замовчуванням - глобальний)
+            critical: Подвоїти кількість кубиків (константа не подвоюється)
+        
+        Returns:
+            (сума, [(знак, залишені_кубики) для кожного доданка])
+        """
+        randint = (rng or get_rng()).randint
+        total = self.constant
+        kept = []
+        
+        for sign, count, sides, keep, highest in self.terms:
+            if critical:
+                count *= 2
+                keep *= 2
+            rolls = [randint(1, sides) for _ in range(count)]
+            if keep and keep < count:
+                rolls = sorted(rolls, reverse=highest)[:keep]
+            total += sign * sum(rolls)
+            kept.append((sign, rolls))
+        
+        return total, kept
+    
+    def format_rolls(self, rolls: List[Tuple[int, List[int]]]) -> str:
+        """Опис кидка: "[3+5]", "[7-4]" або "[3+5]+2" для виразів з константою"""
+        dice = "".join(
+            f"{'-' if sign < 0 else '+'}{value}" for sign, group in rolls for value in group
+        )
+        text = f"[{dice.removeprefix('+')}]"
+        if self.constant:
+            text += f"{self.constant:+d}"
+        return text
+    
+    def __repr__(self) -> str:
+        return f"DicePlan({self.expression!r})"
+
+
+def _parse_dice(expression: str) -> DicePlan:
+    """Парсить вираз кубиків (без кешу - див. compile_dice)"""
+    source = expression.strip().lower()
+    terms = []
+    constant = 0
+    pos = 0
+    
+    while pos < len(source):
+        match = _TERM_RE.match(source, pos)
+        # Кожен доданок, крім першого, має починатися зі знаку
+        if not match or match.end() == pos or (pos and not match.group(1)):
+            raise ValueError(f"Невірний вираз кубиків: {expression!r}")
+        
+        sign = -1 if match.group(1) == "-" else 1
+        if match.group(6) is not None:
+            constant += sign * int(match.group(6))
+        else:
+            count = int(match.group(2) or 1)
+            sides = int(match.group(3))
+            keep = int(match.group(5) or 0)
+            # kh0/kl0 не можна: keep=0 у roll означає "лишити всі"
+            if count < 1 or sides < 1 or keep > count or (match.group(4) and keep < 1):
+                raise ValueError(f"Невірний вираз кубиків: {expression!r}")
+            terms.append((sign, count, sides, keep, match.group(4) != "kl"))
+        pos = match.end()
+    
+    if not source:
+        raise ValueError("Порожній вираз кубиків")
+    
+    return DicePlan(expression, tuple(terms), constant)
+
+
+@lru_cache(maxsize=256)
+def compile_dice(expression: str) -> DicePlan:
+    """Скомпільований план кидка (LRU-кеш: виразів у грі - десятки)"""
+    return _parse_dice(expression)
+
+
+def roll_dice(expression: str, rng: Optional[GameRNG] = None,
+              critical: bool = False) -> Tuple[int, List[Tuple[int, List[int]]]]:
+    """Кидок за виразом: roll_dice("2d6-1d4") -> (сума, [(знак, кубики) для кожного доданка])"""
+    return compile_dice(expression).roll(rng, critical)
 
 
 class DiceRoller:
     """Клас для кидків кубиків як у D&D"""
     
     @staticmethod
-    def roll(sides: int, count: int = 1) -> Tuple[int, List[int]]:
+    def roll(sides: int, count: int = 1, rng: Optional[GameRNG] = None) -> Tuple[int, List[int]]:
         """
         Кидає кубики
         
         Args:
             sides: Кількість граней кубика (4, 6, 8, 10, 12, 20)
             count: Кількість кубиків
-            
+            rng: Генератор (за замовчуванням - глобальний)
+        
         Returns:
             (загальна_сума, список_результатів)
         """
-        rolls = [random.randint(1, sides) for _ in range(count)]
+        randint = (rng or get_rng()).randint
+        rolls = [randint(1, sides) for _ in range(count)]
         return sum(rolls), rolls
     
     @staticmethod
-    def d20() -> int:
+    def d20(rng: Optional[GameRNG] = None) -> int:
         """Кидок d20 (для Attack Roll)"""
-        return random.randint(1, 20)
+        return (rng or get_rng()).randint(1, 20)
     
     @staticmethod
-    def d4(count: int = 1) -> Tuple[int, List[int]]:
+    def d4(count: int = 1, rng: Optional[GameRNG] = None) -> Tuple[int, List[int]]:
         """Кидок d4 (магічна зброя)"""
-        return DiceRoller.roll(4, count)
+        return DiceRoller.roll(4, count, rng)
     
     @staticmethod
-    def d6(count: int = 1) -> Tuple[int, List[int]]:
+    def d6(count: int = 1, rng: Optional[GameRNG] = None) -> Tuple[int, List[int]]:
         """Кидок d6 (легка зброя, закляття)"""
-        return DiceRoller.roll(6, count)
+        return DiceRoller.roll(6, count, rng)
     
     @staticmethod
-    def d8(count: int = 1) -> Tuple[int, List[int]]:
+    def d8(count: int = 1, rng: Optional[GameRNG] = None) -> Tuple[int, List[int]]:
         """Кидок d8 (середня зброя)"""
-        return DiceRoller.roll(8, count)
+        return DiceRoller.roll(8, count, rng)
     
     @staticmethod
-    def d10(count: int = 1) -> Tuple[int, List[int]]:
+    def d10(count: int = 1, rng: Optional[GameRNG] = None) -> Tuple[int, List[int]]:
         """Кидок d10 (важка зброя)"""
-        return DiceRoller.roll(10, count)
+        return DiceRoller.roll(10, count, rng)
     
     @staticmethod
-    def d12(count: int = 1) -> Tuple[int, List[int]]:
+    def d12(count: int = 1, rng: Optional[GameRNG] = None) -> Tuple[int, List[int]]:
         """Кидок d12 (дуже важка зброя)"""
-        return DiceRoller.roll(12, count)
+        return DiceRoller.roll(12, count, rng)
 
 
 class CombatCalculator:
     """Розрахунки для бойової системи D&D"""
     
     @staticmethod
-    def attack_roll(attacker_bonus: int) -> Tuple[int, int, bool]:
+    def attack_roll(attacker_bonus: int, rng: Optional[GameRNG] = None) -> Tuple[int, int, bool]:
         """
         Attack Roll - спроба пробити броню
         
         Returns:
             (d20_result, total_roll, is_critical)
         """
-        d20_result = DiceRoller.d20()
+        d20_result = DiceRoller.d20(rng)
         is_critical = (d20_result == 20)
         is_critical_fail = (d20_result == 1)
         
@@ -75,7 +185,8 @@ class CombatCalculator:
         return d20_result, total, is_critical
     
     @staticmethod
-    def damage_roll(weapon_data: dict, stat_bonus: int, is_critical: bool = False) -> Tuple[int, str]:
+    def damage_roll(weapon_data: dict, stat_bonus: int, is_critical: bool = False,
+                    rng: Optional[GameRNG] = None) -> Tuple[int, str]:
         """
         Damage Roll - розрахунок урону від зброї
         
@@ -83,27 +194,15 @@ class CombatCalculator:
             weapon_data: Дані зброї (має містити damage_dice)
             stat_bonus: Бонус від характеристики
             is_critical: Чи критичний удар
-            
+        
         Returns:
             (урон, опис_кидка)
         """
-        # Отримуємо кубики урону зброї
-        damage_dice = weapon_data.get("damage_dice", "1d6")
-        
-        # Парсимо формат "2d6" -> (2, 6)
-        if "d" in damage_dice:
-            count, sides = damage_dice.split("d")
-            count = int(count)
-            sides = int(sides)
-        else:
-            count, sides = 1, 6
+        # Кубики урону зброї ("1d8", "2d6+1", ...), план береться з кешу
+        plan = compile_dice(weapon_data.get("damage_dice", "1d6"))
         
         # При критичному ударі подвоюємо кількість кубиків
-        if is_critical:
-            count *= 2
-        
-        # Кидаємо кубики
-        total_damage, rolls = DiceRoller.roll(sides, count)
+        total_damage, rolls = plan.roll(rng, is_critical)
         
         # Додаємо бонус характеристики (тільки один раз, навіть при криті)
         total_damage += stat_bonus
@@ -112,39 +211,36 @@ class CombatCalculator:
         total_damage = max(1, total_damage)
         
         # Формуємо опис
-        rolls_str = "+".join(map(str, rolls))
+        rolls_str = plan.format_rolls(rolls)
         if is_critical:
-            desc = f"💥 КРИТ! [{rolls_str}] + {stat_bonus} = {total_damage}"
+            desc = f"💥 КРИТ! {rolls_str} + {stat_bonus} = {total_damage}"
         else:
-            desc = f"[{rolls_str}] + {stat_bonus} = {total_damage}"
+            desc = f"{rolls_str} + {stat_bonus} = {total_damage}"
         
         return total_damage, desc
     
     @staticmethod
-    def spell_damage(spell_dice: str, stat_bonus: int) -> Tuple[int, str]:
+    def spell_damage(spell_dice: str, stat_bonus: int, rng: Optional[GameRNG] = None) -> Tuple[int, str]:
         """
         Урон від закляття
         
         Args:
-            spell_dice: Формат "2d6"
+            spell_dice: Вираз кубиків ("2d6", "3d4+2")
             stat_bonus: Бонус інтелекту
-            
+        
         Returns:
             (урон, опис)
         """
-        if "d" in spell_dice:
-            count, sides = spell_dice.split("d")
-            count = int(count)
-            sides = int(sides)
-        else:
-            return stat_bonus, f"{stat_bonus}"
+        plan = compile_dice(spell_dice)
+        if not plan.terms:
+            total_damage = plan.constant + stat_bonus
+            return total_damage, f"{total_damage}"
         
-        total_damage, rolls = DiceRoller.roll(sides, count)
+        total_damage, rolls = plan.roll(rng)
         total_damage += stat_bonus
         total_damage = max(1, total_damage)
         
-        rolls_str = "+".join(map(str, rolls))
-        desc = f"🔥 [{rolls_str}] + {stat_bonus} = {total_damage}"
+        desc = f"🔥 {plan.format_rolls(rolls)} + {stat_bonus} = {total_damage}"
         
         return total_damage, desc
 
@@ -0,0 +1,125 @@
+﻿# src/utils/encounter_tables.py - Зважені таблиці подій і зустрічей локацій
+#
+# Ваги задаються у файлі даних (settings.ENCOUNTER_TABLES_PATH, за
+# замовчуванням src/config/encounter_tables.json):
+#   default_event_chance       - шанс події, якщо в локації не задано свій;
+#   locations.<id>.event_chance - шанс, що дослідження почнеться з події;
+#   locations.<id>.events       - {id події з src/config/events.py: вага};
+#   locations.<id>.encounters   - [{"monster", "weight", "level_bonus"?}],
+#                                 рідкісні противники - це записи з малою
+#                                 вагою і бонусом до рівня.
+# Локації без запису у файлі беруть рівні ваги з LOCATIONS і LOCATION_EVENTS.
+# Монстр таблиці має бути в LOCATIONS[<id>]["monsters"] - список лишається
+# повним переліком (ним користуються експедиції і запасний варіант вище).
+#
+# Таблиці компілюються в AliasSampler один раз при імпорті, тож кожен
+# вибір - O(1), а помилка у файлі (невідомий монстр чи подія) видно
+# одразу при старті, а не посеред гри.
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from src.config.constants import LOCATIONS, MONSTER_BASE_STATS
+from src.config.events import LOCATION_EVENTS
+from src.config.settings import settings
+from src.utils.rng import GameRNG, get_rng
+from src.utils.sampling import AliasSampler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EVENT_CHANCE = 0.3
+
+
+class EncounterTable:
+    """Скомпільована таблиця однієї локації"""
+    
+    __slots__ = ("location_id", "event_chance", "events", "encounters")
+    
+    def __init__(self, location_id: str, event_chance: float,
+                 events: Optional[AliasSampler], encounters: Optional[AliasSampler]):
+        self.location_id = location_id
+        self.event_chance = event_chance
+        self.events = events
+        self.encounters = encounters
+    
+    def roll_event(self, rng: Optional[GameRNG] = None) -> Optional[Dict[str, Any]]:
+        """Подія з шансом event_chance, інакше None"""
+        if self.events is None:
+            return None
+        rng = rng or get_rng()
+        if rng.random() >= self.event_chance:
+            return None
+        return self.events.sample(rng)
+    
+    def roll_encounter(self, rng: Optional[GameRNG] = None) -> Optional[Dict[str, Any]]:
+        """Запис зустрічі {"monster", "weight", "level_bonus"} або None"""
+        if self.encounters is None:
+            return None
+        return self.encounters.sample(rng)
+
+
+def _compile_location(location_id: str, raw: Dict[str, Any], default_chance: float) -> EncounterTable:
+    """Перевіряє і компілює таблицю локації"""
+    events_by_id = {event["id"]: event for event in LOCATION_EVENTS.get(location_id, [])}
+    
+    event_weights = raw.get("events")
+    if event_weights is None:
+        event_weights = {event_id: 1 for event_id in events_by_id}
+    for event_id in event_weights:
+        if event_id not in events_by_id:
+            raise ValueError(f"{location_id}: невідома подія {event_id}")
+    
+    location_monsters = LOCATIONS.get(location_id, {}).get("monsters", [])
+    encounters: List[Dict[str, Any]] = raw.get("encounters")
+    if encounters is None:
+        encounters = [{"monster": m, "weight": 1} for m in location_monsters]
+    for entry in encounters:
+        if entry.get("monster") not in MONSTER_BASE_STATS:
+            raise ValueError(f"{location_id}: невідомий монстр {entry.get('monster')}")
+        if entry["monster"] not in location_monsters:
+            raise ValueError(f"{location_id}: монстра {entry['monster']} немає в LOCATIONS[...]['monsters']")
+        entry.setdefault("level_bonus", 0)
+    
+    events = None
+    if event_weights:
+        events = AliasSampler([events_by_id[e] for e in event_weights], list(event_weights.values()))
+    
+    sampler = None
+    if encounters:
+        sampler = AliasSampler(encounters, [entry["weight"] for entry in encounters])
+    
+    return EncounterTable(location_id, float(raw.get("event_chance", default_chance)), events, sampler)
+
+
+def compile_encounter_tables(data: Dict[str, Any]) -> Dict[str, EncounterTable]:
+    """Сирі дані файлу -> таблиці для кожної локації з LOCATIONS"""
+    default_chance = float(data.get("default_event_chance", DEFAULT_EVENT_CHANCE))
+    raw_locations = data.get("locations", {})
+    
+    for location_id in raw_locations:
+        if location_id not in LOCATIONS:
+            raise ValueError(f"Невідома локація {location_id}")
+    
+    return {
+        location_id: _compile_location(location_id, raw_locations.get(location_id, {}), default_chance)
+        for location_id in LOCATIONS
+    }
+
+
+def load_encounter_tables(path: str = settings.ENCOUNTER_TABLES_PATH) -> Dict[str, EncounterTable]:
+    """Читає файл даних; без файлу - рівні ваги для всіх локацій"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        logger.warning(f"Таблиці зустрічей {path} не знайдено - рівні ваги")
+        data = {}
+    return compile_encounter_tables(data)
+
+
+ENCOUNTER_TABLES: Dict[str, EncounterTable] = load_encounter_tables()
+
+
+def get_encounter_table(location_id: str) -> Optional[EncounterTable]:
+    return ENCOUNTER_TABLES.get(location_id)
@@ -0,0 +1,149 @@
+﻿# src/utils/leaderboard.py - Таблиці лідерів: топ-N у пам'яті
+#
+# Кожна таблиця тримає відсортовані ключі найкращих N гравців і
+# оновлюється інкрементально при кожному збереженні гравця
+# (Database.save_player, пакет експедицій): bisect + вставка, O(N) в
+# гіршому разі, без запитів до БД. Сторінка /top - зріз списку, тож
+# вартість залежить від розміру сторінки, а не від кількості гравців.
+#
+# Початкове заповнення - ORDER BY ... LIMIT N по індексах з міграції v7
+# (src/services/leaderboard.py). Усі рейтингові показники лише ростуть,
+# тому гравець поза топом не може обігнати когось, не пройшовши через
+# offer(). Якщо показник гравця з топу зменшився (наприклад, персонажа
+# створено заново), таблиця позначається dirty і перечитується з БД.
+
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.config.settings import settings
+
+# Таблиця -> назва і колонки players, за якими сортуємо (спадання)
+LEADERBOARDS: Dict[str, Dict[str, Any]] = {
+    "level": {"title": "⭐ Рівень", "columns": ("level", "experience")},
+    "kills": {"title": "⚔️ Вбивства", "columns": ("monsters_killed",)},
+    "gold": {"title": "💰 Золото", "columns": ("total_gold_earned",)},
+    "damage": {"title": "💥 Шкода", "columns": ("total_damage_dealt",)},
+}
+
+# Усі колонки, за якими дозволено сортувати (перевірка в Database)
+LEADERBOARD_COLUMNS = frozenset(
+    column for board in LEADERBOARDS.values() for column in board["columns"]
+)
+
+
+class TopN:
+    """
+    Найкращі capacity гравців за columns
+    
+    Ключ сортування - (-значення..., user_id): найкращі спочатку,
+    при рівності - хто раніше зареєструвався.
+    """
+    
+    __slots__ = ("columns", "capacity", "complete", "dirty", "_order", "_entries")
+    
+    def __init__(self, columns: Tuple[str, ...], capacity: int):
+        self.columns = columns
+        self.capacity = capacity
+        self.complete = False  # У таблиці всі гравці з БД (їх менше за capacity)
+        self.dirty = True      # Потрібне (пере)заповнення з БД
+        self._order: List[tuple] = []
+        self._entries: Dict[int, Tuple[tuple, Dict[str, Any]]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._order)
+    
+    def _key(self, player_data: Dict[str, Any]) -> tuple:
+        return (*(-int(player_data.get(column) or 0) for column in self.columns), player_data["user_id"])
+    
+    def _entry(self, player_data: Dict[str, Any]) -> Dict[str, Any]:
+        entry = {
+            "user_id": player_data["user_id"],
+            "character_name": player_data.get("character_name") or "Безіменний",
+            "class": player_data.get("class"),
+        }
+        for column in self.columns:
+            entry[column] = int(player_data.get(column) or 0)
+        return entry
+    
+    def load(self, rows: Iterable[Dict[str, Any]]):
+        """Заповнює таблицю рядками з БД (вже відсортованими і обрізаними)"""
+        self._order = []
+        self._entries = {}
+        for row in rows:
+            key = self._key(row)
+            self._order.append(key)
+            self._entries[row["user_id"]] = (key, self._entry(row))
+        self._order.sort()
+        self.complete = len(self._order) < self.capacity
+        self.dirty = False
+    
+    def offer(self, player_data: Dict[str, Any]):
+        """Враховує збережені дані гравця"""
+        if self.dirty:
+            return
+        
+        user_id = player_data["user_id"]
+        key = self._key(player_data)
+        current = self._entries.get(user_id)
+        
+        if current is not None:
+            old_key = current[0]
+            if old_key == key:
+                # Показники ті самі - лише оновлюємо ім'я
+                self._entries[user_id] = (key, self._entry(player_data))
+                return
+            
+            del self._order[bisect_left(self._order, old_key)]
+            del self._entries[user_id]
+            
+            if key > old_key and not self.complete:
+                # Показник зменшився - хтось поза топом міг стати кращим
+                self.dirty = True
+                return
+        
+        elif not self.complete and len(self._order) >= self.capacity and key >= self._order[-1]:
+            return
+        
+        insort(self._order, key)
+        self._entries[user_id] = (key, self._entry(player_data))
+        
+        if len(self._order) > self.capacity:
+            dropped = self._order.pop()
+            del self._entries[dropped[-1]]
+            self.complete = False
+    
+    def page(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Записи з місцями offset+1..offset+limit"""
+        return [self._entries[key[-1]][1] for key in self._order[offset:offset + limit]]
+    
+    def rank(self, user_id: int) -> Optional[int]:
+        """Місце гравця (з 1) або None, якщо він поза топом"""
+        current = self._entries.get(user_id)
+        if current is None:
+            return None
+        return bisect_left(self._order, current[0]) + 1
+
+
+class LeaderboardSet:
+    """Всі таблиці лідерів процесу"""
+    
+    def __init__(self, capacity: int):
+        self.boards: Dict[str, TopN] = {
+            board_id: TopN(board["columns"], capacity) for board_id, board in LEADERBOARDS.items()
+        }
+    
+    def get(self, board_id: str) -> Optional[TopN]:
+        return self.boards.get(board_id)
+    
+    def offer(self, player_data: Dict[str, Any]):
+        """Оновлює всі таблиці після збереження гравця"""
+        for board in self.boards.values():
+            board.offer(player_data)
+    
+    def invalidate(self):
+        """Усі таблиці буде перечитано з БД при наступному запиті"""
+        for board in self.boards.values():
+            board.dirty = True
+
+
+leaderboards = LeaderboardSet(settings.LEADERBOARD_SIZE)
@@ -0,0 +1,161 @@
+﻿# src/utils/loot.py - Рушій луту: зважені кидки і генерація спорядження
+#
+# Таблиці з src/config/loot.py компілюються при імпорті в AliasSampler:
+# кожен кидок - один rng.random(). Предмети інвентаря - словники з
+# "item_id" (id у каталозі), а не рядки: так магазин знає їхню ціну.
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from src.config.equipment import ALL_SHOP_ITEMS, ItemRarity
+from src.config.loot import (
+    LOOT_TABLES, MATERIALS, LootKind,
+    RARITY_DROP_WEIGHTS, RARITY_ORDER, UPGRADE_WEIGHTS, EQUIPMENT_LEVEL_MARGIN,
+)
+from src.utils.rng import GameRNG, get_rng
+from src.utils.sampling import AliasSampler
+
+BONUS_SUFFIX = "_bonus"
+
+
+class CompiledLootTable:
+    """Таблиця монстра, готова до кидків"""
+    
+    __slots__ = ("rolls", "sampler")
+    
+    def __init__(self, rolls: int, sampler: AliasSampler):
+        self.rolls = rolls
+        self.sampler = sampler
+
+
+def _material_template(material_id: str) -> Dict[str, Any]:
+    material = MATERIALS[material_id]
+    return {
+        "item_id": material_id,
+        "type": LootKind.MATERIAL,
+        "name": material["name"],
+        "rarity": material["rarity"],
+        "base_price": material["base_price"],
+    }
+
+
+# Готові словники матеріалів: предмет - це їхня копія
+_MATERIAL_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    material_id: _material_template(material_id) for material_id in MATERIALS
+}
+
+
+def _compile_tables() -> Dict[str, CompiledLootTable]:
+    """
+    Перевіряє і компілює LOOT_TABLES (один раз при імпорті)
+    
+    Записи стають кортежами (вид, шаблон матеріалу або None) -
+    на кидок не лишається пошуків у словниках.
+    """
+    compiled = {}
+    for monster_type, table in LOOT_TABLES.items():
+        entries = []
+        for drop in table["drops"]:
+            template = None
+            if drop["kind"] == LootKind.MATERIAL:
+                if drop["id"] not in MATERIALS:
+                    raise ValueError(f"{monster_type}: невідомий матеріал {drop['id']}")
+                template = _MATERIAL_TEMPLATES[drop["id"]]
+            entries.append((drop["kind"], template))
+        compiled[monster_type] = CompiledLootTable(
+            table.get("rolls", 1),
+            AliasSampler(entries, [drop["weight"] for drop in table["drops"]])
+        )
+    return compiled
+
+
+LOOT: Dict[str, CompiledLootTable] = _compile_tables()
+
+_UPGRADES: AliasSampler = AliasSampler(list(UPGRADE_WEIGHTS), list(UPGRADE_WEIGHTS.values()))
+
+
+@lru_cache(maxsize=64)
+def _equipment_sampler(max_level: int) -> Optional[AliasSampler]:
+    """Предмети каталогу до max_level, вага - за рідкістю (кеш на рівень)"""
+    item_ids = [
+        item_id for item_id, item in ALL_SHOP_ITEMS.items()
+        if item.get("level_required", 1) <= max_level
+    ]
+    if not item_ids:
+        return None
+    weights = [
+        RARITY_DROP_WEIGHTS.get(ALL_SHOP_ITEMS[item_id].get("rarity", ItemRarity.COMMON), 1)
+        for item_id in item_ids
+    ]
+    return AliasSampler(item_ids, weights)
+
+
+def make_material(material_id: str) -> Dict[str, Any]:
+    """Предмет-матеріал для інвентаря"""
+    return dict(_MATERIAL_TEMPLATES[material_id])
+
+
+def make_equipment(item_id: str, upgrade: int = 0) -> Dict[str, Any]:
+    """
+    Спорядження з каталогу з покращенням
+    
+    Кожен крок upgrade: рідкість +1 (не вище легендарної) і +1 до
+    кожного бонусу характеристики. Ціна росте через множник рідкості.
+    """
+    item = dict(ALL_SHOP_ITEMS[item_id])
+    item["item_id"] = item_id
+    
+    if upgrade > 0:
+        base_rarity = item.get("rarity", ItemRarity.COMMON)
+        tier = min(RARITY_ORDER.index(base_rarity) + upgrade, len(RARITY_ORDER) - 1)
+        item["rarity"] = RARITY_ORDER[tier]
+        for key in list(item):
+            if key.endswith(BONUS_SUFFIX):
+                item[key] += upgrade
+        item["upgrade"] = upgrade
+        item["name"] = f"{item['name']} +{upgrade}"
+    
+    return item
+
+
+def roll_equipment(max_level: int, rng: Optional[GameRNG] = None) -> Optional[Dict[str, Any]]:
+    """Випадкове спорядження до max_level (None - каталог порожній)"""
+    sampler = _equipment_sampler(max(1, max_level))
+    if sampler is None:
+        return None
+    rng = rng or get_rng()
+    return make_equipment(sampler.sample(rng), _UPGRADES.sample(rng))
+
+
+def roll_loot(monster_type: str, monster_level: int = 1,
+              rng: Optional[GameRNG] = None) -> List[Dict[str, Any]]:
+    """
+    Лут за вбивство монстра
+    
+    Args:
+        monster_type: Тип монстра (ключ LOOT_TABLES)
+        monster_level: Рівень - обмежує рівень спорядження
+        rng: Генератор (наприклад, BattleState.rng)
+    
+    Returns:
+        Список предметів для інвентаря
+    """
+    table = LOOT.get(monster_type)
+    if table is None:
+        return []
+    
+    rng = rng or get_rng()
+    sample = table.sampler.sample
+    loot = []
+    
+    for _ in range(table.rolls):
+        kind, template = sample(rng)
+        
+        if template is not None:
+            loot.append(dict(template))
+        elif kind == LootKind.EQUIPMENT:
+            item = roll_equipment(monster_level + EQUIPMENT_LEVEL_MARGIN, rng)
+            if item:
+                loot.append(item)
+    
+    return loot
@@ -0,0 +1,214 @@
+﻿# src/utils/metrics.py - Метрики гарячих шляхів (хендлери, БД, Telegram API)
+
+import functools
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Межі кошиків гістограми в секундах (як у Prometheus)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Гістограма з фіксованими кошиками"""
+    
+    __slots__ = ("counts", "total", "count")
+    
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # останній - +Inf
+        self.total = 0.0
+        self.count = 0
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+    
+    def quantile(self, q: float) -> float:
+        """Оцінка квантиля - верхня межа кошика"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else float("inf")
+        return float("inf")
+
+
+class UpdateStats:
+    """Лічильники одного апдейта (живуть у ContextVar)"""
+    
+    __slots__ = ("db_calls", "db_time", "api_calls", "api_time")
+    
+    def __init__(self):
+        self.db_calls = 0
+        self.db_time = 0.0
+        self.api_calls = 0
+        self.api_time = 0.0
+
+
+class HandlerStats:
+    """Накопичені метрики одного хендлера"""
+    
+    __slots__ = ("latency", "db_calls", "db_time", "api_calls", "api_time", "errors")
+    
+    def __init__(self):
+        self.latency = Histogram()
+        self.db_calls = 0
+        self.db_time = 0.0
+        self.api_calls = 0
+        self.api_time = 0.0
+        self.errors = 0
+
+
+_current_update: ContextVar[Optional[UpdateStats]] = ContextVar("current_update", default=None)
+
+
+class MetricsRegistry:
+    """Сховище всіх метрик процесу"""
+    
+    def __init__(self):
+        self.handlers: Dict[str, HandlerStats] = {}
+        self.api_methods: Dict[str, Histogram] = {}
+        self.db_methods: Dict[str, Histogram] = {}
+        self.dropped: Dict[str, int] = {}  # ✨ Апдейти, відкинуті middleware: причина -> кількість
+    
+    # ---------- Апдейти ----------
+    
+    def start_update(self) -> UpdateStats:
+        stats = UpdateStats()
+        _current_update.set(stats)
+        return stats
+    
+    def finish_update(self, handler_name: str, stats: UpdateStats, elapsed: float, failed: bool = False):
+        handler = self.handlers.get(handler_name)
+        if handler is None:
+            handler = self.handlers[handler_name] = HandlerStats()
+        
+        handler.latency.observe(elapsed)
+        handler.db_calls += stats.db_calls
+        handler.db_time += stats.db_time
+        handler.api_calls += stats.api_calls
+        handler.api_time += stats.api_time
+        if failed:
+            handler.errors += 1
+    
+    # ---------- БД та API ----------
+    
+    def observe_db(self, method: str, elapsed: float):
+        self._histogram(self.db_methods, method).observe(elapsed)
+        stats = _current_update.get()
+        if stats is not None:
+            stats.db_calls += 1
+            stats.db_time += elapsed
+    
+    def observe_api(self, method: str, elapsed: float):
+        self._histogram(self.api_methods, method).observe(elapsed)
+        stats = _current_update.get()
+        if stats is not None:
+            stats.api_calls += 1
+            stats.api_time += elapsed
+    
+    def observe_dropped(self, reason: str):
+        self.dropped[reason] = self.dropped.get(reason, 0) + 1
+    
+    @staticmethod
+    def _histogram(storage: Dict[str, Histogram], name: str) -> Histogram:
+        histogram = storage.get(name)
+        if histogram is None:
+            histogram = storage[name] = Histogram()
+        return histogram
+    
+    # ---------- Вивід ----------
+    
+    def format_summary(self, top: int = 15) -> str:
+        """Текстовий звіт для логу: найдорожчі хендлери за сумарним часом"""
+        if not self.handlers:
+            return "Метрики: апдейтів ще не було"
+        
+        rows = sorted(self.handlers.items(), key=lambda item: item[1].latency.total, reverse=True)
+        lines = [
+            "Метрики хендлерів (час у мс, на один виклик):",
+            f"{'handler':<28} {'n':>6} {'avg':>8} {'p50':>7} {'p95':>7} "
+            f"{'db':>5} {'db_ms':>7} {'api':>5} {'api_ms':>7} {'other':>7} {'err':>4}"
+        ]
+        for name, stats in rows[:top]:
+            n = stats.latency.count
+            avg = stats.latency.total / n * 1000
+            db_ms = stats.db_time / n * 1000
+            api_ms = stats.api_time / n * 1000
+            # other - все, що не БД і не API: sleep, CPU, блокування
+            other = max(avg - db_ms - api_ms, 0.0)
+            lines.append(
+                f"{name:<28} {n:>6} {avg:>8.1f} "
+                f"{stats.latency.quantile(0.5) * 1000:>7.0f} {stats.latency.quantile(0.95) * 1000:>7.0f} "
+                f"{stats.db_calls / n:>5.1f} {db_ms:>7.1f} {stats.api_calls / n:>5.1f} {api_ms:>7.1f} "
+                f"{other:>7.1f} {stats.errors:>4}"
+            )
+        if self.dropped:
+            lines.append("Відкинуто апдейтів: " + ", ".join(f"{k}={v}" for k, v in self.dropped.items()))
+        return "\n".join(lines)
+    
+    def render_prometheus(self) -> str:
+        """Метрики у текстовому форматі Prometheus"""
+        lines: List[str] = []
+        
+        def histogram_lines(metric: str, label: str, name: str, histogram: Histogram):
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS, histogram.counts):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{{label}="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{{label}="{name}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{metric}_sum{{{label}="{name}"}} {histogram.total:.6f}')
+            lines.append(f'{metric}_count{{{label}="{name}"}} {histogram.count}')
+        
+        lines.append("# TYPE bot_handler_latency_seconds histogram")
+        for name, stats in self.handlers.items():
+            histogram_lines("bot_handler_latency_seconds", "handler", name, stats.latency)
+        
+        for metric, attr in (
+            ("bot_handler_db_calls_total", "db_calls"),
+            ("bot_handler_db_seconds_total", "db_time"),
+            ("bot_handler_api_calls_total", "api_calls"),
+            ("bot_handler_api_seconds_total", "api_time"),
+            ("bot_handler_errors_total", "errors"),
+        ):
+            lines.append(f"# TYPE {metric} counter")
+            for name, stats in self.handlers.items():
+                lines.append(f'{metric}{{handler="{name}"}} {getattr(stats, attr)}')
+        
+        lines.append("# TYPE bot_db_latency_seconds histogram")
+        for name, histogram in self.db_methods.items():
+            histogram_lines("bot_db_latency_seconds", "method", name, histogram)
+        
+        lines.append("# TYPE bot_api_latency_seconds histogram")
+        for name, histogram in self.api_methods.items():
+            histogram_lines("bot_api_latency_seconds", "method", name, histogram)
+        
+        lines.append("# TYPE bot_dropped_updates_total counter")
+        for reason, count in self.dropped.items():
+            lines.append(f'bot_dropped_updates_total{{reason="{reason}"}} {count}')
+        
+        return "\n".join(lines) + "\n"
+
+
+# Глобальний реєстр
+metrics = MetricsRegistry()
+
+
+def track_db(func):
+    """Декоратор для async-методів Database: рахує виклики та час"""
+    name = func.__name__
+    
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            metrics.observe_db(name, time.perf_counter() - start)
+    
+    return wrapper
@@ -0,0 +1,67 @@
+﻿# src/utils/rate_limit.py - Обмеження частоти: маркерний кошик (token bucket)
+#
+# TokenBucket - чиста арифметика без таймерів: маркери доливаються
+# ліниво при кожному зверненні за часом, що минув. AsyncRateLimiter
+# чекає на маркер - для розсилок, що мають вкладатися в ліміти Telegram
+# (~30 повідомлень/с на бота).
+
+import asyncio
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """
+    rate маркерів за секунду, не більше capacity в запасі
+    
+    Новий кошик повний: перші capacity запитів проходять одразу.
+    """
+    
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+    
+    def __init__(self, rate: float, capacity: float, now: Optional[float] = None):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate і capacity мають бути додатними")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic() if now is None else now
+    
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+    
+    def try_take(self, now: Optional[float] = None, tokens: float = 1.0) -> bool:
+        """Забирає маркери, якщо вони є"""
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+    
+    def wait_time(self, now: Optional[float] = None, tokens: float = 1.0) -> float:
+        """Скільки секунд до появи потрібних маркерів (0 - вже є)"""
+        self._refill(time.monotonic() if now is None else now)
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+
+class AsyncRateLimiter:
+    """Спільний ліміт для багатьох корутин: acquire() чекає на свою чергу"""
+    
+    def __init__(self, rate: float, burst: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self._bucket = TokenBucket(rate, burst, clock())
+        self._clock = clock
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        # Під замком - щоб очікувальники не проходили пачкою після сну
+        async with self._lock:
+            while not self._bucket.try_take(self._clock()):
+                await asyncio.sleep(self._bucket.wait_time(self._clock()))
+    
+    def pause(self, seconds: float):
+        """Пауза для всіх (наприклад, після 429 Retry-After від Telegram)"""
+        self._bucket._refill(self._clock())
+        self._bucket.tokens = min(self._bucket.tokens, -seconds * self._bucket.rate)
@@ -0,0 +1,138 @@
+﻿# src/utils/rng.py - Генератор випадкових чисел гри
+#
+# Усі кидки (кубики, перевірки навичок, лут, бій, таверна) беруться звідси,
+# а не з глобального модуля random. Це дає:
+#   - відтворюваність: seed(42) або власний GameRNG → ті самі бої;
+#   - окремий потік на кожен бій (BattleState.rng), тож паралельні бої
+#     не зсувають послідовності один одного;
+#   - BufferedRNG - кидки з заздалегідь згенерованого блоку бітів.
+
+import random
+import sys
+from array import array
+from typing import Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class GameRNG:
+    """Генератор на основі random.Random з власним станом"""
+    
+    __slots__ = ("seed", "_random")
+    
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self._random = random.Random(seed)
+    
+    def randint(self, a: int, b: int) -> int:
+        """Ціле з [a, b] включно"""
+        return self._random.randint(a, b)
+    
+    def random(self) -> float:
+        """Дробове з [0, 1)"""
+        return self._random.random()
+    
+    def choice(self, seq: Sequence[T]) -> T:
+        """Випадковий елемент непорожньої послідовності"""
+        return self._random.choice(seq)
+    
+    def d(self, sides: int) -> int:
+        """Один кубик dN"""
+        return self.randint(1, sides)
+    
+    def getrandbits(self, k: int) -> int:
+        return self._random.getrandbits(k)
+    
+    def spawn(self) -> "GameRNG":
+        """
+        Дочірній потік (наприклад, на один бій)
+        
+        Seed дочірнього береться з батьківського, тому при сидованому
+        глобальному генераторі вся серія боїв відтворюється.
+        """
+        return type(self)(self.getrandbits(64))
+
+
+class BufferedRNG(GameRNG):
+    """
+    Генератор з блоковою передвибіркою
+    
+    Один виклик getrandbits(32 * n) дає цілий блок 32-бітних слів,
+    далі кожен кидок - це індекс у списку та множення. randint зводить
+    слово до діапазону як (word * span) >> 32: зміщення для діапазонів
+    кубиків (до 100) менше за 2^-25, для гри цього досить.
+    
+    Блок росте від FIRST_BLOCK до block: короткий бій не платить
+    за тисячі непотрібних слів, довга серія кидків - амортизується.
+    """
+    
+    __slots__ = ("_block", "_next_block", "_buffer", "_pos")
+    
+    FIRST_BLOCK = 64
+    BLOCK = 4096
+    
+    def __init__(self, seed: Optional[int] = None, block: int = BLOCK):
+        super().__init__(seed)
+        self._block = block
+        self._next_block = min(self.FIRST_BLOCK, block)
+        self._buffer = []
+        self._pos = 0
+    
+    def _refill(self):
+        n = self._next_block
+        self._next_block = min(n * 2, self._block)
+        raw = self._random.getrandbits(32 * n).to_bytes(4 * n, "little")
+        words = array("I")
+        if words.itemsize != 4:
+            words = array("L")
+        words.frombytes(raw)
+        if sys.byteorder == "big":
+            words.byteswap()
+        self._buffer = words.tolist()
+        self._pos = 0
+    
+    def _next(self) -> int:
+        pos = self._pos
+        if pos >= len(self._buffer):
+            self._refill()
+            pos = 0
+        self._pos = pos + 1
+        return self._buffer[pos]
+    
+    def randint(self, a: int, b: int) -> int:
+        return a + ((self._next() * (b - a + 1)) >> 32)
+    
+    def random(self) -> float:
+        return self._next() / 4294967296.0
+    
+    def choice(self, seq: Sequence[T]) -> T:
+        if not seq:
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[(self._next() * len(seq)) >> 32]
+    
+    def spawn(self) -> "BufferedRNG":
+        return BufferedRNG(self.getrandbits(64), self._block)
+
+
+# Глобальний генератор (без seed - ентропія ОС)
+_default_rng: GameRNG = GameRNG()
+
+
+def get_rng() -> GameRNG:
+    """Поточний глобальний генератор"""
+    return _default_rng
+
+
+def set_rng(rng: GameRNG) -> GameRNG:
+    """Підміняє глобальний генератор (симулятори, тести). Повертає старий"""
+    global _default_rng
+    previous = _default_rng
+    _default_rng = rng
+    return previous
+
+
+def seed(value: Optional[int]) -> GameRNG:
+    """Сидує гру: новий глобальний GameRNG з заданим seed"""
+    rng = GameRNG(value)
+    set_rng(rng)
+    return rng
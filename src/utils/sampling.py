@@ -0,0 +1,78 @@
+﻿# src/utils/sampling.py - Зважений вибір методом псевдонімів (alias method)
+#
+# Таблиця будується один раз за O(n) (алгоритм Воуза), далі кожен вибір -
+# один rng.random(), множення і порівняння: O(1) незалежно від кількості
+# варіантів і розкиду ваг. Для таблиць подій, зустрічей і луту.
+
+from typing import Generic, List, Optional, Sequence, TypeVar
+
+from src.utils.rng import GameRNG, get_rng
+
+T = TypeVar("T")
+
+
+class AliasSampler(Generic[T]):
+    """
+    Незмінний зважений вибір
+    
+    Ваги - будь-які невід'ємні числа (не обов'язково в сумі 1).
+    Варіанти з нульовою вагою ніколи не випадають.
+    """
+    
+    __slots__ = ("items", "weights", "_n", "_prob", "_alias")
+    
+    def __init__(self, items: Sequence[T], weights: Sequence[float]):
+        if len(items) != len(weights):
+            raise ValueError("items і weights різної довжини")
+        if not items:
+            raise ValueError("Порожня таблиця")
+        if any(w < 0 for w in weights):
+            raise ValueError("Від'ємна вага")
+        
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("Сума ваг має бути додатною")
+        
+        n = len(items)
+        self.items = tuple(items)
+        self.weights = tuple(weights)
+        self._n = n
+        
+        # Масштабуємо так, щоб середня вага = 1
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        
+        # Залишки (похибки округлення) - повні комірки
+        for i in small + large:
+            prob[i] = 1.0
+        
+        self._prob = prob
+        self._alias = alias
+    
+    def __len__(self) -> int:
+        return self._n
+    
+    def sample(self, rng: Optional[GameRNG] = None) -> T:
+        """Один зважений вибір"""
+        u = (rng or get_rng()).random() * self._n
+        i = int(u)
+        if u - i < self._prob[i]:
+            return self.items[i]
+        return self.items[self._alias[i]]
+    
+    def probabilities(self) -> List[float]:
+        """Точні ймовірності варіантів (для звітів і перевірок)"""
+        total = float(sum(self.weights))
+        return [w / total for w in self.weights]
@@ -0,0 +1,110 @@
+﻿# src/utils/status_effects.py - Статус-ефекти бою (отрута, щити, бафи AC, оглушення)
+#
+# Ефекти живуть лише в BattleState і не змінюють збережені характеристики
+# гравця: бонус оборони - це ефект AC_BONUS на один раунд, а не player.stamina += 5.
+
+from typing import List, Optional
+
+from src.config.abilities import StatusKind
+
+
+class StatusEffect:
+    """
+    Один активний ефект
+    
+    remaining - раунди для часових ефектів або заряди для BLOCK.
+    """
+    
+    __slots__ = ("effect_id", "kind", "target", "value", "remaining", "name", "icon")
+    
+    def __init__(self, effect_id: str, kind: str, target: str, value: int, remaining: int,
+                 name: str = "", icon: str = "✨"):
+        self.effect_id = effect_id
+        self.kind = kind
+        self.target = target
+        self.value = value
+        self.remaining = remaining
+        self.name = name or effect_id
+        self.icon = icon
+    
+    def __repr__(self) -> str:
+        return f"StatusEffect({self.effect_id!r}, {self.kind}, {self.target}, value={self.value}, remaining={self.remaining})"
+
+
+class EffectList:
+    """
+    Активні ефекти бою
+    
+    Ефектів одночасно одиниці, тому звичайний список і лінійний пошук
+    дешевші за будь-які індекси.
+    """
+    
+    __slots__ = ("_effects",)
+    
+    def __init__(self):
+        self._effects: List[StatusEffect] = []
+    
+    def __iter__(self):
+        return iter(self._effects)
+    
+    def __len__(self) -> int:
+        return len(self._effects)
+    
+    def add(self, effect: StatusEffect) -> StatusEffect:
+        """Додає ефект; ефект з тим самим id замінюється (оновлення тривалості)"""
+        self.remove(effect.effect_id)
+        self._effects.append(effect)
+        return effect
+    
+    def remove(self, effect_id: str):
+        self._effects = [e for e in self._effects if e.effect_id != effect_id]
+    
+    def has(self, effect_id: str) -> bool:
+        return any(e.effect_id == effect_id for e in self._effects)
+    
+    # Більшість раундів без ефектів - тому скрізь швидкий вихід на порожньому списку
+    
+    def has_kind(self, kind: str, target: str) -> bool:
+        if not self._effects:
+            return False
+        return any(e.kind == kind and e.target == target for e in self._effects)
+    
+    def of_kind(self, kind: str) -> List[StatusEffect]:
+        if not self._effects:
+            return []
+        return [e for e in self._effects if e.kind == kind]
+    
+    def total(self, kind: str, target: str) -> int:
+        """Сума значень ефектів (наприклад, усіх бонусів AC гравця)"""
+        if not self._effects:
+            return 0
+        return sum(e.value for e in self._effects if e.kind == kind and e.target == target)
+    
+    def consume(self, kind: str, target: str) -> Optional[StatusEffect]:
+        """Витрачає один заряд першого ефекту виду (щит). None якщо немає"""
+        for effect in self._effects:
+            if effect.kind == kind and effect.target == target:
+                effect.remaining -= 1
+                if effect.remaining <= 0:
+                    self._effects.remove(effect)
+                return effect
+        return None
+    
+    def advance(self) -> List[StatusEffect]:
+        """
+        Кінець раунду: часові ефекти втрачають один раунд
+        
+        Returns:
+            Ефекти, що закінчились
+        """
+        if not self._effects:
+            return []
+        
+        expired = []
+        alive = []
+        for effect in self._effects:
+            if effect.kind != StatusKind.BLOCK:
+                effect.remaining -= 1
+            (alive if effect.remaining > 0 else expired).append(effect)
+        self._effects = alive
+        return expired